@@ -0,0 +1,70 @@
+import pygame
+from utils import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Constants
+WALL_THICKNESS = 32  # Width of the band around the screen that fish bounce on
+SIDES = ("left", "right", "top", "bottom")  # Order side() checks the walls in by default
+
+
+class ArenaBounds:
+    """
+    The walls around the play area, as one rect instead of a sprite per
+    32x32 tile. A sprite touches the walls when it is on screen but not
+    entirely inside the play area, which is what colliding with one of the
+    tiles meant.
+    """
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, wall_thickness=WALL_THICKNESS):
+        self.screen = pygame.Rect(0, 0, width, height)
+        self.rect = self.screen.inflate(-2 * wall_thickness, -2 * wall_thickness)  # Play area
+
+    def touches(self, rect):
+        """
+        Returns True if rect overlaps the walls.
+        """
+        return self.screen.colliderect(rect) and not self.rect.contains(rect)
+
+    def get_limits(self, left=None, top=None, right=None, bottom=None):
+        """
+        Returns the play area with some of its edges moved, for sprites that
+        turn somewhere else than at the walls (the fish turn 64 px above the
+        bottom of the screen).
+        """
+        limits = self.rect.copy()
+        if left is not None:
+            limits.left = left
+        if top is not None:
+            limits.top = top
+        if right is not None:
+            limits.width = right - limits.left
+        if bottom is not None:
+            limits.height = bottom - limits.top
+        return limits
+
+    def side(self, rect, limits=None, order=SIDES):
+        """
+        Returns the wall rect goes through: "left", "right", "top" or "bottom",
+        the first one of order it went through, or None if it is inside.
+        :param limits: Rect the edges of rect are tested against, the play area if None.
+        :param order: The walls in the order they are checked.
+        """
+        limits = limits or self.rect
+        for side in order:
+            if side == "left" and rect.left < limits.left:
+                return side
+            if side == "right" and rect.right > limits.right:
+                return side
+            if side == "top" and rect.top < limits.top:
+                return side
+            if side == "bottom" and rect.bottom > limits.bottom:
+                return side
+        return None
+
+    def push_inside(self, rect, limits=None):
+        """
+        Moves rect back inside limits (the play area if None) along the walls
+        it went through.
+        """
+        rect.clamp_ip(limits or self.rect)
+
+
+ARENA = ArenaBounds()
@@ -0,0 +1,227 @@
+import os
+import io
+import sys
+import json
+import mmap
+import zlib
+import struct
+
+# Constants
+PACK_NAME = "assets.pak"
+ASSET_DIRS = ["Sprites", "Sounds", "fonts"]
+SKIPPED_DIRS = {"wip"}  # Work in progress sprites are not shipped
+HEADER = struct.Struct("<4sIQQ")  # magic, version, index offset, index size
+MAGIC = b"BFPK"
+VERSION = 1
+MIN_COMPRESSION_GAIN = 0.9  # Entries are stored compressed only if it saves 10% or more
+
+_pack = None
+_pack_searched = False
+
+
+def asset_key(file):
+    """
+    Normalizes an asset path so that "sprites/Player_down.png" and
+    "Sprites\\player_down.png" refer to the same entry.
+    :param file: Path to the asset file, relative to the game folder.
+    """
+    return os.path.normpath(file).replace(os.sep, "/").lower()
+
+
+class AssetPack:
+    """
+    Read-only view of an asset pack built by build_pack: every asset file in
+    one memory-mapped file, with an index of key -> [offset, size, raw size, mtime].
+    Entries are zlib-compressed when size != raw size.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_offset, index_size = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError(f"{path} is not a version {VERSION} asset pack")
+        self.index = json.loads(self.data[index_offset:index_offset + index_size])
+        self.view = memoryview(self.data)
+
+    def __contains__(self, file):
+        return asset_key(file) in self.index
+
+    def open(self, file):
+        """
+        Returns a binary file object reading an entry. Uncompressed entries are
+        read straight from the memory map without copying the file.
+        """
+        offset, size, raw_size, mtime = self.index[asset_key(file)]
+        if size != raw_size:
+            return io.BytesIO(zlib.decompress(self.view[offset:offset + size]))
+        return MappedFile(self.view[offset:offset + size])
+
+    def read(self, file):
+        with self.open(file) as f:
+            return f.read()
+
+    def stat(self, file):
+        """
+        Returns [modification time, size] of the file an entry was packed from,
+        the same as asset_stat gives for that loose file. Caches built from the
+        loose files (pixel cache, masks) stay valid when running from the pack.
+        """
+        offset, size, raw_size, mtime = self.index[asset_key(file)]
+        return [mtime, raw_size]
+
+
+class MappedFile(io.RawIOBase):
+    """
+    Seekable binary file over a memoryview, so pygame can read a pack entry
+    like a regular file.
+    """
+    def __init__(self, view):
+        super().__init__()
+        self.view = view
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self.view[self.position:self.position + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self.position += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        self.position = max(0, offset)
+        return self.position
+
+    def tell(self):
+        return self.position
+
+
+def get_pack_path(name=PACK_NAME):
+    """
+    Returns the path of the asset pack, or None if there is none.
+    Frozen builds look next to the executable first (so PyInstaller onefile
+    builds need no extraction), then in the PyInstaller bundle folder.
+    """
+    folders = []
+    if getattr(sys, "frozen", False):
+        folders.append(os.path.dirname(sys.executable))
+    if hasattr(sys, "_MEIPASS"):
+        folders.append(sys._MEIPASS)
+    folders.append(os.getcwd())
+    for folder in folders:
+        path = os.path.join(folder, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def get_pack():
+    """
+    Returns the AssetPack found by get_pack_path, opened once, or None.
+    """
+    global _pack, _pack_searched
+    if not _pack_searched:
+        _pack_searched = True
+        path = get_pack_path()
+        if path is not None:
+            try:
+                _pack = AssetPack(path)
+            except (OSError, ValueError, struct.error) as message:
+                print('Cannot open asset pack, using the loose files:', path, message)
+    return _pack
+
+
+def open_asset(file):
+    """
+    Returns what pygame loaders should be given for an asset file: a file
+    object reading it from the asset pack, or the path itself when the file
+    is not packed.
+    :param file: Path to the asset file, relative to the game folder.
+    """
+    pack = get_pack()
+    if pack is not None and file in pack:
+        return pack.open(file)
+    return file
+
+
+def read_asset(file):
+    """
+    Returns the content of an asset file, from the asset pack if it has it.
+    """
+    pack = get_pack()
+    if pack is not None and file in pack:
+        return pack.read(file)
+    with open(file, "rb") as f:
+        return f.read()
+
+
+def asset_exists(file):
+    pack = get_pack()
+    return (pack is not None and file in pack) or os.path.exists(file)
+
+
+def asset_stat(file):
+    """
+    Returns a value that changes whenever an asset file changes, or None if
+    it does not exist. Used to invalidate caches built from the asset.
+    """
+    pack = get_pack()
+    if pack is not None and file in pack:
+        return pack.stat(file)
+    try:
+        stat = os.stat(file)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def build_pack(output=PACK_NAME, asset_dirs=ASSET_DIRS):
+    """
+    Packs every file of asset_dirs (including the atlas and mask files, if
+    built) into output. Entries are compressed when it makes them noticeably
+    smaller, which is the case for WAV files but not for PNG or MP3 files.
+    :return: Dictionary of key -> [offset, size, raw size, mtime] that was written.
+    """
+    files = []
+    for asset_dir in asset_dirs:
+        for folder, subfolders, names in os.walk(asset_dir):
+            subfolders[:] = sorted(d for d in subfolders if d.lower() not in SKIPPED_DIRS)
+            files.extend(os.path.join(folder, name) for name in sorted(names))
+
+    index = {}
+    temp_path = output + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        for file in files:
+            with open(file, "rb") as source:
+                data = source.read()
+            stored = zlib.compress(data, 9)
+            if len(stored) > len(data) * MIN_COMPRESSION_GAIN:
+                stored = data
+            index[asset_key(file)] = [f.tell(), len(stored), len(data), os.stat(file).st_mtime_ns]
+            f.write(stored)
+        index_data = json.dumps(index, separators=(",", ":")).encode()
+        index_offset = f.tell()
+        f.write(index_data)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, index_offset, len(index_data)))
+    os.replace(temp_path, output)
+    return index
+
+
+if __name__ == "__main__":
+    # Build step: python asset_pack.py (after atlas.py and masks.py)
+    index = build_pack()
+    raw_size = sum(entry[2] for entry in index.values())
+    print(f"Packed {len(index)} files ({raw_size / 1e6:.1f} MB) into {PACK_NAME} "
+          f"({os.path.getsize(PACK_NAME) / 1e6:.1f} MB)")
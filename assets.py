@@ -0,0 +1,205 @@
+"""
+Asset manifest: every file utils.register_assets registers, with its load parameters.
+Importing it loads nothing and opens no window, so build steps can use it.
+It does import pygame and utils (for the screen geometry), which creates the
+empty IMAGES, SOUNDS and FONTS registries.
+"""
+import pygame
+from utils import SCREEN_WIDTH, SCREEN_HEIGHT, TOP_UI_LAYER_HEIGHT
+
+# (file, name, alpha, global_alpha)
+IMAGE_ASSETS = [
+    ("sprites/coral_reef.png", "spr_wall", True, None),
+    ("sprites/player_left.png", "player_left", True, None),
+    ("sprites/player_down_left.png", "player_down_left", True, None),
+    ("sprites/player_down.png", "player_down", True, None),
+    ("sprites/player_down_right.png", "player_down_right", True, None),
+    ("sprites/player_right.png", "player_right", True, None),
+    ("sprites/player_up_right.png", "player_up_right", True, None),
+    ("sprites/player_up.png", "player_up", True, None),
+    ("sprites/player_up_left.png", "player_up_left", True, None),
+    # Load heart image
+    ("sprites/heart.png", "heart", True, None),
+    ("sprites/player_left_munch.png", "player_left_munch", True, None),
+    ("sprites/player_down_left_munch.png", "player_down_left_munch", True, None),
+    ("sprites/player_down_munch.png", "player_down_munch", True, None),
+    ("sprites/player_down_right_munch.png", "player_down_right_munch", True, None),
+    ("sprites/player_right_munch.png", "player_right_munch", True, None),
+    ("sprites/player_up_right_munch.png", "player_up_right_munch", True, None),
+    ("sprites/player_up_munch.png", "player_up_munch", True, None),
+    ("sprites/player_up_left_munch.png", "player_up_left_munch", True, None),
+    ("sprites/player_left_face.png", "player_left_face", True, None),
+    ("sprites/player_down_left_face.png", "player_down_left_face", True, None),
+    ("sprites/player_down_face.png", "player_down_face", True, None),
+    ("sprites/player_down_right_face.png", "player_down_right_face", True, None),
+    ("sprites/player_right_face.png", "player_right_face", True, None),
+    ("sprites/player_up_right_face.png", "player_up_right_face", True, None),
+    ("sprites/player_up_face.png", "player_up_face", True, None),
+    ("sprites/player_up_left_face.png", "player_up_left_face", True, None),
+    ("sprites/player_left_gold.png", "player_left_gold", True, None),
+    ("sprites/player_down_left_gold.png", "player_down_left_gold", True, None),
+    ("sprites/player_down_gold.png", "player_down_gold", True, None),
+    ("sprites/player_down_right_gold.png", "player_down_right_gold", True, None),
+    ("sprites/player_right_gold.png", "player_right_gold", True, None),
+    ("sprites/player_up_right_gold.png", "player_up_right_gold", True, None),
+    ("sprites/player_up_gold.png", "player_up_gold", True, None),
+    ("sprites/player_up_left_gold.png", "player_up_left_gold", True, None),
+    ("sprites/red_fish.png", "spr_red_fish", True, None),
+    ("sprites/green_fish.png", "spr_green_fish_right", True, None),
+    ("sprites/big_green_fish_left.png", "spr_big_green_fish_left", True, None),
+    ("sprites/big_green_fish_left_face.png", "spr_big_green_fish_left_face", True, None),
+    ("sprites/big_green_fish_right.png", "spr_big_green_fish_right", True, None),
+    ("sprites/big_green_fish_right_face.png", "spr_big_green_fish_right_face", True, None),
+    ("sprites/big_green_fish_turning.png", "spr_big_green_fish_turning", True, None),
+    ("sprites/silver_fish.png", "spr_silver_fish", True, None),
+    ("sprites/snake_1.png", "spr_snake_1", True, None),
+    ("sprites/snake_2.png", "spr_snake_2", True, None),
+    ("sprites/snake_3.png", "spr_snake_3", True, None),
+    ("sprites/snake_4.png", "spr_snake_4", True, None),
+    ("sprites/seahorse.png", "spr_seahorse", True, None),
+    ("sprites/jellyfish_1.png", "spr_jellyfish_1", True, None),
+    ("sprites/jellyfish_2.png", "spr_jellyfish_2", True, None),
+    ("sprites/jellyfish_3.png", "spr_jellyfish_3", True, None),
+    ("sprites/jellyfish_4.png", "spr_jellyfish_4", True, None),
+    ("sprites/jellyfish_5.png", "spr_jellyfish_5", True, None),
+    ("sprites/jellyfish_6.png", "spr_jellyfish_6", True, None),
+    ("sprites/jellyfish_7.png", "spr_jellyfish_7", True, None),
+    ("sprites/shark_left.png", "spr_shark_left", True, None),
+    ("sprites/shark_face_left.png", "spr_shark_face_left", True, None),
+    ("sprites/shark_face_right.png", "spr_shark_face_right", True, None),
+    ("sprites/shark_right.png", "spr_shark_right", True, None),
+    ("sprites/shark_turning.png", "spr_shark_turning", True, None),
+    # Scaled to 300x200 when loaded, see IMAGE_SIZES
+    ("sprites/bright_blue_fish_right.png", "spr_bright_blue_fish_right", True, None),
+    ("sprites/bright_blue_fish_right_face.png", "spr_bright_blue_fish_right_face", True, None),
+    ("sprites/bright_blue_fish_left.png", "spr_bright_blue_fish_left", True, None),
+    ("sprites/bright_blue_fish_left_face.png", "spr_bright_blue_fish_left_face", True, None),
+    ("sprites/starfish_1.png", "spr_star_1", True, None),
+    ("sprites/starfish_2.png", "spr_star_2", True, None),
+    ("sprites/starfish_3.png", "spr_star_3", True, None),
+    ("sprites/arrow_warning_red.png", "arrow_warning_red_top", True, None),
+    ("sprites/arrow_warning_silver.png", "arrow_warning_silver_top", True, None),
+    ("sprites/arrow_warning_blue_left.png", "arrow_warning_blue_left", True, None),
+    ("sprites/arrow_warning_blue_right.png", "arrow_warning_blue_right", True, None),
+    ("sprites/seaweed_middle.png", "spr_seaweed", True, None),
+    ("sprites/seaweed_left.png", "spr_seaweed_left", True, None),
+    ("sprites/seaweed_right.png", "spr_seaweed_right", True, None),
+    ("sprites/rainbow_fish_left.png", "spr_rainbow_fish_left", True, None),
+    ("sprites/rainbow_fish_left_face.png", "spr_rainbow_fish_left_face", True, None),
+    ("sprites/rainbow_fish_turning.png", "spr_rainbow_fish_turning", True, None),
+    ("sprites/rainbow_fish_right.png", "spr_rainbow_fish_right", True, None),
+    ("sprites/rainbow_fish_right_face.png", "spr_rainbow_fish_right_face", True, None),
+    # Arrow keys
+    ("sprites/unpressed_arrow_up.png", "spr_unpressed_arrow_up", True, 128),
+    ("sprites/pressed_arrow_up.png", "spr_pressed_arrow_up", True, 128),
+    ("sprites/pressed_arrow_up_right.png", "spr_pressed_arrow_up_right", True, 128),
+    ("sprites/pressed_arrow_right.png", "spr_pressed_arrow_right", True, 128),
+    ("sprites/pressed_arrow_down_right.png", "spr_pressed_arrow_down_right", True, 128),
+    ("sprites/pressed_arrow_down.png", "spr_pressed_arrow_down", True, 128),
+    ("sprites/pressed_arrow_down_left.png", "spr_pressed_arrow_down_left", True, 128),
+    ("sprites/pressed_arrow_left.png", "spr_pressed_arrow_left", True, 128),
+    ("sprites/pressed_arrow_up_left.png", "spr_pressed_arrow_up_left", True, 128),
+    ("sprites/unpressed_arrow_up_right.png", "spr_unpressed_arrow_up_right", True, 128),
+    ("sprites/unpressed_arrow_right.png", "spr_unpressed_arrow_right", True, 128),
+    ("sprites/unpressed_arrow_down_right.png", "spr_unpressed_arrow_down_right", True, 128),
+    ("sprites/unpressed_arrow_down.png", "spr_unpressed_arrow_down", True, 128),
+    ("sprites/unpressed_arrow_down_left.png", "spr_unpressed_arrow_down_left", True, 128),
+    ("sprites/unpressed_arrow_left.png", "spr_unpressed_arrow_left", True, 128),
+    ("sprites/unpressed_arrow_up_left.png", "spr_unpressed_arrow_up_left", True, 128),
+    ("sprites/neutral_zone.png", "spr_neutral_zone", True, 128),
+    # Backgrounds
+    ("sprites/game_over.png", "game_over", True, None),
+    ("sprites/ground.png", "ground", False, None),
+    ("sprites/ground_red.png", "ground_red", False, None),
+    ("sprites/ground_blue.png", "ground_blue", False, None),
+    ("sprites/ground_black.png", "ground_black", False, None),
+    ("sprites/play_background.jpg", "play_background", False, None),
+    ("sprites/top_ui_layer.jpg", "top_ui_layer", False, None),
+    ("sprites/start_menu.png", "start_menu_bg", False, None),
+    ("sprites/info_screen.png", "info_screen_bg", False, None),
+    ("sprites/success_screen.png", "success_screen_bg", False, None),
+    ("sprites/fail_screen.png", "fail_screen_bg", False, None),
+]
+
+# name -> (width, height) of images drawn at another size than their file.
+# They are scaled once when loaded and the scaled pixels are kept in the pixel cache.
+IMAGE_SIZES = {
+    "top_ui_layer": (SCREEN_WIDTH, TOP_UI_LAYER_HEIGHT),
+    "spr_bright_blue_fish_right": (300, 200),
+    "spr_bright_blue_fish_right_face": (300, 200),
+    "spr_bright_blue_fish_left": (300, 200),
+    "spr_bright_blue_fish_left_face": (300, 200),
+}
+# Full screen images always match the screen geometry, whatever their file size
+for name in ("game_over", "ground", "ground_red", "ground_blue", "ground_black", "play_background",
+             "start_menu_bg", "info_screen_bg", "success_screen_bg", "fail_screen_bg"):
+    IMAGE_SIZES[name] = (SCREEN_WIDTH, SCREEN_HEIGHT)
+
+HEART_SCALE = 0.75          # Hearts of the lives counter are smaller than the heart sprite
+HUD_ICON_SIZE = (24, 15)    # Size of the fish icons in the top bar
+
+# (file or system font name, size, is_system_font)
+FONT_ASSETS = [
+    ("fonts/ocean_font.ttf", 16, False),
+    ("fonts/ocean_font.ttf", 22, False),
+    ("fonts/ocean_font.ttf", 48, False),
+    ("fonts/ocean_font.ttf", 76, False),
+    ("Arial", 32, True),
+    ("fonts/ARCADE_N.ttf", 16, False),
+    ("fonts/ARCADE_N.ttf", 14, False),
+    ("fonts/ARCADE_N.ttf", 12, False),
+    ("fonts/ARCADE_N.ttf", 22, False),
+    ("fonts/ARCADE_N.ttf", 36, False),
+    ("fonts/ARCADE_N.ttf", 48, False),
+    ("fonts/ARCADE_N.ttf", 76, False),
+]
+
+# (file, name, volume); volume None keeps the file's default
+SOUND_ASSETS = [
+    ("sounds/snd_eat.wav", "snd_eat", 1),
+    ("sounds/eat_shark.wav", "snd_eat_shark", .7),
+    ("sounds/size_down.wav", "snd_size_down", None),
+    ("sounds/player_die.wav", "snd_player_die", 1),
+    ("sounds/powerup_timer.wav", "snd_powerup_timer", 1),
+    ("sounds/power_up.wav", "snd_powerup_timer", 1),
+    ("sounds/siren.wav", "snd_siren", 0.3),
+    ("sounds/shark_incoming.wav", "snd_shark_incoming", 1),
+]
+
+MUSIC_FILE = "sounds/game_music.mp3"
+
+# Assets needed to draw the start menu and its loading bar, loaded before the first frame
+START_MENU_ASSETS = ["start_menu_bg", "arcade_n_16"]
+
+# Assets first needed late in a run (game over screens, big fonts).
+# They are registered at startup but only decoded in the background or on first use.
+DEFERRED_ASSETS = [
+    "spr_jellyfish_2", "spr_jellyfish_3", "spr_jellyfish_4", "spr_jellyfish_5",
+    "spr_jellyfish_6", "spr_jellyfish_7",
+    "game_over", "success_screen_bg", "fail_screen_bg",
+    "ocean_font_22", "ocean_font_48", "ocean_font_76", "arial_32",
+    "arcade_n_22", "arcade_n_36", "arcade_n_48", "arcade_n_76",
+]
+
+
+# Assets of the score phases, by score threshold: ground image and background music.
+# Only in memory around their phase, see phases.py.
+PHASE_ASSETS = {
+    200: {"images": ["ground_red"], "music": "sounds/shark_attack.wav"},
+    300: {"images": ["ground_blue"], "music": "sounds/whale_chase.wav"},
+    400: {"images": ["ground_black"], "music": "sounds/final.wav"},
+}
+
+def register_derived_images(images):
+    """
+    Registers the images that are computed from other images instead of loaded
+    from a file. Call it after register_assets.
+    :param images: The IMAGES registry.
+    """
+    images.register("spr_green_fish_left",
+                    lambda decoded: pygame.transform.flip(images["spr_green_fish_right"], 1, 0))
+    # Smaller copies drawn by the top bar every frame
+    images.register("heart_small", lambda decoded: pygame.transform.scale_by(images["heart"], HEART_SCALE))
+    for key in ("spr_rainbow_fish_left", "spr_big_green_fish_left", "spr_shark_left"):
+        images.register(key + "_icon",
+                        lambda decoded, key=key: pygame.transform.smoothscale(images[key], HUD_ICON_SIZE))
@@ -0,0 +1,114 @@
+import pygame
+import os
+import json
+import glob
+from asset_pack import asset_key, asset_exists, read_asset
+
+# Constants
+SPRITES_DIR = "sprites"
+ATLAS_DIR = os.path.join(SPRITES_DIR, "atlas")
+MANIFEST_NAME = "manifest.json"
+SHEET_SIZE = 2048        # Width/height of a sheet, safe for low-end mobile GPUs
+MAX_PACKED_SIZE = 256    # Larger images (backgrounds, screens) stay as separate files
+PADDING = 1              # Empty pixels between packed sprites
+
+
+def pack_rects(sizes, sheet_size=SHEET_SIZE, padding=PADDING):
+    """
+    Shelf bin-packing of rectangles into square sheets.
+    Rectangles are placed tallest first, left to right, opening a new shelf
+    when a row is full and a new sheet when a sheet is full.
+    :param sizes: Dictionary of name -> (width, height).
+    :param sheet_size: Width and height of every sheet.
+    :param padding: Space left around every rectangle.
+    :return: (placements, sheet_heights) where placements maps
+             name -> (sheet_index, x, y, width, height).
+    """
+    placements = {}
+    sheet_heights = []
+    sheet_index = -1
+    x = y = shelf_height = 0
+
+    for name in sorted(sizes, key=lambda n: (-sizes[n][1], -sizes[n][0], n)):
+        width, height = sizes[name]
+        if width + padding > sheet_size or height + padding > sheet_size:
+            raise ValueError(f"{name} ({width}x{height}) does not fit in a {sheet_size} sheet")
+
+        if sheet_index < 0 or x + width + padding > sheet_size:
+            # Start a new shelf below the current one
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+        if sheet_index < 0 or y + height + padding > sheet_size:
+            # Start a new sheet
+            sheet_index += 1
+            sheet_heights.append(0)
+            x = y = shelf_height = 0
+
+        placements[name] = (sheet_index, x, y, width, height)
+        x += width + padding
+        shelf_height = max(shelf_height, height + padding)
+        sheet_heights[sheet_index] = max(sheet_heights[sheet_index], y + shelf_height)
+
+    return placements, sheet_heights
+
+
+def build_atlas(sprites_dir=SPRITES_DIR, atlas_dir=ATLAS_DIR, sheet_size=SHEET_SIZE):
+    """
+    Packs every PNG sprite in sprites_dir into a few sheets and writes them,
+    together with a manifest, into atlas_dir.
+    :param sprites_dir: Folder containing the source sprites.
+    :param atlas_dir: Output folder for the sheets and the manifest.
+    :param sheet_size: Width and height of every sheet.
+    :return: The manifest dictionary that was written.
+    """
+    images = {}
+    for file in sorted(glob.glob(os.path.join(sprites_dir, "*.png"))):
+        image = pygame.image.load(file)
+        if max(image.get_size()) > MAX_PACKED_SIZE:
+            continue
+        key = asset_key(os.path.join(SPRITES_DIR, os.path.basename(file)))
+        images[key] = image
+
+    placements, sheet_heights = pack_rects({key: image.get_size() for key, image in images.items()},
+                                           sheet_size)
+
+    sheets = [pygame.Surface((sheet_size, height), pygame.SRCALPHA) for height in sheet_heights]
+    for sheet in sheets:
+        sheet.fill((0, 0, 0, 0))
+    for key, (sheet_index, x, y, width, height) in placements.items():
+        sheets[sheet_index].blit(images[key], (x, y))
+
+    os.makedirs(atlas_dir, exist_ok=True)
+    sheet_names = []
+    for i, sheet in enumerate(sheets):
+        sheet_name = f"sheet_{i}.png"
+        pygame.image.save(sheet, os.path.join(atlas_dir, sheet_name))
+        sheet_names.append(sheet_name)
+
+    manifest = {
+        "version": 1,
+        "sheets": sheet_names,
+        "sprites": {key: list(placement) for key, placement in sorted(placements.items())},
+    }
+    with open(os.path.join(atlas_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def load_manifest(atlas_dir=ATLAS_DIR):
+    """
+    Reads the atlas manifest.
+    :param atlas_dir: Folder containing the sheets and the manifest.
+    :return: The manifest dictionary, or None if no atlas has been built.
+    """
+    path = os.path.join(atlas_dir, MANIFEST_NAME)
+    if not asset_exists(path):
+        return None
+    return json.loads(read_asset(path))
+
+
+if __name__ == "__main__":
+    # Build step: python atlas.py
+    manifest = build_atlas()
+    print(f"Packed {len(manifest['sprites'])} sprites into {len(manifest['sheets'])} sheet(s) in {ATLAS_DIR}")
@@ -1,6 +1,8 @@
 import pygame
 import random
 from utils import SCREEN_WIDTH, SCREEN_HEIGHT
+from masks import get_mask
+from collision import teleported
 
 class BrightBlueFish(pygame.sprite.Sprite):
     OFFSCREEN_LEFT = -1000
@@ -69,10 +71,12 @@ class BrightBlueFish(pygame.sprite.Sprite):
             self.rect.topright = (self.OFFSCREEN_LEFT, random.randrange(50, SCREEN_HEIGHT - 200))
         else:
             self.rect.topleft = (self.OFFSCREEN_RIGHT, random.randrange(50, SCREEN_HEIGHT - 200))
+        teleported(self)
 
     def initialize_sprite(self, allsprites):
         self.image = self.images["spr_bright_blue_fish_right"]
         self.rect = self.image.get_rect()
+        self.update_mask()
         allsprites.add(self)
 
     def reset_position(self):
@@ -84,12 +88,13 @@ class BrightBlueFish(pygame.sprite.Sprite):
         else:
             self.direction = self.DIR_LEFT
             self.rect.topleft = (x_position, y_position)
+        teleported(self)
 
     def update_mask(self):
         if self.direction == self.DIR_RIGHT:
-            self.mask = pygame.mask.from_surface(self.images["spr_bright_blue_fish_right_face"])
+            self.mask = get_mask("spr_bright_blue_fish_right_face")
         elif self.direction == self.DIR_LEFT:
-            self.mask = pygame.mask.from_surface(self.images["spr_bright_blue_fish_left_face"])
+            self.mask = get_mask("spr_bright_blue_fish_left_face")
 
     def manage_boundaries_for_right_movement(self):
         if self.rect.left > SCREEN_WIDTH:
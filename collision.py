@@ -0,0 +1,662 @@
+import pygame
+import math
+import random
+import time
+import weakref
+import collision_stats
+from masks import BoundedMask, masks_overlap
+from hitboxes import hitboxes_swept_overlap
+import hitboxes
+try:
+    import numpy
+except ImportError:
+    numpy = None  # Optional, CollisionEngine uses the spatial hash without it
+
+# Constants
+CELL_SIZE = 192  # Fastest in benchmark(), most sprites touch 1 to 4 cells
+RECT = None  # Mask name of a rule that tests the whole rect of a sprite
+MAX_SWEEP = 48  # Pixels per tick on an axis, a sprite that moved further was put somewhere else
+
+_rect_masks = {}  # (width, height) -> filled BoundedMask, see get_rect_mask
+_engines = weakref.WeakSet()  # Every CollisionEngine, see teleported
+
+
+def get_rect_mask(size):
+    """
+    Returns a filled mask of a size, shared by every rect of that size.
+    """
+    mask = _rect_masks.get(size)
+    if mask is None:
+        if collision_stats.ENABLED:
+            collision_stats.count("masks_allocated")
+        mask = _rect_masks[size] = BoundedMask(size, fill=True)
+        mask.update_bounds()
+    return mask
+
+
+def collide_rect_to_mask(sprite1, sprite2, mask_name='mask'):
+    """
+    Check for collision between sprite1's rect and a specified mask of sprite2.
+
+    :param sprite1: The first sprite (uses its rect for collision).
+    :param sprite2: The second sprite (whose specified mask is used for collision).
+    :param mask_name: The name of the mask attribute in sprite2 to use for collision.
+    :return: True if there is a collision, False otherwise.
+    """
+    if collision_stats.ENABLED:
+        collision_stats.count("collide_rect_to_mask")
+        collision_stats.count("colliderect")
+    # First, check if the rectangles collide. If not, there can't be a mask collision.
+    if not sprite1.rect.colliderect(sprite2.rect):
+        return False
+
+    # A filled mask the size of sprite1's rect
+    mask1 = get_rect_mask(sprite1.rect.size)
+
+    # Get the specified mask from sprite2
+    mask2 = getattr(sprite2, mask_name, None)
+    if mask2 is None:
+        raise ValueError(f"Mask '{mask_name}' not found in sprite2")
+
+    # Get the offset between the two sprites
+    offset_x = sprite2.rect.left - sprite1.rect.left
+    offset_y = sprite2.rect.top - sprite1.rect.top
+
+    # Use the offset to check if the masks overlap
+    return masks_overlap(mask1, mask2, (offset_x, offset_y))
+
+
+def collide_mask_to_mask(sprite1, mask1_name, sprite2, mask2_name, use_rect_check=True):
+    """
+    Check for collision between two masks of two different sprites, with an optional
+    rectangle collision check for optimization.
+
+    :param sprite1: The first sprite.
+    :param mask1_name: The name of the mask attribute in the first sprite.
+    :param sprite2: The second sprite.
+    :param mask2_name: The name of the mask attribute in the second sprite.
+    :param use_rect_check: Whether to perform an initial rectangle collision check.
+    :return: True if there is a collision, False otherwise.
+    """
+    if collision_stats.ENABLED:
+        collision_stats.count("collide_mask_to_mask")
+        collision_stats.count("colliderect", use_rect_check)
+    # Retrieve the actual mask objects from the sprites
+    mask1 = getattr(sprite1, mask1_name, None)
+    mask2 = getattr(sprite2, mask2_name, None)
+
+    # Ensure both masks are present
+    if not mask1 or not mask2:
+        return False
+
+    # First, check if the rectangles collide if use_rect_check is True.
+    if use_rect_check and not sprite1.rect.colliderect(sprite2.rect):
+        return False
+
+    # Calculate the offset between the two sprites
+    offset_x = sprite2.rect.left - sprite1.rect.left
+    offset_y = sprite2.rect.top - sprite1.rect.top
+
+    # Check if the masks overlap
+    return masks_overlap(mask1, mask2, (offset_x, offset_y))
+
+
+def collide_mask(sprite1, sprite2):
+    """
+    Same test as pygame.sprite.collide_mask, going through masks_overlap so
+    that masks with bounds are rejected early.
+    """
+    if collision_stats.ENABLED:
+        collision_stats.count("collide_mask")
+    mask1 = getattr(sprite1, "mask", None)
+    if mask1 is None:
+        collision_stats.count("masks_allocated")
+        mask1 = pygame.mask.from_surface(sprite1.image)
+    mask2 = getattr(sprite2, "mask", None)
+    if mask2 is None:
+        collision_stats.count("masks_allocated")
+        mask2 = pygame.mask.from_surface(sprite2.image)
+    offset = (sprite2.rect.x - sprite1.rect.x, sprite2.rect.y - sprite1.rect.y)
+    return masks_overlap(mask1, mask2, offset)
+
+
+class SpatialHash:
+    """
+    Uniform grid broadphase: every sprite is put in the cells its rect covers,
+    and only sprites sharing a cell can collide. Two rects that overlap always
+    share a cell, so no collision is missed, and the exact test (rects or masks)
+    still decides. Filled again every tick for moving sprites, once for walls.
+    """
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> sprites whose rect covers that cell, in insertion order
+
+    def clear(self):
+        self.cells.clear()
+
+    def cells_of(self, rect):
+        """
+        Returns the (column, row) of every cell a rect covers.
+        """
+        size = self.cell_size
+        columns = range(rect.left // size, (rect.right - 1) // size + 1)
+        rows = range(rect.top // size, (rect.bottom - 1) // size + 1)
+        return [(column, row) for column in columns for row in rows]
+
+    def insert(self, sprite, rect=None):
+        # rect defaults to the sprite's rect
+        for cell in self.cells_of(rect or sprite.rect):
+            self.cells.setdefault(cell, []).append(sprite)
+
+    def insert_all(self, sprites):
+        for sprite in sprites:
+            self.insert(sprite)
+
+    def query(self, rect):
+        """
+        Returns the sprites sharing a cell with rect, without duplicates, in
+        the order they were inserted (so rules run in a stable order).
+        """
+        found = {}
+        for cell in self.cells_of(rect):
+            for sprite in self.cells.get(cell, ()):
+                found[sprite] = None
+        return found.keys()
+
+
+def teleported(sprite):
+    """
+    Tells every CollisionEngine that a sprite was put somewhere else
+    (reset_position, a respawn), so the jump is not swept as a move.
+    """
+    for engine in _engines:
+        engine.forget(sprite)
+
+
+def get_collision_mask(sprite, mask_name):
+    """
+    Returns the mask a CollisionRule tests for a sprite: the mask attribute
+    mask_name, or a filled mask the size of its rect for RECT.
+    """
+    if mask_name is RECT:
+        return get_rect_mask(sprite.rect.size)
+    return getattr(sprite, mask_name, None)
+
+
+def sweep_rects(rect1, motion1, rect2, motion2):
+    """
+    Swept AABB test: rect1 and rect2 move by motion1 and motion2 during a tick.
+    :return: (enter, leave) times between 0 and 1 of the part of the tick the
+        rects overlap, or None if they do not meet during the tick.
+    """
+    enter, leave = 0.0, 1.0
+    for start1, end1, start2, end2, speed in (
+            (rect1.left, rect1.right, rect2.left, rect2.right, motion1[0] - motion2[0]),
+            (rect1.top, rect1.bottom, rect2.top, rect2.bottom, motion1[1] - motion2[1])):
+        if speed == 0:
+            if end1 <= start2 or end2 <= start1:
+                return None  # Apart on this axis for the whole tick
+            continue
+        # Times rect1 starts and stops overlapping rect2 on this axis
+        if speed > 0:
+            axis_enter, axis_leave = (start2 - end1) / speed, (end2 - start1) / speed
+        else:
+            axis_enter, axis_leave = (end2 - start1) / speed, (start2 - end1) / speed
+        enter = max(enter, axis_enter)
+        leave = min(leave, axis_leave)
+        if enter >= leave:
+            return None
+    return enter, leave
+
+
+def collide_swept(sprite1, mask1_name, motion1, sprite2, mask2_name, motion2):
+    """
+    Tests the masks of a CollisionRule along the moves sprite1 and sprite2
+    made this tick (their rects are where the moves ended). The masks are
+    tested at every pixel of relative movement while the rects overlap, so
+    fast sprites that went through each other between two ticks still collide.
+    When both masks have capsules (see hitboxes.py) the capsules are swept
+    instead, in one test, unless hitboxes.PRECISE is on.
+    """
+    if collision_stats.ENABLED:
+        collision_stats.count("collide_swept")
+    rect1 = sprite1.rect.move(-motion1[0], -motion1[1])
+    rect2 = sprite2.rect.move(-motion2[0], -motion2[1])
+    times = sweep_rects(rect1, motion1, rect2, motion2)
+    if times is None:
+        return False
+    mask1 = get_collision_mask(sprite1, mask1_name)
+    mask2 = get_collision_mask(sprite2, mask2_name)
+    if mask1 is None or mask2 is None:
+        return False
+    enter, leave = times
+    speed_x = motion2[0] - motion1[0]
+    speed_y = motion2[1] - motion1[1]
+    hitbox1 = getattr(mask1, "hitbox", None)
+    hitbox2 = getattr(mask2, "hitbox", None)
+    if hitbox1 is not None and hitbox2 is not None and not hitboxes.PRECISE:
+        offset = (rect2.x - rect1.x + speed_x * enter, rect2.y - rect1.y + speed_y * enter)
+        motion = (speed_x * (leave - enter), speed_y * (leave - enter))
+        return hitboxes_swept_overlap(hitbox1, hitbox2, offset, motion)
+    steps = max(1, math.ceil(max(abs(speed_x), abs(speed_y)) * (leave - enter)))
+    tested = set()
+    for step in range(steps + 1):
+        moment = enter + (leave - enter) * step / steps
+        offset = (round(rect2.x - rect1.x + speed_x * moment), round(rect2.y - rect1.y + speed_y * moment))
+        if offset not in tested:
+            tested.add(offset)
+            if masks_overlap(mask1, mask2, offset):
+                return True
+    return False
+
+
+def rect_gap(rect1, rect2):
+    """
+    Returns how many pixels apart two rects are on the axis they are furthest
+    apart on, 0 or less if they touch or overlap.
+    """
+    return max(rect2.left - rect1.right, rect1.left - rect2.right,
+               rect2.top - rect1.bottom, rect1.top - rect2.bottom)
+
+
+def rect_displacement(old, new):
+    """
+    Returns how far the furthest moved edge of a rect went from old to new,
+    which covers moves, jumps and size changes.
+    """
+    return max(abs(new.left - old.left), abs(new.top - old.top),
+               abs(new.right - old.right), abs(new.bottom - old.bottom))
+
+
+def collide_sprites(sprite1, mask1_name, sprite2, mask2_name):
+    """
+    Exact test of a CollisionRule: collide_mask_to_mask, or collide_rect_to_mask
+    when one side is RECT, or a rect test when both are.
+    """
+    if mask1_name is RECT and mask2_name is RECT:
+        if collision_stats.ENABLED:
+            collision_stats.count("colliderect")
+        return sprite1.rect.colliderect(sprite2.rect)
+    if mask1_name is RECT:
+        return collide_rect_to_mask(sprite1, sprite2, mask2_name)
+    if mask2_name is RECT:
+        return collide_rect_to_mask(sprite2, sprite1, mask1_name)
+    return collide_mask_to_mask(sprite1, mask1_name, sprite2, mask2_name)
+
+
+class CollisionRule:
+    """
+    One line of the collision table: when a sprite of kind_a and a sprite of
+    kind_b overlap, handler(sprite_a, sprite_b) is called.
+    """
+    def __init__(self, kind_a, kind_b, mask_a, mask_b, predicate, handler):
+        """
+        :param kind_a: Kind of the first sprite, e.g. "red_fish".
+        :param kind_b: Kind of the second sprite.
+        :param mask_a: Mask attribute of the first sprite to test, or RECT.
+        :param mask_b: Mask attribute of the second sprite to test, or RECT.
+        :param predicate: predicate(sprite_a, sprite_b) checked before the masks, or None.
+        :param handler: handler(sprite_a, sprite_b) called when they collide.
+        """
+        self.kind_a = kind_a
+        self.kind_b = kind_b
+        self.mask_a = mask_a
+        self.mask_b = mask_b
+        self.predicate = predicate
+        self.handler = handler
+
+
+class CollisionEngine:
+    """
+    Runs a table of CollisionRules. Every kind gets a layer bit, and the kinds
+    a kind has rules with make its collision bitmask. Each tick the sprites go
+    in a SpatialHash once, the pairs sharing a cell whose layers match are
+    gathered, and then every rule runs over its own pairs in table order.
+    With numpy, the rects go in one array instead and the pairs are the
+    overlapping rects, found for every sprite at once with one broadcast.
+    Sprites entirely outside area (inactive sprites wait off screen) are left out.
+
+    Sprites that moved since the last run are swept: their box covers where
+    they were and where they are, and pairs that do not touch now are tested
+    along the moves with collide_swept. Fast sprites (and every sprite when
+    FPS is low) cannot jump over each other between two ticks.
+
+    Pairs whose rects were apart when tested are kept in a coherence cache
+    with their gap and their rects. The exact tests need the rects to touch,
+    so the pair is skipped until its two rects, together, moved as far as
+    the gap. The check compares where the sprites are with where they were,
+    so jumps (reset_position, a new spawn) end the skipping right away.
+
+    Both are rebuilt from the sprites of each run, so killed sprites are not
+    kept. Sprites that are put somewhere else must call teleported, or a
+    short jump would be swept along a path they never took.
+    """
+    def __init__(self, rules, area=None, cell_size=CELL_SIZE, use_numpy=None):
+        """
+        :param rules: CollisionRules, in the order they should run.
+        :param area: Rect sprites must touch to collide, or None for anywhere.
+        :param cell_size: Cell size of the spatial hash.
+        :param use_numpy: Whether to find the pairs with rect arrays, by default when numpy is installed.
+        """
+        self.rules = list(rules)
+        self.area = area
+        self.use_numpy = numpy is not None if use_numpy is None else use_numpy
+        self.positions = {}  # sprite -> rect.topleft at the end of the last run
+        self.apart = {}      # (sprite_a, sprite_b) -> (gap, rect_a, rect_b) of pairs found apart, see is_still_apart
+        self.hash = SpatialHash(cell_size)
+        self.layers = {}      # kind -> layer bit
+        self.collides_with = {}  # kind -> layer bits of the kinds it has rules with
+        self.rule_kinds = set()  # (kind_a, kind_b) of every rule
+        for rule in self.rules:
+            layer_a = self.get_layer(rule.kind_a)
+            layer_b = self.get_layer(rule.kind_b)
+            self.collides_with[rule.kind_a] |= layer_b
+            self.collides_with[rule.kind_b] |= layer_a
+            self.rule_kinds.add((rule.kind_a, rule.kind_b))
+        _engines.add(self)
+
+    def get_layer(self, kind):
+        """
+        Returns the layer bit of a kind, given on first use.
+        """
+        layer = self.layers.get(kind)
+        if layer is None:
+            layer = self.layers[kind] = 1 << len(self.layers)
+            self.collides_with[kind] = 0
+        return layer
+
+    def forget(self, sprite):
+        """
+        Drops what the engine remembers of a sprite, so its next position is
+        not taken as a move.
+        """
+        self.positions.pop(sprite, None)
+        for pair in [pair for pair in self.apart if sprite in pair]:
+            del self.apart[pair]
+
+    def get_motion(self, sprite):
+        """
+        Returns how far a sprite moved since the last run, or None if it did
+        not move, is new or moved more than MAX_SWEEP (it was put somewhere else).
+        """
+        position = self.positions.get(sprite)
+        if position is None:
+            return None
+        dx = sprite.rect.x - position[0]
+        dy = sprite.rect.y - position[1]
+        if (dx == 0 and dy == 0) or abs(dx) > MAX_SWEEP or abs(dy) > MAX_SWEEP:
+            return None
+        return dx, dy
+
+    def gather_pairs(self, groups):
+        """
+        Returns the pairs that may collide, found with one array of rects when
+        numpy is used and with the spatial hash otherwise.
+        :param groups: Dictionary of kind -> sprites of that kind.
+        :return: Dictionary of (kind_a, kind_b) -> [(sprite_a, sprite_b), ...]
+            for every rule, with the pairs in the order the sprites were given.
+        """
+        sprites = []  # Sprites that can collide this tick
+        kinds = []    # Their kinds
+        boxes = []    # Rects they covered during the tick
+        for kind, group in groups.items():
+            if not self.collides_with.get(kind):
+                continue  # No rule for this kind
+            for sprite in group:
+                motion = self.get_motion(sprite)
+                box = sprite.rect
+                if motion:
+                    box = box.union(box.move(-motion[0], -motion[1]))
+                if self.area is None or self.area.colliderect(box):
+                    sprites.append(sprite)
+                    kinds.append(kind)
+                    boxes.append(box)
+        if self.use_numpy:
+            candidates = self.find_overlapping_boxes(boxes, kinds)
+        else:
+            candidates = self.find_shared_cells(sprites, boxes, kinds)
+        found = set()
+        for i, j in candidates:
+            # Rules may list the two kinds in either order
+            if (kinds[i], kinds[j]) in self.rule_kinds:
+                found.add((i, j))
+            if (kinds[j], kinds[i]) in self.rule_kinds:
+                found.add((j, i))
+        pairs = {kind_pair: [] for kind_pair in self.rule_kinds}
+        for i, j in sorted(found):
+            pairs[(kinds[i], kinds[j])].append((sprites[i], sprites[j]))
+        return pairs
+
+    def find_shared_cells(self, sprites, boxes, kinds):
+        """
+        Returns (i, j) with i < j for the sprites whose boxes share a cell of
+        the spatial hash and whose layers match.
+        """
+        self.hash.clear()
+        index = {}  # sprite -> position in sprites
+        for i, sprite in enumerate(sprites):
+            index[sprite] = i
+            self.hash.insert(sprite, boxes[i])
+        candidates = set()
+        for cell in self.hash.cells.values():
+            for n, sprite1 in enumerate(cell):
+                i = index[sprite1]
+                bits = self.collides_with[kinds[i]]
+                for sprite2 in cell[n + 1:]:
+                    j = index[sprite2]
+                    if bits & self.layers[kinds[j]]:
+                        candidates.add((i, j) if i < j else (j, i))
+        return candidates
+
+    def find_overlapping_boxes(self, boxes, kinds):
+        """
+        Returns (i, j) with i < j for the sprites whose boxes overlap and whose
+        layers match, tested all at once with one broadcast of the box array.
+        """
+        if len(boxes) < 2:
+            return []
+        boxes = numpy.array([(box.left, box.top, box.right, box.bottom) for box in boxes], dtype=numpy.int32)
+        layers = numpy.array([self.layers[kind] for kind in kinds], dtype=numpy.int64)
+        collides_with = numpy.array([self.collides_with[kind] for kind in kinds], dtype=numpy.int64)
+        a = boxes[:, None, :]
+        b = boxes[None, :, :]
+        # Every rect against every rect, like Rect.colliderect
+        hits = ((a[..., 0] < b[..., 2]) & (b[..., 0] < a[..., 2]) &
+                (a[..., 1] < b[..., 3]) & (b[..., 1] < a[..., 3]))
+        hits &= (collides_with[:, None] & layers[None, :]) != 0
+        return zip(*numpy.nonzero(numpy.triu(hits, 1)))
+
+    def run(self, groups):
+        """
+        Tests every rule on the pairs that may collide and calls the handlers.
+        Predicates and masks are checked when the rule runs, so they see what
+        the handlers of the rules before changed.
+        :param groups: Dictionary of kind -> sprites of that kind.
+        """
+        profiled = collision_stats.ENABLED
+        if profiled:
+            start_time = time.perf_counter()
+            pairs = self.gather_pairs(groups)
+            collision_stats.set_pair(*collision_stats.BROADPHASE)
+            collision_stats.count("candidates", sum(len(found) for found in pairs.values()))
+            collision_stats.count("seconds", time.perf_counter() - start_time)
+        else:
+            pairs = self.gather_pairs(groups)
+        for rule in self.rules:
+            candidates = pairs[(rule.kind_a, rule.kind_b)]
+            if profiled and candidates:
+                collision_stats.set_pair(rule.kind_a, rule.kind_b)
+                collision_stats.count("candidates", len(candidates))
+            for sprite_a, sprite_b in candidates:
+                if rule.predicate is not None and not rule.predicate(sprite_a, sprite_b):
+                    continue
+                if self.is_still_apart(sprite_a, sprite_b):
+                    if profiled:
+                        collision_stats.count("cached")
+                    continue
+                if profiled:
+                    start_time = time.perf_counter()
+                    hit = self.collide(sprite_a, rule.mask_a, sprite_b, rule.mask_b)
+                    collision_stats.record_test(start_time, hit)
+                else:
+                    hit = self.collide(sprite_a, rule.mask_a, sprite_b, rule.mask_b)
+                self.update_apart(sprite_a, sprite_b, hit)
+                if hit:
+                    rule.handler(sprite_a, sprite_b)  # Sprites it puts elsewhere call teleported
+        positions = {}
+        for group in groups.values():
+            for sprite in group:
+                positions[sprite] = sprite.rect.topleft
+        self.positions = positions
+        # Pairs with a sprite that left the game cannot be tested again
+        for pair in [pair for pair in self.apart if not (pair[0] in positions and pair[1] in positions
+                                                         and pair[0].alive() and pair[1].alive())]:
+            del self.apart[pair]
+        collision_stats.end_frame()
+
+    def is_still_apart(self, sprite_a, sprite_b):
+        """
+        Returns True if the pair was found apart and cannot touch yet.
+        """
+        apart = self.apart.get((sprite_a, sprite_b))
+        if apart is None:
+            return False
+        gap, rect_a, rect_b = apart
+        return rect_displacement(rect_a, sprite_a.rect) + rect_displacement(rect_b, sprite_b.rect) <= gap
+
+    def update_apart(self, sprite_a, sprite_b, hit):
+        # Keeps the pair in the coherence cache if it was tested apart
+        gap = 0 if hit else rect_gap(sprite_a.rect, sprite_b.rect)
+        if gap > 0:
+            self.apart[(sprite_a, sprite_b)] = (gap, sprite_a.rect.copy(), sprite_b.rect.copy())
+        else:
+            self.apart.pop((sprite_a, sprite_b), None)
+
+    def collide(self, sprite_a, mask_a, sprite_b, mask_b):
+        """
+        Exact test of a pair: where the sprites are, then along their moves.
+        """
+        if collide_sprites(sprite_a, mask_a, sprite_b, mask_b):
+            return True
+        motion_a = self.get_motion(sprite_a)
+        motion_b = self.get_motion(sprite_b)
+        if motion_a is None and motion_b is None:
+            return False
+        return collide_swept(sprite_a, mask_a, motion_a or (0, 0), sprite_b, mask_b, motion_b or (0, 0))
+
+
+class _Box(pygame.sprite.Sprite):
+    # Stand-in sprite for the benchmark, with a full mask like a solid sprite
+    def __init__(self, size):
+        super().__init__()
+        self.rect = pygame.Rect((0, 0), size)
+        self.mask = pygame.mask.Mask(size, fill=True)
+
+
+def _collide(sprite1, sprite2):
+    # Same work as collide_mask, for masks without bounds
+    offset = (sprite2.rect.x - sprite1.rect.x, sprite2.rect.y - sprite1.rect.y)
+    return sprite1.mask.overlap(sprite2.mask, offset) is not None
+
+
+def benchmark(ticks=600, cell_size=CELL_SIZE, screen_size=(1024, 600)):
+    """
+    Compares the nested loops GameState.handle_collisions used to run with spatial hash
+    queries for a late game population moving at random: 18 creatures that
+    test the 95 walls (rects), and 27 creatures that test every whale (masks),
+    with the 30 bright blue fish of the FishManager waves on screen.
+    When numpy is installed, the pairs CollisionEngine finds with numpy are
+    also checked against the overlapping ones it finds with the spatial hash,
+    and both are timed.
+    :return: Dictionary of pair tests and milliseconds per tick.
+    """
+    width, height = screen_size
+    random.seed(1)
+    walls = [_Box((32, 32)) for _ in range(95)]
+    positions = [(x, 0) for x in range(0, width - 32, 32)]
+    positions += [(x, height - 32) for x in range(32, width - 32, 32)]
+    positions += [(0, y) for y in range(0, height - 32, 32)]
+    positions += [(width - 32, y) for y in range(0, height - 32, 32)]
+    for wall, position in zip(walls, positions):
+        wall.rect.topleft = position
+    # Red fish, green fish and sharks bounce on walls, everything meets the whales
+    bouncers = [_Box(size) for size in [(40, 25)] * 6 + [(70, 45)] * 3 + [(120, 60)] * 9]
+    others = [_Box(size) for size in [(100, 100), (50, 25), (80, 30), (40, 60), (40, 40), (140, 50)] + [(40, 60)] * 3]
+    creatures = bouncers + others
+    whales = [_Box((300, 200)) for _ in range(31)]
+    whale_set = set(whales)
+
+    wall_hash = SpatialHash(cell_size)
+    wall_hash.insert_all(walls)
+    moving_hash = SpatialHash(cell_size)
+    loop_tests = hash_tests = hits = 0
+    loop_time = hash_time = 0.0
+    engines = {}  # use_numpy -> CollisionEngine, both only when numpy is installed
+    engine_times = {True: 0.0, False: 0.0}
+    if numpy is not None:
+        rules = [CollisionRule("creature", "whale", "mask", "mask", None, None)]
+        engines = {use_numpy: CollisionEngine(rules, pygame.Rect((0, 0), screen_size), cell_size, use_numpy)
+                   for use_numpy in (True, False)}
+    groups = {"creature": creatures, "whale": whales}
+    for tick in range(ticks):
+        for sprite in creatures + whales:
+            sprite.rect.topleft = (random.randrange(-100, width), random.randrange(-50, height))
+
+        start = time.perf_counter()
+        loop_hits = 0
+        for sprite in bouncers:
+            for wall in walls:
+                loop_tests += 1
+                loop_hits += sprite.rect.colliderect(wall.rect)
+        for sprite in creatures:
+            for whale in whales:
+                loop_tests += 1
+                loop_hits += _collide(sprite, whale)
+        loop_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        tick_hits = 0
+        moving_hash.clear()
+        moving_hash.insert_all(whales)
+        for sprite in bouncers:
+            for wall in wall_hash.query(sprite.rect):
+                hash_tests += 1
+                tick_hits += sprite.rect.colliderect(wall.rect)
+        for sprite in creatures:
+            for whale in moving_hash.query(sprite.rect):
+                if whale in whale_set:
+                    hash_tests += 1
+                    tick_hits += _collide(sprite, whale)
+        hash_time += time.perf_counter() - start
+        assert tick_hits == loop_hits, "The spatial hash missed a collision"
+        hits += tick_hits
+
+        found = {}
+        for use_numpy, engine in engines.items():
+            start = time.perf_counter()
+            found[use_numpy] = engine.gather_pairs(groups)
+            engine_times[use_numpy] += time.perf_counter() - start
+        if found:
+            # The hash also gives pairs that only share a cell, numpy only the overlapping ones
+            overlapping = {kind_pair: [(a, b) for a, b in pairs if a.rect.colliderect(b.rect)]
+                           for kind_pair, pairs in found[False].items()}
+            assert found[True] == overlapping, "numpy and the spatial hash found different pairs"
+
+    results = {
+        "ticks": ticks,
+        "loop_tests_per_tick": loop_tests / ticks,
+        "hash_tests_per_tick": hash_tests / ticks,
+        "collisions_per_tick": hits / ticks,
+        "loop_ms_per_tick": loop_time / ticks * 1000,
+        "hash_ms_per_tick": hash_time / ticks * 1000,
+    }
+    if engines:
+        results["engine_hash_ms_per_tick"] = engine_times[False] / ticks * 1000
+        results["engine_numpy_ms_per_tick"] = engine_times[True] / ticks * 1000
+    return results
+
+
+if __name__ == "__main__":
+    # Benchmark: python collision.py
+    for name, value in benchmark().items():
+        print(f"{name:>24}: {value:.3f}" if isinstance(value, float) else f"{name:>24}: {value}")
@@ -0,0 +1,121 @@
+import sys
+import csv
+import time
+import collections
+
+# Constants
+WINDOW = 600  # Frames the rolling table covers, 10 seconds at 60 FPS
+STATS_FILE = "collision_stats.csv"
+REPORT_LINES = 15  # Costliest pairs shown in the printed report
+# Counted per (kind, kind) pair and frame:
+# candidates: pairs the broadphase gave, cached: pairs the coherence cache skipped,
+# tests: pairs that passed the predicate and were not skipped,
+# hits: tests that collided, then the helper calls the tests made,
+# masks_allocated: masks built for a test, seconds: time spent in the tests
+FIELDS = ["candidates", "cached", "tests", "hits", "colliderect", "collide_rect_to_mask", "collide_mask_to_mask",
+          "collide_mask", "collide_swept", "masks_allocated", "seconds"]
+BROADPHASE = ("broadphase", "")  # Pair the candidate search itself is counted under
+
+ENABLED = "--collision-stats" in sys.argv  # Toggled in game with F3, see toggle
+_INDEX = {field: i for i, field in enumerate(FIELDS)}
+_frames = collections.deque(maxlen=WINDOW)  # One dictionary of pair -> counts per frame
+_frame = {}   # pair -> counts of the frame being played
+_pair = None  # Pair whose test is running, the helper calls are counted for it
+
+
+def toggle():
+    """
+    Switches the statistics on or off. The rolling table is kept, so it can
+    still be written after switching off.
+    """
+    global ENABLED
+    ENABLED = not ENABLED
+    print("Collision statistics", "on" if ENABLED else "off")
+
+
+def set_pair(kind_a, kind_b):
+    global _pair
+    _pair = (kind_a, kind_b)
+
+
+def count(field, amount=1):
+    """
+    Adds to a field of the pair being tested, does nothing when disabled.
+    """
+    if ENABLED and _pair is not None:
+        counts = _frame.get(_pair)
+        if counts is None:
+            counts = _frame[_pair] = [0] * len(FIELDS)
+        counts[_INDEX[field]] += amount
+
+
+def record_test(start_time, hit):
+    # One exact test of the pair being tested, started at perf_counter() start_time
+    count("tests")
+    count("seconds", time.perf_counter() - start_time)
+    if hit:
+        count("hits")
+
+
+def end_frame():
+    """
+    Closes the counts of a frame and adds them to the rolling table.
+    """
+    global _frame, _pair
+    if _frame:
+        _frames.append(_frame)
+        _frame = {}
+    elif ENABLED:
+        _frames.append({})
+    _pair = None
+
+
+def get_table():
+    """
+    Sums the frames of the rolling table.
+    :return: (number of frames, list of ((kind_a, kind_b), counts)) with the
+        costliest pairs first.
+    """
+    totals = {}
+    for frame in _frames:
+        for pair, counts in frame.items():
+            total = totals.setdefault(pair, [0] * len(FIELDS))
+            for i, value in enumerate(counts):
+                total[i] += value
+    rows = sorted(totals.items(), key=lambda row: row[1][_INDEX["seconds"]], reverse=True)
+    return len(_frames), rows
+
+
+def write_csv(path=STATS_FILE):
+    """
+    Writes the rolling table, one line per (kind, kind) pair, with the counts
+    per frame, the hit rate and the microseconds per test.
+    """
+    frames, rows = get_table()
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["kind_a", "kind_b", "frames"] + FIELDS[:-1] + ["ms", "tests_per_frame", "hit_rate", "us_per_test"])
+        for (kind_a, kind_b), counts in rows:
+            tests = counts[_INDEX["tests"]]
+            seconds = counts[_INDEX["seconds"]]
+            writer.writerow([kind_a, kind_b, frames] + counts[:-1] + [
+                round(seconds * 1000, 3),
+                round(tests / max(frames, 1), 2),
+                round(counts[_INDEX["hits"]] / tests, 4) if tests else "",
+                round(seconds / tests * 1e6, 2) if tests else ""])
+    print(f"Collision statistics of {frames} frames written to {path}")
+
+
+def print_report(lines=REPORT_LINES):
+    """
+    Prints the costliest pairs of the rolling table.
+    """
+    frames, rows = get_table()
+    print(f"Collisions over {frames} frames:")
+    print(f"{'pair':<32}{'tests/frame':>12}{'hit rate':>10}{'us/test':>10}{'ms':>10}")
+    for (kind_a, kind_b), counts in rows[:lines]:
+        tests = counts[_INDEX["tests"]]
+        seconds = counts[_INDEX["seconds"]]
+        hit_rate = f"{counts[_INDEX['hits']] / tests:.1%}" if tests else "-"
+        per_test = f"{seconds / tests * 1e6:.1f}" if tests else "-"
+        print(f"{kind_a + ' ' + kind_b:<32}{tests / max(frames, 1):>12.2f}{hit_rate:>10}{per_test:>10}{seconds * 1000:>10.2f}")
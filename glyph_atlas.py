@@ -0,0 +1,141 @@
+import pygame
+import string
+from utils import FONTS
+
+# Constants
+CHARSET = string.ascii_letters + string.digits + string.punctuation + " "
+FALLBACK_CHAR = "?"
+OUTLINE_OFFSETS = [(-2, -2), (2, -2), (-2, 2), (2, 2)]
+LINE_CACHE_SIZE = 64  # Composed strings kept per font, HUD text changes rarely
+
+_glyph_fonts = {}  # FONTS key -> GlyphFont
+
+
+class GlyphFont:
+    """
+    Draws text from a sheet of glyphs rasterized once, instead of rasterizing
+    the string with TrueType every frame. A string is composed with one batch of
+    blits from the sheet, and kept while it is drawn again and again (a score
+    or a timer only changes every few frames). No kerning is applied, so only
+    monospaced fonts (the arcade_n sizes) use the sheet. Proportional fonts
+    like ocean_font are drawn with Font.render, which kerns them, and only the
+    composed strings are kept. Characters outside CHARSET are drawn as
+    FALLBACK_CHAR from the sheet.
+    """
+    def __init__(self, font, charset=CHARSET, antialias=True):
+        """
+        :param font: The pygame Font to rasterize.
+        :param charset: Characters to put in the sheet.
+        :param antialias: Same meaning as for Font.render.
+        """
+        self.font = font
+        self.antialias = antialias
+        self.height = font.get_height()
+        self.areas = {}     # char -> area of the glyph in the sheet
+        self.advances = {}  # char -> horizontal distance to the next glyph
+        self.sheet = None
+        advances = {metrics[4] for metrics in font.metrics(charset) if metrics}
+        self.monospaced = len(advances) == 1  # Draws the same as Font.render from the sheet
+        if self.monospaced:
+            glyphs = [font.render(char, antialias, (255, 255, 255)) for char in charset]
+            self.sheet = pygame.Surface((sum(glyph.get_width() for glyph in glyphs), self.height), pygame.SRCALPHA)
+            x = 0
+            for char, glyph, metrics in zip(charset, glyphs, font.metrics(charset)):
+                self.sheet.blit(glyph, (x, 0))
+                self.areas[char] = pygame.Rect(x, 0, glyph.get_width(), glyph.get_height())
+                self.advances[char] = metrics[4] if metrics else glyph.get_width()
+                x += glyph.get_width()
+            self.sheet = self.sheet.convert_alpha()
+        self.colored_sheets = {}  # color -> sheet with the glyphs in that color
+        self.lines = {}           # (text, color) -> composed Surface, oldest first
+
+    def get_sheet(self, color):
+        """
+        Returns the glyph sheet in a color, made once per color from the white glyphs.
+        """
+        color = tuple(color)
+        sheet = self.colored_sheets.get(color)
+        if sheet is None:
+            sheet = self.sheet.copy()
+            sheet.fill(pygame.Color(*color[:3]), special_flags=pygame.BLEND_RGB_MULT)
+            self.colored_sheets[color] = sheet
+        return sheet
+
+    def size(self, text):
+        """
+        Returns (width, height) of text, like Font.size.
+        """
+        if not self.monospaced:
+            return self.font.size(text)
+        return sum(self.advances.get(char, self.advances[FALLBACK_CHAR]) for char in text), self.height
+
+    def get_rect(self, text, **kwargs):
+        """
+        Returns the Rect text would cover, positioned with keyword arguments
+        like Surface.get_rect, e.g. get_rect("Score", center=(512, 30)).
+        """
+        rect = pygame.Rect((0, 0), self.size(text))
+        for attribute, value in kwargs.items():
+            setattr(rect, attribute, value)
+        return rect
+
+    def render(self, text, color):
+        """
+        Returns a Surface with text in color, like Font.render with antialiasing.
+        The Surface is shared by later calls with the same text and color.
+        """
+        key = (text, tuple(color))
+        line = self.lines.get(key)
+        if line is None:
+            if self.monospaced:
+                line = self.compose(text, color)
+            else:
+                line = self.font.render(text, self.antialias, color)
+            if len(self.lines) >= LINE_CACHE_SIZE:
+                del self.lines[next(iter(self.lines))]
+            self.lines[key] = line
+        return line
+
+    def compose(self, text, color):
+        """
+        Blits the glyphs of text from the sheet in color onto a new Surface.
+        """
+        sheet = self.get_sheet(color)
+        line = pygame.Surface(self.size(text), pygame.SRCALPHA)
+        blits = []
+        x = 0
+        for char in text:
+            if char not in self.areas:
+                char = FALLBACK_CHAR
+            blits.append((sheet, (x, 0), self.areas[char]))
+            x += self.advances[char]
+        # Copies the glyphs as they are instead of blending them with the empty line
+        line.blits([blit + (pygame.BLEND_RGBA_MAX,) for blit in blits], doreturn=False)
+        return line
+
+    def draw(self, surface, text, color, position):
+        """
+        Draws text on surface with its top left corner at position.
+        :return: The Rect that was drawn to.
+        """
+        return surface.blit(self.render(text, color), position)
+
+    def draw_outlined(self, surface, text, color, outline_color, center):
+        """
+        Draws text centered on center, over four copies of it in outline_color.
+        """
+        rect = self.get_rect(text, center=center)
+        for dx, dy in OUTLINE_OFFSETS:
+            self.draw(surface, text, outline_color, (rect.x + dx, rect.y + dy))
+        return self.draw(surface, text, color, rect.topleft)
+
+
+def get_glyph_font(name):
+    """
+    Returns the GlyphFont of a font of FONTS, built on first use.
+    :param name: Key of the font in FONTS, e.g. "arcade_n_16".
+    """
+    glyph_font = _glyph_fonts.get(name)
+    if glyph_font is None:
+        glyph_font = _glyph_fonts[name] = GlyphFont(FONTS[name])
+    return glyph_font
@@ -1,12 +1,13 @@
 import pygame
 import random
 from utils import SCREEN_WIDTH, SCREEN_HEIGHT  # Assuming you have a config.py with constants
+from masks import get_mask
+from collision import teleported
+from arena import ARENA
 
 class GreenFish(pygame.sprite.Sprite):
     EDGE_PADDING = 100
-    WALL_PADDING = 32
-    BOTTOM_WALL_Y = SCREEN_HEIGHT - 64
-    RIGHT_WALL_X = SCREEN_WIDTH - 32
+    WALL_LIMITS = ARENA.get_limits(bottom=SCREEN_HEIGHT - 64)
     MOVE_SPEED = 3
     INCREMENTAL_SCORE = 10
     BIG_FISH_SCORE_THRESHOLD = 40
@@ -33,6 +34,8 @@ class GreenFish(pygame.sprite.Sprite):
         
         self.body_mask = None
         self.face_mask = None
+        self.image_name = "spr_green_fish_right"
+        self.mask = get_mask(self.image_name)  # Mask of the image shown
         
         self.visible = False  # Initially invisible
         # Initialize the alpha surface here
@@ -88,21 +91,21 @@ class GreenFish(pygame.sprite.Sprite):
     def update_image(self):
         if self.is_big:
             if self.direction[0] < 0:  # Moving left
-                self.image = self.images["spr_big_green_fish_left"]
-                self.body_mask = pygame.mask.from_surface(self.images["spr_big_green_fish_left"])
-                self.face_mask = pygame.mask.from_surface(self.images["spr_big_green_fish_left_face"])
+                name = "spr_big_green_fish_left"
             else:  # Moving right
-                self.image = self.images["spr_big_green_fish_right"]
-                self.body_mask = pygame.mask.from_surface(self.images["spr_big_green_fish_right"])
-                self.face_mask = pygame.mask.from_surface(self.images["spr_big_green_fish_right_face"])
+                name = "spr_big_green_fish_right"
+            self.face_mask = get_mask(name + "_face")
         else:
             if self.direction[0] < 0:  # Moving left
-                self.image = self.images["spr_green_fish_left"]
-                self.body_mask = pygame.mask.from_surface(self.images["spr_green_fish_left"])
+                name = "spr_green_fish_left"
             else:  # Moving right
-                self.image = self.images["spr_green_fish_right"]
-                self.body_mask = pygame.mask.from_surface(self.images["spr_green_fish_right"])
-                
+                name = "spr_green_fish_right"
+        self.image = self.images[name]
+        self.body_mask = self.mask = get_mask(name)
+        if name == self.image_name:
+            return  # Same image, the alpha surface is still right
+        self.image_name = name
+
         self.alpha_surface = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
         self.alpha_surface.blit(self.image, (0, 0))
         self.alpha_surface.set_alpha(self.alpha)
@@ -118,20 +121,13 @@ class GreenFish(pygame.sprite.Sprite):
             self.stop_timer = pygame.time.get_ticks() + self.TURN_TIME_MS
 
 
-    def collision_with_wall(self, rect):
-        if self.rect.colliderect(rect):
+    def collision_with_wall(self):
+        if ARENA.touches(self.rect):
             self.change_direction()
-            self.move_away_from_wall(rect)
-
-    def move_away_from_wall(self, rect):
-        if self.rect.left < self.WALL_PADDING:  # Left wall
-            self.rect.left = self.WALL_PADDING
-        elif self.rect.right > self.RIGHT_WALL_X:  # Right wall
-            self.rect.right = self.RIGHT_WALL_X
-        if self.rect.top < self.WALL_PADDING:  # Top wall
-            self.rect.top = self.WALL_PADDING
-        elif self.rect.bottom > self.BOTTOM_WALL_Y:  # Bottom wall
-            self.rect.bottom = self.BOTTOM_WALL_Y
+            self.move_away_from_wall()
+
+    def move_away_from_wall(self):
+        ARENA.push_inside(self.rect, self.WALL_LIMITS)
 
     def collision_with_red_fish(self):
         self.big_green_fish_score += self.INCREMENTAL_SCORE
@@ -149,6 +145,7 @@ class GreenFish(pygame.sprite.Sprite):
         # Reposition the sprite
         self.rect.topleft = (random.randrange(self.EDGE_PADDING, SCREEN_WIDTH - self.EDGE_PADDING),
                              random.randrange(self.EDGE_PADDING, SCREEN_HEIGHT - self.EDGE_PADDING))
+        teleported(self)
 
         # Initialize the fade-in process
         self.fading_in = True
@@ -174,6 +171,8 @@ class GreenFish(pygame.sprite.Sprite):
         # Set the image to the small green fish and update the alpha surface
         self.original_image = self.images["spr_green_fish_right"]  # Assuming this is the default small fish image
         self.image = self.original_image
+        self.image_name = "spr_green_fish_right"
+        self.mask = get_mask(self.image_name)
 
         # Update the alpha surface with the new small fish image
         self.alpha_surface = pygame.Surface(self.original_image.get_size(), pygame.SRCALPHA)
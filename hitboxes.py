@@ -0,0 +1,361 @@
+import pygame
+import os
+import sys
+import json
+import math
+import random
+from asset_pack import asset_exists, asset_stat, read_asset
+
+# Constants
+HITBOX_FILE = os.path.join("sprites", "hitboxes.json")
+MAX_CAPSULES = 3   # Capsules fitted to one image at most
+TARGET_IOU = 0.85  # Fewer capsules are kept once they cover the mask this well
+MIN_IOU = 0.7      # Images the capsules fit worse than this keep their mask
+RADIUS_QUANTILE = 0.95  # Share of the pixels of a slice inside its capsule's radius
+REPORT_OFFSETS = 40  # Positions tested per pair of images in the accuracy report
+
+PRECISE = "--precise-collisions" in sys.argv  # Swept tests on masks instead of capsules, toggled in game with F5
+
+_stored = None  # name -> entry of HITBOX_FILE
+
+
+def toggle_precise():
+    """
+    Switches the swept collision tests between capsules and pixel masks.
+    """
+    global PRECISE
+    PRECISE = not PRECISE
+    print("Precise collisions", "on" if PRECISE else "off")
+
+
+def segments_distance_squared(p1, q1, p2, q2):
+    """
+    Returns the squared distance between the segments p1-q1 and p2-q2.
+    """
+    d1x, d1y = q1[0] - p1[0], q1[1] - p1[1]
+    d2x, d2y = q2[0] - p2[0], q2[1] - p2[1]
+    rx, ry = p1[0] - p2[0], p1[1] - p2[1]
+    a = d1x * d1x + d1y * d1y
+    e = d2x * d2x + d2y * d2y
+    f = d2x * rx + d2y * ry
+    if a == 0 and e == 0:
+        return rx * rx + ry * ry  # Two points
+    if a == 0:
+        s, t = 0.0, min(max(f / e, 0.0), 1.0)
+    else:
+        c = d1x * rx + d1y * ry
+        if e == 0:
+            s, t = min(max(-c / a, 0.0), 1.0), 0.0
+        else:
+            # Closest points of the two lines, clamped to the segments
+            b = d1x * d2x + d1y * d2y
+            denominator = a * e - b * b
+            s = min(max((b * f - c * e) / denominator, 0.0), 1.0) if denominator else 0.0
+            t = (b * s + f) / e
+            if t < 0:
+                s, t = min(max(-c / a, 0.0), 1.0), 0.0
+            elif t > 1:
+                s, t = min(max((b - c) / a, 0.0), 1.0), 1.0
+    dx = rx + d1x * s - d2x * t
+    dy = ry + d1y * s - d2y * t
+    return dx * dx + dy * dy
+
+
+def hitboxes_overlap(hitbox1, hitbox2, offset):
+    """
+    Returns True if a capsule of hitbox2 placed at offset from hitbox1
+    overlaps a capsule of hitbox1, like masks_overlap for masks.
+    A hitbox is a tuple of capsules (x1, y1, x2, y2, radius, left, top, right,
+    bottom) in pixels of the image: a circle when both ends are the same
+    point, with the box around it so most pairs of capsules that are apart
+    never reach segments_distance_squared.
+    """
+    dx, dy = offset
+    for x1, y1, x2, y2, radius1, left1, top1, right1, bottom1 in hitbox1:
+        for x3, y3, x4, y4, radius2, left2, top2, right2, bottom2 in hitbox2:
+            if left2 + dx >= right1 or right2 + dx <= left1 or top2 + dy >= bottom1 or bottom2 + dy <= top1:
+                continue
+            reach = radius1 + radius2
+            distance = segments_distance_squared((x1, y1), (x2, y2), (x3 + dx, y3 + dy), (x4 + dx, y4 + dy))
+            if distance < reach * reach:
+                return True
+    return False
+
+
+def hitboxes_swept_overlap(hitbox1, hitbox2, offset, motion):
+    """
+    Returns True if hitbox2, moving in a straight line from offset to
+    offset + motion, overlaps hitbox1 on the way. A capsule of hitbox2 sweeps
+    a parallelogram widened by its radius, so each pair of capsules is one
+    point in parallelogram test and four segment distances, instead of one
+    test per pixel of movement.
+    """
+    dx, dy = offset
+    mx, my = motion
+    for x1, y1, x2, y2, radius1, left1, top1, right1, bottom1 in hitbox1:
+        for x3, y3, x4, y4, radius2, left2, top2, right2, bottom2 in hitbox2:
+            if (left2 + dx + min(mx, 0) >= right1 or right2 + dx + max(mx, 0) <= left1 or
+                    top2 + dy + min(my, 0) >= bottom1 or bottom2 + dy + max(my, 0) <= top1):
+                continue
+            reach = radius1 + radius2
+            # Corners of the parallelogram the segment of the capsule sweeps
+            a = (x3 + dx, y3 + dy)
+            b = (x4 + dx, y4 + dy)
+            c = (b[0] + mx, b[1] + my)
+            d = (a[0] + mx, a[1] + my)
+            # An end of the other segment inside it, from a = a + u * (b - a) + v * motion
+            ex, ey = b[0] - a[0], b[1] - a[1]
+            cross = ex * my - ey * mx
+            if cross:
+                px, py = x1 - a[0], y1 - a[1]
+                u = (px * my - py * mx) / cross
+                v = (ex * py - ey * px) / cross
+                if 0 <= u <= 1 and 0 <= v <= 1:
+                    return True
+            # Otherwise the segment crosses or passes near one of its sides
+            for p, q in ((a, b), (b, c), (c, d), (d, a)):
+                if segments_distance_squared((x1, y1), (x2, y2), p, q) < reach * reach:
+                    return True
+    return False
+
+
+def load_hitbox_file(hitbox_file=HITBOX_FILE):
+    """
+    Reads the capsules written by build_hitbox_file. Entries whose source
+    sprite changed since the build are dropped, those images keep their mask.
+    """
+    global _stored
+    _stored = {}
+    if not asset_exists(hitbox_file):
+        return
+    try:
+        data = json.loads(read_asset(hitbox_file))
+    except (OSError, ValueError) as message:
+        print('Cannot load hitbox file:', hitbox_file, message)
+        return
+    for name, entry in data.get("hitboxes", {}).items():
+        if entry["source"] is not None and asset_stat(entry["source"]) == entry["stat"]:
+            _stored[name] = entry
+
+
+def get_hitbox(name, flip=False, size=None):
+    """
+    Returns the capsules of an image of IMAGES, mirrored and scaled like
+    get_image_variant, or None if it has none (the mask is used instead).
+    Scaling by different factors on x and y scales the radius by their mean.
+    :param name: Key of the image in IMAGES.
+    :param flip: True for the horizontally mirrored image.
+    :param size: (width, height) of the scaled image, None for the image size.
+    """
+    if _stored is None:
+        load_hitbox_file()
+    entry = _stored.get(name)
+    if entry is None:
+        return None
+    width, height = entry["size"]
+    scale_x, scale_y = (1, 1) if size is None else (size[0] / width, size[1] / height)
+    scale_radius = (scale_x + scale_y) / 2
+    hitbox = []
+    for x1, y1, x2, y2, radius in entry["capsules"]:
+        if flip:
+            x1, x2 = width - x1, width - x2
+        x1, y1, x2, y2, radius = x1 * scale_x, y1 * scale_y, x2 * scale_x, y2 * scale_y, radius * scale_radius
+        hitbox.append((x1, y1, x2, y2, radius, min(x1, x2) - radius, min(y1, y2) - radius,
+                       max(x1, x2) + radius, max(y1, y2) + radius))
+    return tuple(hitbox)
+
+
+def mask_points(mask):
+    """
+    Returns the centers of the set pixels of a mask.
+    """
+    width, height = mask.get_size()
+    return [(x + 0.5, y + 0.5) for y in range(height) for x in range(width) if mask.get_at((x, y))]
+
+
+def fit_capsules(points, count):
+    """
+    Fits count capsules to points, one per equal slice along the principal
+    axis of the points: each capsule follows the middle of its slice, with a
+    radius covering RADIUS_QUANTILE of its pixels.
+    :return: List of capsules (x1, y1, x2, y2, radius).
+    """
+    n = len(points)
+    center_x = sum(x for x, y in points) / n
+    center_y = sum(y for x, y in points) / n
+    xx = sum((x - center_x) ** 2 for x, y in points) / n
+    yy = sum((y - center_y) ** 2 for x, y in points) / n
+    xy = sum((x - center_x) * (y - center_y) for x, y in points) / n
+    angle = 0.5 * math.atan2(2 * xy, xx - yy)
+    ux, uy = math.cos(angle), math.sin(angle)  # Principal axis
+    vx, vy = -uy, ux
+    projected = [((x - center_x) * ux + (y - center_y) * uy, (x - center_x) * vx + (y - center_y) * vy)
+                 for x, y in points]
+    t_min = min(t for t, s in projected)
+    t_max = max(t for t, s in projected)
+    length = (t_max - t_min) / count
+    capsules = []
+    for i in range(count):
+        start, end = t_min + i * length, t_min + (i + 1) * length
+        part = [(t, s) for t, s in projected if start <= t <= end]
+        if not part:
+            continue
+        middle = sum(s for t, s in part) / len(part)
+        distances = sorted(abs(s - middle) for t, s in part)
+        radius = max(distances[int(RADIUS_QUANTILE * (len(distances) - 1))], 0.5)
+        # The end caps go inside the shape at its two ends, slices in between join up
+        t1 = start + radius if i == 0 else start
+        t2 = end - radius if i == count - 1 else end
+        if t1 > t2:
+            t1 = t2 = (start + end) / 2
+            radius = max(radius, (end - start) / 2)
+        capsules.append(tuple(round(value, 2) for value in (
+            center_x + t1 * ux + middle * vx, center_y + t1 * uy + middle * vy,
+            center_x + t2 * ux + middle * vx, center_y + t2 * uy + middle * vy, radius)))
+    return capsules
+
+
+def capsules_to_mask(size, capsules):
+    """
+    Rasterizes capsules: a pixel is set when its center is inside one of them.
+    """
+    mask = pygame.mask.Mask(size)
+    width, height = size
+    for x1, y1, x2, y2, radius in capsules:
+        left = max(0, int(min(x1, x2) - radius))
+        right = min(width, int(max(x1, x2) + radius) + 1)
+        top = max(0, int(min(y1, y2) - radius))
+        bottom = min(height, int(max(y1, y2) + radius) + 1)
+        for y in range(top, bottom):
+            for x in range(left, right):
+                center = (x + 0.5, y + 0.5)
+                if segments_distance_squared((x1, y1), (x2, y2), center, center) < radius * radius:
+                    mask.set_at((x, y))
+    return mask
+
+
+def get_iou(mask1, mask2):
+    """
+    Returns the intersection over union of two masks of the same size.
+    """
+    overlap = mask1.overlap_area(mask2, (0, 0))
+    union = mask1.count() + mask2.count() - overlap
+    return overlap / union if union else 1.0
+
+
+def fit_hitbox(mask):
+    """
+    Fits 1 to MAX_CAPSULES capsules to a mask, stopping at the first count
+    that reaches TARGET_IOU.
+    :return: (capsules, intersection over union with the mask)
+    """
+    points = mask_points(mask)
+    best = ([], 0.0)
+    if not points:
+        return best
+    for count in range(1, MAX_CAPSULES + 1):
+        capsules = fit_capsules(points, count)
+        iou = get_iou(mask, capsules_to_mask(mask.get_size(), capsules))
+        if iou > best[1]:
+            best = (capsules, iou)
+        if iou >= TARGET_IOU:
+            break
+    return best
+
+
+def get_hitbox_names(images):
+    """
+    Returns the images that get capsules: every *_face image and the body
+    image of the same creature.
+    """
+    names = []
+    for name in dict.fromkeys([*images.loaders, *images.keys()]):  # Registered or loaded
+        if "_face" in name:
+            names.append(name)
+            body = name.replace("_face", "")
+            if body in images:
+                names.append(body)
+    return list(dict.fromkeys(names))
+
+
+def build_hitbox_file(hitbox_file=HITBOX_FILE):
+    """
+    Offline step: fits capsules to the face and body images and writes those
+    that fit at least MIN_IOU to hitbox_file. IMAGES must have all assets registered.
+    :return: Dictionary of name -> (number of capsules, intersection over union), for every image tried.
+    """
+    from utils import IMAGES
+    from masks import get_mask, get_source_file
+    entries = {}
+    fits = {}
+    for name in get_hitbox_names(IMAGES):
+        capsules, iou = fit_hitbox(get_mask(name))
+        fits[name] = (len(capsules), iou)
+        if iou < MIN_IOU:
+            continue
+        source = get_source_file(name)
+        entries[name] = {
+            "size": list(IMAGES[name].get_size()),
+            "source": source,
+            "stat": asset_stat(source),
+            "iou": round(iou, 4),
+            "capsules": capsules,
+        }
+    with open(hitbox_file, "w") as f:
+        json.dump({"version": 1, "hitboxes": entries}, f, indent=1)
+    return fits
+
+
+def accuracy_report(fits):
+    """
+    Prints how the capsules fit each image, and how often capsule tests agree
+    with mask tests: every image with capsules is placed at REPORT_OFFSETS
+    random positions around each of the others, and both tests are compared.
+    :param fits: Output of build_hitbox_file.
+    """
+    global _stored
+    from masks import get_mask
+    _stored = None  # Read the file just written
+    hitboxes = {name: get_hitbox(name) for name in fits}
+    hitboxes = {name: hitbox for name, hitbox in hitboxes.items() if hitbox is not None}
+    random.seed(0)
+    print(f"{'image':<34}{'capsules':>9}{'iou':>8}{'agree':>9}{'extra hits':>12}{'missed':>9}")
+    totals = [0, 0, 0, 0]
+    for name, (count, iou) in fits.items():
+        if name not in hitboxes:
+            print(f"{name:<34}{count:>9}{iou:>8.3f}{'mask kept':>30}")
+            continue
+        mask = get_mask(name)
+        results = [0, 0, 0, 0]  # tests, agreements, capsules only, mask only
+        for other, other_hitbox in hitboxes.items():
+            other_mask = get_mask(other)
+            width, height = mask.get_size()
+            other_width, other_height = other_mask.get_size()
+            for _ in range(REPORT_OFFSETS):
+                offset = (random.randrange(-other_width + 1, width), random.randrange(-other_height + 1, height))
+                by_capsules = hitboxes_overlap(hitboxes[name], other_hitbox, offset)
+                by_masks = mask.overlap(other_mask, offset) is not None
+                results[0] += 1
+                results[1] += by_capsules == by_masks
+                results[2] += by_capsules and not by_masks
+                results[3] += by_masks and not by_capsules
+        totals = [total + result for total, result in zip(totals, results)]
+        tests = results[0]
+        print(f"{name:<34}{count:>9}{iou:>8.3f}{results[1] / tests:>9.1%}{results[2] / tests:>12.1%}{results[3] / tests:>9.1%}")
+    if totals[0]:
+        print(f"{'all':<34}{'':>17}{totals[1] / totals[0]:>9.1%}{totals[2] / totals[0]:>12.1%}{totals[3] / totals[0]:>9.1%}")
+
+
+if __name__ == "__main__":
+    # Build step: python hitboxes.py
+    from utils import IMAGES, register_assets
+    import pixel_cache
+    from assets import IMAGE_ASSETS, SOUND_ASSETS, FONT_ASSETS, IMAGE_SIZES, register_derived_images
+    pygame.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    pixel_cache.set_display_format()
+    register_assets(IMAGE_ASSETS, SOUND_ASSETS, FONT_ASSETS, IMAGE_SIZES)
+    register_derived_images(IMAGES)
+    fits = build_hitbox_file()
+    print(f"Wrote {sum(iou >= MIN_IOU for count, iou in fits.values())} hitboxes to {HITBOX_FILE}")
+    accuracy_report(fits)
@@ -1,6 +1,8 @@
 import pygame
 import random
 from utils import SCREEN_WIDTH, SCREEN_HEIGHT
+from masks import get_mask
+from collision import teleported
 
 class Jellyfish(pygame.sprite.Sprite):
     EDGE_PADDING = 50
@@ -15,6 +17,7 @@ class Jellyfish(pygame.sprite.Sprite):
         super().__init__()
         self.images = images
         self.image = images["spr_jellyfish_1"]
+        self.mask = get_mask("spr_jellyfish_1")
         self.rect = self.image.get_rect()
         all_sprites.add(self)
         self.return_back = False
@@ -37,9 +40,11 @@ class Jellyfish(pygame.sprite.Sprite):
         self.jellyfish_animate_timer = (self.jellyfish_animate_timer + 1) % 28
         animation_stage = self.jellyfish_animate_timer // 2
         if animation_stage < 7:
-            self.image = self.images[f"spr_jellyfish_{animation_stage + 1}"]
+            name = f"spr_jellyfish_{animation_stage + 1}"
         else:
-            self.image = self.images[f"spr_jellyfish_{14 - animation_stage}"]
+            name = f"spr_jellyfish_{14 - animation_stage}"
+        self.image = self.images[name]
+        self.mask = get_mask(name)
 
 
     def move_jellyfish(self):
@@ -61,6 +66,7 @@ class Jellyfish(pygame.sprite.Sprite):
         self.jellyfish_random_spawn = random.randrange(Jellyfish.MIN_SPAWN_TIME,
                                                        Jellyfish.MAX_SPAWN_TIME)
         self.rect.topleft = self.random_spawn_position()
+        teleported(self)
         self.jellyfish_timer = 0  # Reset timer for the next cycle
 
     def random_spawn_position(self):
@@ -1,13 +1,16 @@
+# Imported first so the startup profile covers the rest of this module
+import startup_profiler
 import asyncio
 import pygame
 import os
 import random
 import sys
+import time
 import platform
 
 from pygame.constants import RLEACCEL
 import datetime
-from utils import IMAGES, SOUNDS, FONTS, load_sound, load_image, load_font, SCREEN_WIDTH, SCREEN_HEIGHT, FPS, TOP_UI_LAYER_HEIGHT
+from utils import IMAGES, SOUNDS, FONTS, load_sound, load_image, load_font, load_atlas, load_registered, load_music, register_assets, SCREEN_WIDTH, SCREEN_HEIGHT, FPS, TOP_UI_LAYER_HEIGHT
 from shark import Shark
 from red_fish import RedFish
 from green_fish import GreenFish
@@ -25,300 +28,124 @@ from seahorse import Seahorse
 from jellyfish import Jellyfish
 from star_powerup import StarPowerup
 from player import Player
+from phases import PhaseAssets
+from glyph_atlas import get_glyph_font
+from collision import CollisionEngine, CollisionRule, RECT, teleported
+import collision_stats
+import hitboxes
+import pixel_cache
+from arena import ARENA
+from asset_pack import open_asset
+from assets import IMAGE_ASSETS, SOUND_ASSETS, FONT_ASSETS, DEFERRED_ASSETS, START_MENU_ASSETS, IMAGE_SIZES, PHASE_ASSETS, MUSIC_FILE, register_derived_images
 import math
+startup_profiler.record("imports", "module", startup_profiler.START)
 
 
 
 # Initialize Pygame
-pygame.init()
+with startup_profiler.span("pygame.init", "display"):
+    pygame.init()
 is_mobile = platform.system() == "Linux" and "ANDROID_ARGUMENT" in os.environ
 
-# Set default screen dimensions for landscape mode
-SCREEN_WIDTH, SCREEN_HEIGHT = 1024, 600
-
-# Detect the actual screen size and adjust for landscape if on mobile
+# The game always uses the SCREEN_WIDTH x SCREEN_HEIGHT geometry of utils.py,
+# the same one every entity module sees.
 if is_mobile:
-    # Use the actual screen dimensions for fullscreen
-    real_width = pygame.display.Info().current_w
-    real_height = pygame.display.Info().current_h
-
-    # Force landscape: if in portrait, swap width and height
-    if real_height > real_width:
-        SCREEN_WIDTH, SCREEN_HEIGHT = real_height, real_width
-    else:
-        SCREEN_WIDTH, SCREEN_HEIGHT = real_width, real_height
-
-    # Set fullscreen on mobile
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREEN)
+    # Fullscreen on mobile: SDL scales the finished frame to the device
+    # resolution on the GPU, keeping the aspect ratio (landscape)
+    with startup_profiler.span("set_mode", "display"):
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREEN | pygame.SCALED)
 
 else:
     # Default window mode for PC
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    with startup_profiler.span("set_mode", "display"):
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+pixel_cache.set_display_format()  # Before any image is loaded, see pixel_cache.py
 pygame.display.set_caption("Bermuda Frenzy")
-gameicon = pygame.image.load("sprites/red_fish.png")
+gameicon = pygame.image.load(open_asset("sprites/red_fish.png"), "sprites/red_fish.png")
 pygame.display.set_icon(gameicon)
 clock = pygame.time.Clock()
 font = pygame.font.SysFont(None, 36)
 DEBUG = False
 ZOOM_FACTOR = 1.5 # Recommended to be 1.5
+LOADING_BUDGET = 0.008  # Seconds spent loading assets per frame while they stream in
 print("Current working directory:", os.getcwd())
 
 
-def load_all_assets():
-    load_image("sprites/coral_reef.png", "spr_wall", True)
-    load_image("sprites/player_left.png", "player_left", True)
-    load_image("sprites/player_down_left.png", "player_down_left", True)
-    load_image("sprites/player_down.png", "player_down", True)
-    load_image("sprites/player_down_right.png", "player_down_right", True)
-    load_image("sprites/player_right.png", "player_right", True)
-    load_image("sprites/player_up_right.png", "player_up_right", True)
-    load_image("sprites/player_up.png", "player_up", True)
-    load_image("sprites/player_up_left.png", "player_up_left", True)
-    # Load heart image
-    load_image("sprites/heart.png", "heart", True)
-
-    load_image("sprites/player_left_munch.png", "player_left_munch", True)
-    load_image("sprites/player_down_left_munch.png", "player_down_left_munch", True)
-    load_image("sprites/player_down_munch.png", "player_down_munch", True)
-    load_image("sprites/player_down_right_munch.png", "player_down_right_munch", True)
-    load_image("sprites/player_right_munch.png", "player_right_munch", True)
-    load_image("sprites/player_up_right_munch.png", "player_up_right_munch", True)
-    load_image("sprites/player_up_munch.png", "player_up_munch", True)
-    load_image("sprites/player_up_left_munch.png", "player_up_left_munch", True)
-    
-    load_image("sprites/player_left_face.png", "player_left_face", True)
-    load_image("sprites/player_down_left_face.png", "player_down_left_face", True)
-    load_image("sprites/player_down_face.png", "player_down_face", True)
-    load_image("sprites/player_down_right_face.png", "player_down_right_face", True)
-    load_image("sprites/player_right_face.png", "player_right_face", True)
-    load_image("sprites/player_up_right_face.png", "player_up_right_face", True)
-    load_image("sprites/player_up_face.png", "player_up_face", True)
-    load_image("sprites/player_up_left_face.png", "player_up_left_face", True)
-    
-    load_image("sprites/player_left_gold.png", "player_left_gold", True)
-    load_image("sprites/player_down_left_gold.png", "player_down_left_gold", True)
-    load_image("sprites/player_down_gold.png", "player_down_gold", True)
-    load_image("sprites/player_down_right_gold.png", "player_down_right_gold", True)
-    load_image("sprites/player_right_gold.png", "player_right_gold", True)
-    load_image("sprites/player_up_right_gold.png", "player_up_right_gold", True)
-    load_image("sprites/player_up_gold.png", "player_up_gold", True)
-    load_image("sprites/player_up_left_gold.png", "player_up_left_gold", True)
-    
-    load_image("sprites/red_fish.png", "spr_red_fish", True)
-    load_image("sprites/green_fish.png", "spr_green_fish_right", True)
-    IMAGES["spr_green_fish_left"] = pygame.transform.flip(IMAGES["spr_green_fish_right"], 1, 0)
-    
-    load_image("sprites/big_green_fish_left.png", "spr_big_green_fish_left", True)
-    load_image("sprites/big_green_fish_left_face.png", "spr_big_green_fish_left_face", True)
-    load_image("sprites/big_green_fish_right.png", "spr_big_green_fish_right", True)
-    load_image("sprites/big_green_fish_right_face.png", "spr_big_green_fish_right_face", True)
-    load_image("sprites/big_green_fish_turning.png", "spr_big_green_fish_turning", True)
-
-    
-    load_image("sprites/silver_fish.png", "spr_silver_fish", True)
-    load_image("sprites/snake_1.png", "spr_snake_1", True)
-    load_image("sprites/snake_2.png", "spr_snake_2", True)
-    load_image("sprites/snake_3.png", "spr_snake_3", True)
-    load_image("sprites/snake_4.png", "spr_snake_4", True)
-    load_image("sprites/seahorse.png", "spr_seahorse", True)
-    load_image("sprites/jellyfish_1.png", "spr_jellyfish_1", True)
-    load_image("sprites/jellyfish_2.png", "spr_jellyfish_2", True)
-    load_image("sprites/jellyfish_3.png", "spr_jellyfish_3", True)
-    load_image("sprites/jellyfish_4.png", "spr_jellyfish_4", True)
-    load_image("sprites/jellyfish_5.png", "spr_jellyfish_5", True)
-    load_image("sprites/jellyfish_6.png", "spr_jellyfish_6", True)
-    load_image("sprites/jellyfish_7.png", "spr_jellyfish_7", True)
-    load_image("sprites/shark_left.png", "spr_shark_left", True)
-    load_image("sprites/shark_face_left.png", "spr_shark_face_left", True)
-    load_image("sprites/shark_face_right.png", "spr_shark_face_right", True)
-    load_image("sprites/shark_right.png", "spr_shark_right", True)
-    load_image("sprites/shark_turning.png", "spr_shark_turning", True)
-    
-    # Load and scale the images directly
-    load_image("sprites/bright_blue_fish_right.png", "spr_bright_blue_fish_right", True)
-    IMAGES["spr_bright_blue_fish_right"] = pygame.transform.smoothscale(IMAGES["spr_bright_blue_fish_right"], (300, 200))
-
-    load_image("sprites/bright_blue_fish_right_face.png", "spr_bright_blue_fish_right_face", True)
-    IMAGES["spr_bright_blue_fish_right_face"] = pygame.transform.smoothscale(IMAGES["spr_bright_blue_fish_right_face"], (300, 200))
-
-    load_image("sprites/bright_blue_fish_left.png", "spr_bright_blue_fish_left", True)
-    IMAGES["spr_bright_blue_fish_left"] = pygame.transform.smoothscale(IMAGES["spr_bright_blue_fish_left"], (300, 200))
-
-    load_image("sprites/bright_blue_fish_left_face.png", "spr_bright_blue_fish_left_face", True)
-    IMAGES["spr_bright_blue_fish_left_face"] = pygame.transform.smoothscale(IMAGES["spr_bright_blue_fish_left_face"], (300, 200))
-
-    load_image("sprites/starfish_1.png", "spr_star_1", True)
-    load_image("sprites/starfish_2.png", "spr_star_2", True)
-    load_image("sprites/starfish_3.png", "spr_star_3", True)
-    load_image("sprites/arrow_warning_red.png", "arrow_warning_red_top", True)
-    load_image("sprites/arrow_warning_silver.png", "arrow_warning_silver_top", True)
-    load_image("sprites/arrow_warning_blue_left.png", "arrow_warning_blue_left", True)
-    load_image("sprites/arrow_warning_blue_right.png", "arrow_warning_blue_right", True)
-
-    load_image("sprites/seaweed_middle.png", "spr_seaweed", True)
-    load_image("sprites/seaweed_left.png", "spr_seaweed_left", True)
-    load_image("sprites/seaweed_right.png", "spr_seaweed_right", True)
-    
-    load_image("sprites/rainbow_fish_left.png", "spr_rainbow_fish_left", True)
-    load_image("sprites/rainbow_fish_left_face.png", "spr_rainbow_fish_left_face", True)
-    load_image("sprites/rainbow_fish_turning.png", "spr_rainbow_fish_turning", True)
-    load_image("sprites/rainbow_fish_right.png", "spr_rainbow_fish_right", True)
-    load_image("sprites/rainbow_fish_right_face.png", "spr_rainbow_fish_right_face", True)
-
-    # arrow keys
-    load_image("sprites/unpressed_arrow_up.png", "spr_unpressed_arrow_up", True, 128)
-    load_image("sprites/pressed_arrow_up.png", "spr_pressed_arrow_up", True, 128)
-    load_image("sprites/pressed_arrow_up_right.png", "spr_pressed_arrow_up_right", True, 128)
-    load_image("sprites/pressed_arrow_right.png", "spr_pressed_arrow_right", True, 128)
-    load_image("sprites/pressed_arrow_down_right.png", "spr_pressed_arrow_down_right", True, 128)
-    load_image("sprites/pressed_arrow_down.png", "spr_pressed_arrow_down", True, 128)
-    load_image("sprites/pressed_arrow_down_left.png", "spr_pressed_arrow_down_left", True, 128)
-    load_image("sprites/pressed_arrow_left.png", "spr_pressed_arrow_left", True, 128)
-    load_image("sprites/pressed_arrow_up_left.png", "spr_pressed_arrow_up_left", True, 128)
-    load_image("sprites/unpressed_arrow_up_right.png", "spr_unpressed_arrow_up_right", True, 128)
-    load_image("sprites/unpressed_arrow_right.png", "spr_unpressed_arrow_right", True, 128)
-    load_image("sprites/unpressed_arrow_down_right.png", "spr_unpressed_arrow_down_right", True, 128)
-    load_image("sprites/unpressed_arrow_down.png", "spr_unpressed_arrow_down", True, 128)
-    load_image("sprites/unpressed_arrow_down_left.png", "spr_unpressed_arrow_down_left", True, 128)
-    load_image("sprites/unpressed_arrow_left.png", "spr_unpressed_arrow_left", True, 128)
-    load_image("sprites/unpressed_arrow_up_left.png", "spr_unpressed_arrow_up_left", True, 128)
-    load_image("sprites/neutral_zone.png", "spr_neutral_zone", True, 128)
-    
-    #font and texts
-    load_font("fonts/ocean_font.ttf", 16, False)
-    load_font("fonts/ocean_font.ttf", 22)
-    load_font("fonts/ocean_font.ttf", 48)
-    load_font("fonts/ocean_font.ttf", 76)
-    load_font("Arial", 32, is_system_font=True)
-    load_font("fonts/ARCADE_N.ttf", 16, False)
-    load_font("fonts/ARCADE_N.ttf", 14)
-
-    load_font("fonts/ARCADE_N.ttf", 12)
-    load_font("fonts/ARCADE_N.ttf", 22)
-    load_font("fonts/ARCADE_N.ttf", 36)
-
-    load_font("fonts/ARCADE_N.ttf", 48)
-    load_font("fonts/ARCADE_N.ttf", 76)
-    #backgrounds
-    game_over_bg=load_image("sprites/game_over.png", "game_over", True)
-    success_bg=load_image("sprites/success_screen.png", "game_over", True)
-    fail_bg=load_image("sprites/fail_screen.png", "game_over", True)
-
-    load_image("sprites/ground.png", "ground", False)
-    load_image("sprites/ground_red.png", "ground_red", False)
-    load_image("sprites/ground_blue.png", "ground_blue", False)
-    load_image("sprites/ground_black.png", "ground_black", False)
-
-
-    load_image("sprites/play_background.jpg", "play_background", False)
-    #bgwater = pygame.transform.scale(bgwater, (SCREEN_WIDTH, SCREEN_HEIGHT))
-    top_ui_layer = load_image("sprites/top_ui_layer.jpg", "top_ui_layer", False)
-    IMAGES['top_ui_layer'] = pygame.transform.scale(top_ui_layer, (SCREEN_WIDTH, TOP_UI_LAYER_HEIGHT))
-    start_menu_bg = load_image("sprites/start_menu.png", "start_menu_bg", False)
-    load_image("sprites/info_screen.png", "info_screen_bg", False)
-    load_image("sprites/success_screen.png", "success_screen_bg", False)
-    load_image("sprites/fail_screen.png", "fail_screen_bg", False)
-
+def load_start_menu_assets():
+    """
+    Registers every asset and loads only what the start menu needs.
+    :return: Keys of the other assets, in the order they should be streamed in.
+    """
+    # Sprites packed by atlas.py come from a few shared sheets
+    load_atlas()
+    # Everything in assets.py is registered, and loads on first use unless streamed in before
+    register_assets(IMAGE_ASSETS, SOUND_ASSETS, FONT_ASSETS, IMAGE_SIZES)
+    register_derived_images(IMAGES)
+    for name in START_MENU_ASSETS:
+        load_registered(name)
     pygame.mouse.set_visible(True)
-    load_sound("sounds/snd_eat.wav", "snd_eat")
-    SOUNDS["snd_eat"].set_volume(1)
-    load_sound("sounds/eat_shark.wav", "snd_eat_shark")
-    SOUNDS["snd_eat_shark"].set_volume(.7)
-    load_sound("sounds/size_down.wav", "snd_size_down")
-    load_sound("sounds/player_die.wav", "snd_player_die")
-    SOUNDS["snd_player_die"].set_volume(1)
-    load_sound("sounds/powerup_timer.wav", "snd_powerup_timer")
-    SOUNDS["snd_powerup_timer"].set_volume(1)
-    load_sound("sounds/power_up.wav", "snd_powerup_timer")
-    SOUNDS["snd_powerup_timer"].set_volume(1)
-    load_sound("sounds/siren.wav", "snd_siren")
-    SOUNDS["snd_siren"].set_volume(0.3)
-    load_sound("sounds/shark_attack.wav", "snd_shark_attack")
-    SOUNDS["snd_shark_attack"].set_volume(1)
-    load_sound("sounds/whale_chase.wav", "snd_whale_chase")
-    SOUNDS["snd_whale_chase"].set_volume(1)
-    load_sound("sounds/shark_incoming.wav", "snd_shark_incoming")
-    SOUNDS["snd_shark_incoming"].set_volume(1)
-    # Music loop
-    pygame.mixer.music.load("sounds/game_music.mp3")
-    pygame.mixer.music.set_volume(0.5)
-    pygame.mixer.music.play(-1)
-
 
+    deferred = set(DEFERRED_ASSETS)
+    # Phase assets are loaded around their phase only, see phases.py
+    phase_assets = {name for group in PHASE_ASSETS.values() for name in group["images"]}
+    names = [name for name in list(IMAGES.pending) + list(SOUNDS.pending) + list(FONTS.pending)
+             if name not in phase_assets]
+    # Assets needed late in a run come last, after the game can start
+    return [name for name in names if name not in deferred] + [name for name in names if name in deferred]
 
 
-def collide_rect_to_mask(sprite1, sprite2, mask_name='mask'):
+async def stream_assets(names, progress):
     """
-    Check for collision between sprite1's rect and a specified mask of sprite2.
-
-    :param sprite1: The first sprite (uses its rect for collision).
-    :param sprite2: The second sprite (whose specified mask is used for collision).
-    :param mask_name: The name of the mask attribute in sprite2 to use for collision.
-    :return: True if there is a collision, False otherwise.
+    Loads registered assets one after another, giving control back to the
+    event loop every LOADING_BUDGET seconds so frames keep being drawn.
+    Files are decoded ahead on background threads where threads are available.
+    :param names: Keys of registered assets of IMAGES, SOUNDS or FONTS.
+    :param progress: Dictionary whose "done" entry counts the loaded assets.
     """
-    # First, check if the rectangles collide. If not, there can't be a mask collision.
-    if not pygame.sprite.collide_rect(sprite1, sprite2):
-        return False
-
-    # Create a temporary mask for sprite1's rect
-    mask1 = pygame.mask.Mask((sprite1.rect.width, sprite1.rect.height))
-    mask1.fill()  # Fill the mask (all pixels set to 1)
-
-    # Get the specified mask from sprite2
-    mask2 = getattr(sprite2, mask_name, None)
-    if mask2 is None:
-        raise ValueError(f"Mask '{mask_name}' not found in sprite2")
-
-    # Get the offset between the two sprites
-    offset_x = sprite2.rect.left - sprite1.rect.left
-    offset_y = sprite2.rect.top - sprite1.rect.top
-
-    # Use the offset to check if the masks overlap
-    return mask1.overlap(mask2, (offset_x, offset_y)) is not None
+    start = time.perf_counter()
+    threads = IMAGES.prefetch(names) + SOUNDS.prefetch(names)
+    deadline = time.perf_counter() + LOADING_BUDGET
+    loading = 0  # Seconds spent loading on the main thread, frames in between not counted
+    for name in names:
+        load_start = time.perf_counter()
+        load_registered(name)
+        loading += time.perf_counter() - load_start
+        progress["done"] += 1
+        if time.perf_counter() > deadline:
+            await asyncio.sleep(0)
+            deadline = time.perf_counter() + LOADING_BUDGET
+    print(f"Streamed {len(names)} assets in {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"(main thread {loading * 1000:.0f} ms, decoding on {len(threads)} threads)")
+
+
+def play_music():
+    # Music loop
+    with startup_profiler.span("music.load " + MUSIC_FILE, "sound"):
+        load_music(MUSIC_FILE)
+    pygame.mixer.music.set_volume(0.5)
+    with startup_profiler.span("music.play", "sound"):
+        pygame.mixer.music.play(-1)
 
 
-def collide_mask_to_mask(sprite1, mask1_name, sprite2, mask2_name, use_rect_check=True):
+def draw_loading_screen(screen, done, total):
     """
-    Check for collision between two masks of two different sprites, with an optional
-    rectangle collision check for optimization.
-
-    :param sprite1: The first sprite.
-    :param mask1_name: The name of the mask attribute in the first sprite.
-    :param sprite2: The second sprite.
-    :param mask2_name: The name of the mask attribute in the second sprite.
-    :param use_rect_check: Whether to perform an initial rectangle collision check.
-    :return: True if there is a collision, False otherwise.
+    Draws the start menu with a progress bar while the game assets stream in.
+    :param done: Number of assets loaded.
+    :param total: Number of assets to load before the game can start.
     """
-    # Retrieve the actual mask objects from the sprites
-    mask1 = getattr(sprite1, mask1_name, None)
-    mask2 = getattr(sprite2, mask2_name, None)
-
-    # Ensure both masks are present
-    if not mask1 or not mask2:
-        return False
-
-    # First, check if the rectangles collide if use_rect_check is True.
-    if use_rect_check and not sprite1.rect.colliderect(sprite2.rect):
-        return False
-
-    # Calculate the offset between the two sprites
-    offset_x = sprite2.rect.left - sprite1.rect.left
-    offset_y = sprite2.rect.top - sprite1.rect.top
-
-    # Check if the masks overlap
-    return mask1.overlap(mask2, (offset_x, offset_y)) is not None
+    screen.blit(IMAGES['start_menu_bg'], (0, 0))
+    bar_rect = pygame.Rect(0, 0, SCREEN_WIDTH // 3, 16)
+    bar_rect.midbottom = (SCREEN_WIDTH // 2, SCREEN_HEIGHT - 30)
+    fill_rect = bar_rect.inflate(-4, -4)
+    fill_rect.width = int(fill_rect.width * min(done, total) / max(total, 1))
+    pygame.draw.rect(screen, (0, 0, 0), bar_rect)
+    pygame.draw.rect(screen, (173, 216, 230), fill_rect)
+    pygame.draw.rect(screen, (255, 255, 255), bar_rect, 2)
+    text_font = get_glyph_font('arcade_n_16')
+    text_font.draw(screen, "Loading", (255, 255, 255),
+                   text_font.get_rect("Loading", midbottom=(bar_rect.centerx, bar_rect.top - 6)))
 
 
-class Wall(pygame.sprite.Sprite):
-    def __init__(self, allsprites):
-        pygame.sprite.Sprite.__init__(self)
-        self.image = pygame.Surface((32, 32))
-        self.image.fill((0, 0, 0, 0))  # Black color, can be changed to (0, 0, 0, 0) for invisible
-        self.image.set_colorkey((0, 0, 0))  # Make black color transparent
-        self.rect = self.image.get_rect()
-    def remove_sprite(self):
-        self.kill()
-
 class Seaweed(pygame.sprite.Sprite):
     def __init__(self, allsprites, x_pos, y_pos):
         """
@@ -414,28 +241,12 @@ class GameState:
         self.joystick_visible = False  # Whether the joystick is currently visible
         self.info_button_play_rect = pygame.Rect(SCREEN_WIDTH - 80, 3, 75, TOP_UI_LAYER_HEIGHT-5)  # Adjust position and size as needed
         self.shark_attack_played = False
+        self.phase_assets = PhaseAssets()  # Assets of the 200/300/400 points phases
      
     def initialize_entities(self):
         # Initialize all your entities here
         self.player = Player(self.allsprites, IMAGES)
-        self.walls = []
         self.seaweeds = []
-        for x_top in range(31):
-            self.wall = Wall(self.allsprites)
-            self.wall.rect.topleft = (x_top*32, 0) #top walls
-            self.walls.append(self.wall)
-        for x_bottom in range(32, SCREEN_WIDTH-32, 32):
-            self.wall = Wall(self.allsprites)
-            self.wall.rect.topleft = (x_bottom, SCREEN_HEIGHT-32) #bottom walls
-            self.walls.append(self.wall)
-        for y_left in range(0, SCREEN_HEIGHT-32, 32):
-            self.wall = Wall(self.allsprites)
-            self.wall.rect.topleft = (0, y_left) #left walls
-            self.walls.append(self.wall)
-        for y_right in range(0, SCREEN_HEIGHT-32, 32):
-            self.wall = Wall(self.allsprites)
-            self.wall.rect.topleft = (SCREEN_WIDTH-32, y_right) #right walls
-            self.walls.append(self.wall)
         for x_pos in range(200, SCREEN_WIDTH-165, 60):
             self.seaweed = Seaweed(self.allsprites, x_pos, SCREEN_HEIGHT-60)
             self.seaweeds.append(self.seaweed)
@@ -456,6 +267,8 @@ class GameState:
         self.bright_blue_fish = BrightBlueFish(self.allsprites, IMAGES)
         self.blue_arrow_warning_left = ArrowWarning(self.arrow_warning_sprites, "blue", self.bright_blue_fish, "left")
         self.blue_arrow_warning_right = ArrowWarning(self.arrow_warning_sprites, "blue", self.bright_blue_fish, "right")
+        # Sprites waiting off screen are inactive and never collide
+        self.collision_engine = CollisionEngine(self.get_collision_rules(), ARENA.screen)
         self.whales = []
         self.whales2 = []
         self.whales3 = []
@@ -481,6 +294,7 @@ class GameState:
         self.arrow_warning_sprites.empty()
         self.current_state = GameState.PLAY_SCREEN
         self.score = 0
+        self.phase_assets.reset()
         self.initialize_entities()
         self.player.last_pressed = 0
         self.key_states = {
@@ -574,14 +388,10 @@ class GameState:
 
     # Drawing the lives based on player lives
     def draw_lives(self, screen):
-        heart_image = IMAGES['heart']  # Assuming IMAGES is your image dictionary
+        heart_image = IMAGES['heart_small']  # 75% of the heart sprite, see assets.py
         num_hearts = self.player.lives
         heart_spacing = 5  # Space between hearts
 
-        # Resize the heart image to 75% of its original size
-        heart_size = (int(heart_image.get_width() * 0.75), int(heart_image.get_height() * 0.75))
-        heart_image = pygame.transform.scale(heart_image, heart_size)
-
         # Position the hearts at the left side of the screen
         start_x = 15  # Starting X position from the left edge
         start_y = 40  # Y position just above the bottom edge, aligned with the pause button
@@ -595,147 +405,175 @@ class GameState:
 
         
 
+    def get_collision_groups(self):
+        # Every sprite handle_collisions tests, by kind of the collision rules
+        return {
+            "player": [self.player],
+            "red_fish": self.red_fishes,
+            "green_fish": self.green_fishes,
+            "silver_fish": [self.silver_fish],
+            "bright_blue_fish": [self.bright_blue_fish],
+            "rainbow_fish": [self.rainbow_fish],
+            "shark": self.sharks,
+            "snake": [self.snake],
+            "seahorse": [self.seahorse],
+            "jellyfish": self.jellyfishes,
+            "star": [self.star],
+        }
+
+    def get_collision_rules(self):
+        """
+        The collision table: (kind A, kind B, mask A, mask B, predicate, handler),
+        run in this order every tick. A new creature only needs its lines here
+        and its sprites in get_collision_groups.
+        """
+        invincible = lambda *pair: self.player.star_power == Player.INVINCIBLE_POWERUP
+        vulnerable = lambda *pair: self.player.star_power != Player.INVINCIBLE_POWERUP
+        shrinker = lambda *pair: self.player.star_power == Player.SHARK_SHRINKER_POWERUP
+        sharks_bite = lambda *pair: self.player.star_power not in (Player.SHARK_SHRINKER_POWERUP,
+                                                                   Player.INVINCIBLE_POWERUP)
+        # Green fish is small or player is bigger than green fish or player has star power
+        green_fish_edible = lambda green_fish, player: vulnerable() and (
+            green_fish.is_big == False or player.size_score >= Player.PLAYER_SCORE_BIGGER_THAN_BIG_GREEN_FISH)
+        # Green fish is bigger than player
+        green_fish_bites = lambda green_fish, player: vulnerable() and not (
+            green_fish.is_big == False or player.size_score >= Player.PLAYER_SCORE_BIGGER_THAN_BIG_GREEN_FISH)
+        return [CollisionRule(*rule) for rule in [
+            ("red_fish", "player", RECT, "body_mask", invincible, self.prey_player_collision),
+            ("red_fish", "player", RECT, "face_mask", vulnerable, self.prey_player_collision),
+            ("red_fish", "green_fish", RECT, RECT, None, self.red_fish_green_fish_collision),
+            ("red_fish", "bright_blue_fish", "mask", "mask", None, self.bright_blue_fish_collision),
+            ("green_fish", "player", "body_mask", "body_mask", invincible, self.prey_player_collision),
+            ("green_fish", "player", "body_mask", "face_mask", green_fish_edible, self.prey_player_collision),
+            ("green_fish", "player", "face_mask", "body_mask", green_fish_bites, self.predator_player_collision),
+            ("green_fish", "bright_blue_fish", "mask", "mask", None, self.green_fish_bright_blue_fish_collision),
+            ("silver_fish", "player", RECT, "body_mask", invincible, self.prey_player_collision),
+            ("silver_fish", "player", RECT, "face_mask", vulnerable, self.prey_player_collision),
+            ("bright_blue_fish", "player", "mask", "body_mask", vulnerable, self.predator_player_collision),
+            ("rainbow_fish", "player", "mask", "mask", None, self.rainbow_fish_player_collision),
+            ("player", "shark", "face_mask", "mask", shrinker, self.player_shark_collision),
+            ("shark", "player", "mask", "body_mask", sharks_bite, self.predator_player_collision),
+            ("shark", "bright_blue_fish", "mask", "mask", None, self.bright_blue_fish_eat_collision),
+            ("rainbow_fish", "bright_blue_fish", "mask", "mask", None, self.bright_blue_fish_eat_collision),
+            ("snake", "player", "mask", "mask", None, self.snake_player_collision),
+            ("silver_fish", "bright_blue_fish", "mask", "mask", None, self.bright_blue_fish_eat_collision),
+            ("snake", "bright_blue_fish", "mask", "mask", None, self.bright_blue_fish_collision),
+            ("seahorse", "player", "mask", "mask", None, self.seahorse_player_collision),
+            ("jellyfish", "player", "mask", "mask", None, self.jellyfish_player_collision),
+            ("jellyfish", "bright_blue_fish", "mask", "mask", None, self.bright_blue_fish_eat_collision),
+            ("star", "player", RECT, RECT, None, self.star_player_collision),
+        ]]
+
+    def prey_player_collision(self, prey, player):
+        self.player_eat_prey_collision(prey)
+
+    def predator_player_collision(self, predator, player):
+        self.predator_eat_player_collision(predator)
+
+    def red_fish_green_fish_collision(self, red_fish, green_fish):
+        green_fish.collision_with_red_fish()
+        if green_fish.is_big == False:
+            red_fish.collide_with_green_fish()
+
+    def bright_blue_fish_collision(self, sprite, bright_blue_fish):
+        sprite.collide_with_bright_blue_fish()
+
+    def bright_blue_fish_eat_collision(self, prey, bright_blue_fish):
+        prey.collide_with_bright_blue_fish()
+        SOUNDS["snd_eat"].play()
+
+    def green_fish_bright_blue_fish_collision(self, green_fish, bright_blue_fish):
+        green_fish.reset_position()
+
+    def rainbow_fish_player_collision(self, rainbow_fish, player):
+        # Player eats rainbow_fish only when appears bigger (arbitrary)
+        if (rainbow_fish.size_score <= player.size_score or
+            player.star_power == Player.INVINCIBLE_POWERUP):
+            self.player_eat_prey_collision(rainbow_fish)
+        else:
+            self.predator_eat_player_collision(rainbow_fish)
+
+    def player_shark_collision(self, player, shark):
+        self.player_eat_prey_collision(shark, "snd_eat_shark")
+
+    def snake_player_collision(self, snake, player):
+        snake.collide_with_player()
+        if player.star_power != Player.INVINCIBLE_POWERUP:
+            player.collide_with_snake()
+            SOUNDS["snd_size_down"].play()
+        else:
+            SOUNDS["snd_eat"].play()
+
+    def seahorse_player_collision(self, seahorse, player):
+        player.collide_with_seahorse()
+        seahorse.collide_with_player()
+        SOUNDS["snd_eat"].play()
+        self.one_powerup_sound += 1
+        if self.one_powerup_sound > 1:
+            SOUNDS["snd_powerup_timer"].stop()
+        for i in range(0, len(SOUNDS)):
+            sounds_list = list(SOUNDS.keys()) #returns list of keys in sounds
+            SOUNDS[sounds_list[i]].stop() #stops all sounds
+        SOUNDS["snd_powerup_timer"].play()
+
+    def jellyfish_player_collision(self, jellyfish, player):
+        jellyfish.collide_with_player()
+        if player.star_power == Player.INVINCIBLE_POWERUP:
+            SOUNDS["snd_eat"].play()
+        else:
+            player.collide_with_jellyfish()
+            SOUNDS["snd_size_down"].play()
+            self.one_powerup_sound += 1
+            SOUNDS["snd_powerup_timer"].play()
+
+            if self.one_powerup_sound > 1:
+                SOUNDS["snd_powerup_timer"].stop()
+
+            SOUNDS["snd_powerup_timer"].play()
+
+    def star_player_collision(self, star, player):
+        player.collide_with_star()
+        star.collide_with_player()
+        SOUNDS["snd_eat"].play()
+        SOUNDS["snd_powerup_timer"].play()
+        self.one_powerup_sound += 1
+        if self.one_powerup_sound > 1:
+            SOUNDS["snd_powerup_timer"].stop()
+
     def handle_collisions(self):
         ##################
         # COLLISIONS
         ##################
-        for red_fish in self.red_fishes:
-            if self.player.star_power == self.player.INVINCIBLE_POWERUP:
-                if collide_rect_to_mask(red_fish, self.player, "body_mask"):
-                    self.player_eat_prey_collision(red_fish)
-            else:
-                if collide_rect_to_mask(red_fish, self.player, "face_mask"):
-                    self.player_eat_prey_collision(red_fish)
-            for green_fish in self.green_fishes:
-                if red_fish.rect.colliderect(green_fish):
-                    green_fish.collision_with_red_fish()
-                    if green_fish.is_big == False:
-                        red_fish.collide_with_green_fish()
-            if pygame.sprite.collide_mask(red_fish, self.bright_blue_fish):
-                red_fish.collide_with_bright_blue_fish()
-            for wall in self.walls:
-                if red_fish.rect.colliderect(wall.rect):
-                    red_fish.collision_with_wall(wall.rect)
-        for green_fish in self.green_fishes:
-            if(green_fish.is_big == False or 
-               self.player.size_score >= Player.PLAYER_SCORE_BIGGER_THAN_BIG_GREEN_FISH or 
-               self.player.star_power == Player.INVINCIBLE_POWERUP):
-                if self.player.star_power == self.player.INVINCIBLE_POWERUP:
-                    if collide_mask_to_mask(green_fish, "body_mask", self.player, "body_mask", False):
-                        self.player_eat_prey_collision(green_fish)
-                else:
-                    if collide_mask_to_mask(green_fish, "body_mask", self.player, "face_mask", False):
-                        # Green fish is small or player is bigger than green fish or player has star power
-                        self.player_eat_prey_collision(green_fish)
-            else: 
-                if collide_mask_to_mask(green_fish, "face_mask", self.player, "body_mask", False):
-                    if green_fish.is_big:
-                        # Green fish is bigger than player
-                        self.predator_eat_player_collision(green_fish)
-            if pygame.sprite.collide_mask(green_fish, self.bright_blue_fish):
-                green_fish.reset_position()
-            for wall in self.walls:
-                if green_fish.rect.colliderect(wall.rect):
-                    green_fish.collision_with_wall(wall.rect)
-        if self.player.star_power == self.player.INVINCIBLE_POWERUP:
-            if collide_rect_to_mask(self.silver_fish, self.player, "body_mask"):
-                self.player_eat_prey_collision(self.silver_fish)
-        else:
-            if collide_rect_to_mask(self.silver_fish, self.player, "face_mask"):
-                self.player_eat_prey_collision(self.silver_fish)
-        if collide_mask_to_mask(self.bright_blue_fish, "mask", self.player, "body_mask"):
-            if self.player.star_power != Player.INVINCIBLE_POWERUP:
-                self.predator_eat_player_collision(self.bright_blue_fish)
-        if pygame.sprite.collide_mask(self.rainbow_fish, self.player):
-            # Player eats rainbow_fish only when appears bigger (arbitrary)
-            if (self.rainbow_fish.size_score <= self.player.size_score or 
-                self.player.star_power == self.player.INVINCIBLE_POWERUP):
-                self.player_eat_prey_collision(self.rainbow_fish)
-            else:
-                if self.player.star_power != Player.INVINCIBLE_POWERUP:
-                    self.predator_eat_player_collision(self.rainbow_fish)
+        # Sharks shrink while the player has the shark shrinker
         for shark in self.sharks:
             if self.player.star_power == Player.SHARK_SHRINKER_POWERUP:
                 shark.mini_shark = True
-                if collide_mask_to_mask(self.player, "face_mask", shark, "mask", False):
-                    self.player_eat_prey_collision(shark, "snd_eat_shark")
-            elif self.player.star_power == Player.INVINCIBLE_POWERUP:
-                pass
-            else:
+            elif self.player.star_power != Player.INVINCIBLE_POWERUP:
                 shark.mini_shark = False
-                if collide_mask_to_mask(self.player, "body_mask", shark, "mask", False):
-                    self.predator_eat_player_collision(shark)
-            if pygame.sprite.collide_mask(shark, self.bright_blue_fish):
-                shark.collide_with_bright_blue_fish()
-                SOUNDS["snd_eat"].play()
-            for wall in self.walls:
-                if shark.rect.colliderect(wall.rect):
-                    shark.collision_with_wall(wall.rect)
-        if pygame.sprite.collide_mask(self.rainbow_fish, self.bright_blue_fish):
-            SOUNDS["snd_eat"].play()
-            self.rainbow_fish.collide_with_bright_blue_fish()
-        if pygame.sprite.collide_mask(self.snake, self.player):
-            self.snake.collide_with_player()
-            if self.player.star_power != Player.INVINCIBLE_POWERUP:
-                self.player.collide_with_snake()
-                SOUNDS["snd_size_down"].play()
-            else:
-                SOUNDS["snd_eat"].play()
-        if pygame.sprite.collide_mask(self.silver_fish, self.bright_blue_fish):
-            SOUNDS["snd_eat"].play()
-            self.silver_fish.collide_with_bright_blue_fish()
-        if pygame.sprite.collide_mask(self.snake, self.bright_blue_fish):
-            self.snake.collide_with_bright_blue_fish()
-        if pygame.sprite.collide_mask(self.seahorse, self.player):
-            self.player.collide_with_seahorse()
-            self.seahorse.collide_with_player()
-            SOUNDS["snd_eat"].play()
-            self.one_powerup_sound += 1
-            if self.one_powerup_sound > 1:
-                SOUNDS["snd_powerup_timer"].stop()
-            for i in range(0, len(SOUNDS)):
-                sounds_list = list(SOUNDS.keys()) #returns list of keys in sounds
-                SOUNDS[sounds_list[i]].stop() #stops all sounds
-            SOUNDS["snd_powerup_timer"].play()
-        for jellyfish in self.jellyfishes:
-            if pygame.sprite.collide_mask(jellyfish, self.player):
-                jellyfish.collide_with_player()
-                if self.player.star_power == Player.INVINCIBLE_POWERUP:
-                    SOUNDS["snd_eat"].play()
-                else:
-                    self.player.collide_with_jellyfish()
-                    SOUNDS["snd_size_down"].play()
-                    self.one_powerup_sound += 1
-                    SOUNDS["snd_powerup_timer"].play()
+        # Candidate pairs are gathered once, then each rule of the table runs over its own
+        self.collision_engine.run(self.get_collision_groups())
+        for sprite in [*self.red_fishes, *self.green_fishes, *self.sharks]:
+            sprite.collision_with_wall()  # Bounces if it touches the arena walls
 
-                    if self.one_powerup_sound > 1:
-                        SOUNDS["snd_powerup_timer"].stop()
-                    
-                    SOUNDS["snd_powerup_timer"].play()
-            if pygame.sprite.collide_mask(jellyfish, self.bright_blue_fish):
-                jellyfish.collide_with_bright_blue_fish()
-                SOUNDS["snd_eat"].play()
-        if self.player.rect.colliderect(self.star):
-            self.player.collide_with_star()
-            self.star.collide_with_player()
-            SOUNDS["snd_eat"].play()
-            SOUNDS["snd_powerup_timer"].play()
-            self.one_powerup_sound += 1
-            if self.one_powerup_sound > 1:
-                SOUNDS["snd_powerup_timer"].stop()
-            
-            
 
-                
     def handle_input(self, pause_button_rect):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                if collision_stats.ENABLED:
+                    collision_stats.write_csv()
                 pygame.quit()
                 sys.exit()
     
             if event.type == pygame.KEYDOWN:
                 if event.key in self.key_states:
                     self.key_states[event.key] = True
+                elif event.key == pygame.K_F3:
+                    collision_stats.toggle()  # Collision statistics on/off
+                elif event.key == pygame.K_F4:
+                    collision_stats.print_report()
+                    collision_stats.write_csv()
+                elif event.key == pygame.K_F5:
+                    hitboxes.toggle_precise()  # Swept tests on masks instead of capsules on/off
     
             if event.type == pygame.KEYUP:
                 if event.key in self.key_states:
@@ -815,35 +653,31 @@ class GameState:
                 screen.fill((0, 0, 0))
     def show_game_over_screen(self, screen):
         # Choose background based on game_over_type
+        # (already at screen size, see IMAGE_SIZES in assets.py)
         if self.game_over_type == "success":
-            game_over_bg = load_image("sprites/success_screen.png", "success_screen", False)
+            game_over_bg = IMAGES['success_screen_bg']
         elif self.game_over_type == "fail":
-            game_over_bg = load_image("sprites/fail_screen.png", "fail_screen", False)
+            game_over_bg = IMAGES['fail_screen_bg']
         else:
-            game_over_bg = load_image("sprites/game_over.png", "game_over", False)
+            game_over_bg = IMAGES['game_over']
         
-        # Scale and display background
-        game_over_bg = pygame.transform.scale(game_over_bg, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        # Display background
         screen.blit(game_over_bg, (0, 0))
 
         # Set up the font and display the score
-        font = FONTS['arcade_n_36']
+        font = get_glyph_font('arcade_n_36')
         points_text = str(self.score)
         position = (SCREEN_WIDTH // 2 + 98, SCREEN_HEIGHT - 140)
         self.render_text_with_outline(screen, font, points_text, color=(255, 255, 255), outline_color=(0, 0, 0), position=position)
 
 
     def show_success_screen(self, screen):
-    # Load and scale the success background image
-        success_bg = load_image("sprites/success_screen.png", "success", False)
-        success_bg = pygame.transform.scale(success_bg, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        screen.blit(success_bg, (0, 0))
+    # Display the success background image
+        screen.blit(IMAGES['success_screen_bg'], (0, 0))
     def show_fail_screen(self, screen):
-    # Load and scale the fail background image
-        fail_bg = load_image("sprites/fail_screen.jpg", "fail", False)
-        fail_bg = pygame.transform.scale(fail_bg, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        screen.blit(fail_bg, (0, 0))
-        font = FONTS['arcade_n_36']
+    # Display the fail background image
+        screen.blit(IMAGES['fail_screen_bg'], (0, 0))
+        font = get_glyph_font('arcade_n_36')
         points_text = str(self.score)
         
         position = (SCREEN_WIDTH // 2 + 75, SCREEN_HEIGHT - 150)
@@ -852,18 +686,8 @@ class GameState:
 
 
     def render_text_with_outline(self, screen, font, text, color, outline_color, position):
-        """Helper function to render text with a black outline."""
-        outline_text = font.render(text, True, outline_color)
-        outline_rect = outline_text.get_rect(center=position)
-
-        screen.blit(outline_text, outline_rect.move(-2, -2))  
-        screen.blit(outline_text, outline_rect.move(2, -2))   
-        screen.blit(outline_text, outline_rect.move(-2, 2))   
-        screen.blit(outline_text, outline_rect.move(2, 2))    
-
-        main_text = font.render(text, True, color)
-        main_rect = main_text.get_rect(center=position)
-        screen.blit(main_text, main_rect)
+        """Helper function to render text with a black outline. font is a GlyphFont."""
+        font.draw_outlined(screen, text, color, outline_color, position)
 
 
 
@@ -877,26 +701,11 @@ class GameState:
         elif self.current_state == GameState.PLAY_SCREEN and not self.is_paused:
             self.handle_collisions()
             self.activate_game_objects(zoomed_surface)
-            # Diagonal Movements
-            if self.key_states[pygame.K_UP] and self.key_states[pygame.K_RIGHT]:
-                self.player.move_up_right()
-            elif self.key_states[pygame.K_UP] and self.key_states[pygame.K_LEFT]:
-                self.player.move_up_left()
-            elif self.key_states[pygame.K_DOWN] and self.key_states[pygame.K_RIGHT]:
-                self.player.move_down_right()
-            elif self.key_states[pygame.K_DOWN] and self.key_states[pygame.K_LEFT]:
-                self.player.move_down_left()
-        
-            # Single direction movements
-            elif self.key_states[pygame.K_UP]:
-                self.player.move_up()
-            elif self.key_states[pygame.K_DOWN]:
-                self.player.move_down()
-            elif self.key_states[pygame.K_LEFT]:
-                self.player.move_left()
-            elif self.key_states[pygame.K_RIGHT]:
-                self.player.move_right()
-        
+            # Arrow keys (or the joystick) give the direction, opposite keys cancel out
+            dx = self.key_states[pygame.K_RIGHT] - self.key_states[pygame.K_LEFT]
+            dy = self.key_states[pygame.K_DOWN] - self.key_states[pygame.K_UP]
+            self.player.move(dx, dy)
+
             # Stop movement if no arrow keys are pressed
             if not any(self.key_states.values()):
                 self.player.stop_movement()
@@ -1071,7 +880,7 @@ def draw_mask(surface, mask, x, y, color=(255, 0, 0)):
         surface.blit(mask_surface, (x, y))
 
 # Main game loop
-def main():
+async def main():
     # Define Pause and Info Button Properties
     pause_button_size = (75, TOP_UI_LAYER_HEIGHT-5)
     button_color = (173, 216, 230)  # Light Cyan color
@@ -1081,7 +890,27 @@ def main():
 
     (x_first, y_first) = (0, 0)
     (x_second, y_second) = (0, -SCREEN_HEIGHT)
-    load_all_assets()
+    with startup_profiler.span("load_start_menu_assets", "assets"):
+        names = load_start_menu_assets()
+    required = [name for name in names if name not in DEFERRED_ASSETS]
+    progress = {"done": 0}
+    # Everything else streams in while the start menu is shown, deferred assets last
+    loading = asyncio.create_task(stream_assets(names, progress))
+    while progress["done"] < len(required) and not loading.done():
+        clock.tick(FPS)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+        draw_loading_screen(screen, progress["done"], len(required))
+        pygame.display.update()
+        await asyncio.sleep(0)
+    if loading.done():
+        loading.result()  # Raises the error that stopped the loading, if any
+
+    play_music()
+    # The startup profile ends with the first music.play (--profile-startup)
+    startup_profiler.finish()
     
     running = True
     joystick = Joystick(IMAGES, screen)
@@ -1140,6 +969,7 @@ def main():
                 game_state_manager.snake.set_speed(Snake.FAST_SPEED)
                 game_state_manager.snake.set_size(Snake.BIGGER_SIZE)
                 game_state_manager.snake.rect.y =  SCREEN_HEIGHT - 90
+                teleported(game_state_manager.snake)
 
         # Initialization of flags for 200-point effect
            # Initialization for 200-point and 400-point effects
@@ -1168,6 +998,8 @@ def main():
                 game_state_manager.final_music_played = False
             if not hasattr(game_state_manager, 'final_challenge_timer_done'):
                 game_state_manager.final_challenge_timer_done = False
+            # Load the ground and music of the next phase before it starts
+            game_state_manager.phase_assets.update(game_state_manager.score)
             # Handle the ground and music effects based on score
             if game_state_manager.score < 200:
                 # Before 200: Normal game music and ground
@@ -1175,7 +1007,7 @@ def main():
                 if game_state_manager.shark_attack_played or game_state_manager.whale_chase_played:
                     print("Resuming normal background music...")
                     pygame.mixer.music.stop()
-                    pygame.mixer.music.load("sounds/game_music.mp3")
+                    load_music("sounds/game_music.mp3")
                     pygame.mixer.music.set_volume(1)
                     pygame.mixer.music.play(-1)
 
@@ -1192,7 +1024,7 @@ def main():
                 if not game_state_manager.shark_attack_played:
                     print("Playing shark attack sound as background music...")
                     pygame.mixer.music.stop()
-                    pygame.mixer.music.load("sounds/shark_attack.wav")
+                    load_music("sounds/shark_attack.wav")
                     pygame.mixer.music.set_volume(1)
                     pygame.mixer.music.play(-1)
                     game_state_manager.shark_attack_played = True
@@ -1201,9 +1033,10 @@ def main():
                 if elapsed_time >= 20000:
                     game_state_manager.shark_attack_timer_done = True
                     pygame.mixer.music.stop()
-                    pygame.mixer.music.load("sounds/game_music.mp3")
+                    load_music("sounds/game_music.mp3")
                     pygame.mixer.music.set_volume(1)
                     pygame.mixer.music.play(-1)
+                    game_state_manager.phase_assets.release(200)
                     sharks_to_kill = 0
                     for shark in game_state_manager.sharks:  # Assuming `all_sharks` is the group of sharks
                         if sharks_to_kill < 3:
@@ -1223,7 +1056,7 @@ def main():
                 if not game_state_manager.whale_chase_played:
                     print("Playing whale chase sound as background music...")
                     pygame.mixer.music.stop()
-                    pygame.mixer.music.load("sounds/whale_chase.wav")
+                    load_music("sounds/whale_chase.wav")
                     pygame.mixer.music.set_volume(1)
                     pygame.mixer.music.play(-1)
                     game_state_manager.whale_chase_played = True
@@ -1237,9 +1070,10 @@ def main():
                 if elapsed_time >= 25000:
                     game_state_manager.whale_chase_timer_done = True
                     pygame.mixer.music.stop()
-                    pygame.mixer.music.load("sounds/game_music.mp3")
+                    load_music("sounds/game_music.mp3")
                     pygame.mixer.music.set_volume(1)
                     pygame.mixer.music.play(-1)
+                    game_state_manager.phase_assets.release(300)
             elif game_state_manager.score >= 400 and not game_state_manager.final_challenge_timer_done:
     # 400 points: Black ground and final challenge music
                 if not game_state_manager.score_over_400:
@@ -1253,7 +1087,7 @@ def main():
                 if not game_state_manager.final_music_played:
                     print("Playing final challenge music as background music...")
                     pygame.mixer.music.stop()
-                    pygame.mixer.music.load("sounds/final.wav")
+                    load_music("sounds/final.wav")
                     pygame.mixer.music.set_volume(1)
                     pygame.mixer.music.play(-1)
                     game_state_manager.final_music_played = True
@@ -1266,8 +1100,9 @@ def main():
                 if elapsed_time >= 60000:
                     game_state_manager.final_challenge_timer_done = True
                     pygame.mixer.music.stop()
-                    pygame.mixer.music.load("sounds/game_music.mp3")
+                    load_music("sounds/game_music.mp3")
                     pygame.mixer.music.play(-1)
+                    game_state_manager.phase_assets.release(400)
 
                     # If score is below 500, set to fail game over screen
                     if game_state_manager.score < 500:
@@ -1362,7 +1197,7 @@ def main():
                 relative_y = game_state_manager.dead_fish_position[1] - camera_y
             
                 # Render the score text
-                SCORE_BLIT_TEXT = FONTS['ocean_font_16'].render("+" + str(game_state_manager.score_blit), True, (255, 255, 255))
+                SCORE_BLIT_TEXT = get_glyph_font('ocean_font_16').render("+" + str(game_state_manager.score_blit), (255, 255, 255))
             
                 # Blit the score text at the adjusted position on the zoomed surface
                 zoomed_surface.blit(SCORE_BLIT_TEXT, (relative_x, relative_y))
@@ -1388,21 +1223,21 @@ def main():
 
             # Menu Design
             screen.blit(IMAGES['top_ui_layer'], (0, 0))
-            available_prey_text = FONTS['arcade_n_14'].render("Available Prey:", True, (255, 255, 255))
+            available_prey_text = get_glyph_font('arcade_n_14').render("Available Prey:", (255, 255, 255))
             text_rect = available_prey_text.get_rect(topleft=(10, TOP_UI_LAYER_HEIGHT/2-10))
             screen.blit(available_prey_text, text_rect)
             
                         
             # Draw Pause Button
             pause_or_resume_text = "Resume" if game_state_manager.is_paused else "Pause"
-            pause_text_surface = FONTS['arcade_n_12'].render(pause_or_resume_text, True, (0, 0, 0))
+            pause_text_surface = get_glyph_font('arcade_n_12').render(pause_or_resume_text, (0, 0, 0))
             pause_text_x = pause_button_rect.x + (pause_button_rect.width - pause_text_surface.get_width()) // 2
             pause_text_y = pause_button_rect.y + (pause_button_rect.height - pause_text_surface.get_height()) // 2
             pygame.draw.rect(screen, button_color, pause_button_rect)
             screen.blit(pause_text_surface, (pause_text_x, pause_text_y))
             
             # Draw Info Button (only in play screen)
-            info_text_surface = FONTS['arcade_n_12'].render("Info", True, (0, 0, 0))
+            info_text_surface = get_glyph_font('arcade_n_12').render("Info", (0, 0, 0))
             info_text_x = game_state_manager.info_button_play_rect.x + (game_state_manager.info_button_play_rect.width - info_text_surface.get_width()) // 2
             info_text_y = game_state_manager.info_button_play_rect.y + (game_state_manager.info_button_play_rect.height - info_text_surface.get_height()) // 2
             pygame.draw.rect(screen, button_color, game_state_manager.info_button_play_rect)
@@ -1428,18 +1263,17 @@ def main():
                 screen.blit(icon, (icon_x, icon_y))
                 icon_x += icon.get_width() + icon_buffer
         
-            # Scaled icons
-            scaled_icon_size = (24, 15)  # Adjust the size as needed
+            # Scaled icons (scaled once when loaded, see HUD_ICON_SIZE in assets.py)
             scaled_icons = []
         
             if game_state_manager.rainbow_fish.size_score <= game_state_manager.player.size_score:
-                scaled_icons.append(pygame.transform.smoothscale(IMAGES["spr_rainbow_fish_left"], scaled_icon_size))
+                scaled_icons.append(IMAGES["spr_rainbow_fish_left_icon"])
         
             if game_state_manager.player.size_score >= Player.PLAYER_SCORE_BIGGER_THAN_BIG_GREEN_FISH:
-                scaled_icons.append(pygame.transform.smoothscale(IMAGES["spr_big_green_fish_left"], scaled_icon_size))
+                scaled_icons.append(IMAGES["spr_big_green_fish_left_icon"])
         
             if game_state_manager.player.star_power == Player.SHARK_SHRINKER_POWERUP:
-                scaled_icons.append(pygame.transform.smoothscale(IMAGES["spr_shark_left"], scaled_icon_size))
+                scaled_icons.append(IMAGES["spr_shark_left_icon"])
         
             for icon in scaled_icons:
                 # Calculate the vertical offset for the scaled icon
@@ -1450,16 +1284,13 @@ def main():
 
 
             # Font On Top of Playing Screen
-            score_text = FONTS['arcade_n_16'].render("Score: " + str(game_state_manager.score), 1, (255, 255, 255))
-            screen.blit(score_text, ((SCREEN_WIDTH/2)-100, TOP_UI_LAYER_HEIGHT/2-10))
-            game_state_manager.player.get_powerup_timer_text(FONTS['arcade_n_12'])
-            game_state_manager.player.get_speed_timer_text(FONTS['arcade_n_12'])
+            get_glyph_font('arcade_n_16').draw(screen, "Score: " + str(game_state_manager.score), (255, 255, 255), ((SCREEN_WIDTH/2)-100, TOP_UI_LAYER_HEIGHT/2-10))
             screen_width_percentage = 0.70  # 75% of screen width
             x_position_powerup_timer = SCREEN_WIDTH * screen_width_percentage
-            screen.blit(game_state_manager.player.get_powerup_timer_text(FONTS['ocean_font_16']), (x_position_powerup_timer, TOP_UI_LAYER_HEIGHT/2-7))
+            get_glyph_font('ocean_font_16').draw(screen, *game_state_manager.player.get_powerup_timer_text(), (x_position_powerup_timer, TOP_UI_LAYER_HEIGHT/2-7))
             screen_width_percentage = 0.56  # 60% of screen width
             x_position_speed_timer = SCREEN_WIDTH * screen_width_percentage
-            screen.blit(game_state_manager.player.get_speed_timer_text(FONTS['ocean_font_16']), (x_position_speed_timer, TOP_UI_LAYER_HEIGHT/2-7))
+            get_glyph_font('ocean_font_16').draw(screen, *game_state_manager.player.get_speed_timer_text(), (x_position_speed_timer, TOP_UI_LAYER_HEIGHT/2-7))
             
             ##################
             # Sound Checks
@@ -1473,8 +1304,11 @@ def main():
 
         # Update the display
         pygame.display.update()
+        # Lets the asset streaming run, and the browser draw the frame in pygbag builds
+        await asyncio.sleep(0)
 
     pygame.quit()
 
 # Run the game
-main()
\ No newline at end of file
+startup_profiler.record("import main", "module", startup_profiler.START)
+asyncio.run(main())
\ No newline at end of file
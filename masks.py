@@ -0,0 +1,214 @@
+import pygame
+import os
+import json
+import zlib
+from utils import IMAGES, get_image_variant
+from assets import IMAGE_ASSETS
+from asset_pack import asset_exists, asset_stat, read_asset
+from hitboxes import get_hitbox
+
+# Constants
+MASK_FILE = os.path.join("sprites", "masks.dat")
+MAX_MASK_SIZE = 400  # Backgrounds and screens never need a collision mask
+# Images computed from another image: name -> name of the image they come from
+DERIVED_IMAGES = {"spr_green_fish_left": "spr_green_fish_right"}
+
+MASKS = {}     # (name, flip, size) -> (image the mask was made from, Mask), built once per image
+_stored = None  # name -> entry of MASK_FILE not turned into a Mask yet
+
+
+class BoundedMask(pygame.mask.Mask):
+    """
+    Mask that knows the bounding box of its set bits. Sprites have transparent
+    margins, so two masks whose boxes are apart are rejected with one Rect test
+    before Mask.overlap. The mask must not be changed after bounds is computed.
+    It also carries the capsules fitted to its image by hitboxes.py, if any.
+    """
+    def __init__(self, size, fill=False):
+        super().__init__(size, fill=fill)
+        self.bounds = None  # Rect around the set bits, see update_bounds
+        self.hitbox = None  # Capsules of the image, see get_hitbox
+
+    @classmethod
+    def from_mask(cls, mask):
+        bounded_mask = cls(mask.get_size())
+        bounded_mask.draw(mask, (0, 0))
+        bounded_mask.update_bounds()
+        return bounded_mask
+
+    def update_bounds(self):
+        rects = self.get_bounding_rects()
+        self.bounds = rects[0].unionall(rects[1:]) if rects else pygame.Rect(0, 0, 0, 0)
+
+
+def from_surface(surface):
+    """
+    Same as pygame.mask.from_surface, but gives a BoundedMask.
+    """
+    return BoundedMask.from_mask(pygame.mask.from_surface(surface))
+
+
+def masks_overlap(mask1, mask2, offset):
+    """
+    Returns True if mask2 placed at offset from mask1 overlaps it, like
+    mask1.overlap(mask2, offset) is not None. When both are BoundedMasks
+    their bounds are compared first and most misses end there.
+    """
+    bounds1 = getattr(mask1, "bounds", None)
+    bounds2 = getattr(mask2, "bounds", None)
+    if bounds1 is not None and bounds2 is not None and not bounds1.colliderect(bounds2.move(offset)):
+        return False
+    return mask1.overlap(mask2, offset) is not None
+
+
+def get_source_file(name):
+    """
+    Returns the file an image of IMAGES is loaded from, or None.
+    :param name: Key of the image in IMAGES.
+    """
+    name = DERIVED_IMAGES.get(name, name)
+    source = None
+    for file, asset_name, alpha, global_alpha in IMAGE_ASSETS:
+        if asset_name == name:
+            source = file  # Last one wins, like in register_assets
+    return source
+
+
+def mask_to_rects(mask):
+    """
+    Encodes a mask as a list of filled rectangles: runs of set bits on a row,
+    merged with identical runs on the rows below.
+    :return: Flat list x, y, width, height, x, y, ...
+    """
+    width, height = mask.get_size()
+    rects = []
+    open_rects = {}  # (x, run width) -> [x, y, run width, height]
+    for y in range(height):
+        row_runs = []
+        x = 0
+        while x < width:
+            if mask.get_at((x, y)):
+                start = x
+                while x < width and mask.get_at((x, y)):
+                    x += 1
+                row_runs.append((start, x - start))
+            else:
+                x += 1
+        next_open = {}
+        for run in row_runs:
+            rect = open_rects.pop(run, None)
+            if rect is None:
+                rect = [run[0], y, run[1], 0]
+            rect[3] += 1
+            next_open[run] = rect
+        rects.extend(open_rects.values())
+        open_rects = next_open
+    rects.extend(open_rects.values())
+    return [value for rect in sorted(rects, key=lambda r: (r[1], r[0])) for value in rect]
+
+
+def rects_to_mask(size, rects):
+    """
+    Rebuilds a mask from mask_to_rects output without scanning any pixels.
+    """
+    mask = BoundedMask(size)
+    filled = {}
+    for i in range(0, len(rects), 4):
+        x, y, width, height = rects[i:i + 4]
+        block = filled.get((width, height))
+        if block is None:
+            block = filled[(width, height)] = pygame.mask.Mask((width, height), fill=True)
+        mask.draw(block, (x, y))
+    mask.update_bounds()
+    return mask
+
+
+def build_mask_file(mask_file=MASK_FILE):
+    """
+    Offline step: computes the mask of every sprite (bodies and *_face images)
+    and writes them to mask_file. IMAGES must have all assets registered.
+    :return: Number of masks written.
+    """
+    entries = {}
+    names = [asset_name for file, asset_name, alpha, global_alpha in IMAGE_ASSETS if alpha]
+    names += list(DERIVED_IMAGES)
+    for name in dict.fromkeys(names):
+        image = IMAGES[name]
+        if max(image.get_size()) > MAX_MASK_SIZE:
+            continue
+        source = get_source_file(name)
+        entries[name] = {
+            "size": list(image.get_size()),
+            "source": source,
+            "stat": asset_stat(source),
+            "rects": mask_to_rects(pygame.mask.from_surface(image)),
+        }
+    data = json.dumps({"version": 1, "masks": entries}, separators=(",", ":")).encode()
+    with open(mask_file, "wb") as f:
+        f.write(zlib.compress(data, 9))
+    return len(entries)
+
+
+def load_mask_file(mask_file=MASK_FILE):
+    """
+    Reads the masks written by build_mask_file. Entries whose source sprite
+    changed since the build are dropped and computed from the image instead.
+    """
+    global _stored
+    _stored = {}
+    if not asset_exists(mask_file):
+        return
+    try:
+        data = json.loads(zlib.decompress(read_asset(mask_file)))
+    except (OSError, ValueError, zlib.error) as message:
+        print('Cannot load mask file:', mask_file, message)
+        return
+    for name, entry in data.get("masks", {}).items():
+        if entry["source"] is not None and asset_stat(entry["source"]) == entry["stat"]:
+            _stored[name] = entry
+
+
+def get_mask(name, flip=False, size=None):
+    """
+    Returns the collision mask (a BoundedMask) of an image of IMAGES, or of
+    its get_image_variant. The mask of the image itself comes from the prebuilt
+    mask file when possible, otherwise from the image's alpha. Every mask is
+    built once and shared by every caller, and built again if the image was
+    reloaded.
+    :param name: Key of the image in IMAGES.
+    :param flip: True for the mask of the horizontally mirrored image.
+    :param size: (width, height) of the scaled image, None for the image size.
+    """
+    key = (name, flip, size)
+    source = IMAGES[name] if not flip and size is None else get_image_variant(name, flip, size)
+    entry = MASKS.get(key)
+    if entry is not None and entry[0] is source:
+        return entry[1]
+    # Not made yet, or the image was reloaded since (like in get_image_variant)
+    if flip or size is not None:
+        mask = from_surface(source)
+    else:
+        if _stored is None:
+            load_mask_file()
+        stored = _stored.pop(name, None)
+        if stored is not None and tuple(stored["size"]) == source.get_size():
+            mask = rects_to_mask(source.get_size(), stored["rects"])
+        else:
+            mask = from_surface(source)
+    mask.hitbox = get_hitbox(name, flip, size)
+    MASKS[key] = (source, mask)
+    return mask
+
+
+if __name__ == "__main__":
+    # Build step: python masks.py
+    from utils import register_assets
+    import pixel_cache
+    from assets import SOUND_ASSETS, FONT_ASSETS, IMAGE_SIZES, register_derived_images
+    pygame.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    pixel_cache.set_display_format()
+    register_assets(IMAGE_ASSETS, SOUND_ASSETS, FONT_ASSETS, IMAGE_SIZES)
+    register_derived_images(IMAGES)
+    count = build_mask_file()
+    print(f"Wrote {count} masks to {MASK_FILE}")
@@ -0,0 +1,56 @@
+from utils import IMAGES, load_registered, preload_music, unload_music
+from assets import PHASE_ASSETS
+
+# Constants
+PRELOAD_DISTANCE = 30  # Points before a phase threshold at which its assets start loading
+
+
+class PhaseAssets:
+    """
+    Keeps the assets of the score phases (red, blue and black ground and their
+    music) in memory only around their phase: they are loaded in the background
+    when the score gets close to the threshold and dropped when the phase ends.
+    """
+    def __init__(self, groups=PHASE_ASSETS, preload_distance=PRELOAD_DISTANCE):
+        """
+        :param groups: Dictionary of score threshold -> {"images": [...], "music": file}.
+        :param preload_distance: Points before a threshold at which loading starts.
+        """
+        self.groups = groups
+        self.preload_distance = preload_distance
+        self.preloading = set()  # Thresholds whose assets are loaded or being loaded
+        self.released = set()    # Thresholds whose phase is over for this game
+
+    def update(self, score):
+        """
+        Called every frame: starts loading the groups of upcoming phases and
+        converts at most one of their images per frame, so no frame does it all.
+        """
+        for threshold, group in self.groups.items():
+            if threshold in self.released or score < threshold - self.preload_distance:
+                continue
+            if threshold not in self.preloading:
+                self.preloading.add(threshold)
+                IMAGES.prefetch(group["images"])
+                preload_music(group["music"])
+                return
+            for name in group["images"]:
+                if not IMAGES.is_loaded(name):
+                    load_registered(name)
+                    return
+
+    def release(self, threshold):
+        """
+        Drops the assets of a phase once it is over. They are loaded again if
+        a later game reaches the phase.
+        """
+        group = self.groups[threshold]
+        for name in group["images"]:
+            IMAGES.unload(name)
+        unload_music(group["music"])
+        self.preloading.discard(threshold)
+        self.released.add(threshold)
+
+    def reset(self):
+        # New game: every phase can happen again
+        self.released.clear()
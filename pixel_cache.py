@@ -0,0 +1,139 @@
+import pygame
+import os
+import sys
+import mmap
+import struct
+import hashlib
+from asset_pack import asset_key, asset_stat
+
+# Constants
+CACHE_DIR = ".asset_cache"
+# Byte order of 32-bit ARGB pixels, the usual display format, in memory
+PIXEL_FORMAT = "BGRA" if sys.byteorder == "little" else "ARGB"
+HEADER = struct.Struct("<4sIII")  # magic, width, height, alpha
+MAGIC = b"BFPX"
+
+_display_format = None  # See set_display_format, the cache is off until it is called
+_alpha_masks = None  # get_masks() of convert_alpha() surfaces on this display
+
+
+def set_display_format():
+    """
+    Records the pixel formats convert() and convert_alpha() produce on this
+    display, so blobs converted for another display are never reused. Call it
+    on the main thread right after pygame.display.set_mode, before any image
+    is loaded: the loader threads only read the result.
+    """
+    global _display_format, _alpha_masks
+    opaque = pygame.Surface((1, 1)).convert()
+    alpha = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha()
+    _alpha_masks = alpha.get_masks()
+    _display_format = f"{opaque.get_bitsize()}-{opaque.get_masks()}-{alpha.get_bitsize()}-{_alpha_masks}"
+
+
+def get_display_format():
+    """
+    Returns the display format recorded by set_display_format, or None.
+    """
+    return _display_format
+
+
+def _cache_name(file, size=None):
+    # One readable prefix per source file and size, so stale entries of that variant can be found
+    name = asset_key(file).replace("/", "_")
+    if size is not None:
+        name += f"@{size[0]}x{size[1]}"
+    return name
+
+
+def get_cache_path(file, alpha, cache_dir=CACHE_DIR, size=None):
+    """
+    Returns the path of the cached pixels of an image, or None if the source is
+    missing or set_display_format was not called.
+    The name depends on the source path, modification time, size, alpha mode and
+    display pixel format, so any change to the sprite gives a new entry.
+    :param file: Path to the source image file.
+    :param alpha: True for convert_alpha() pixels, False for convert() pixels.
+    :param size: (width, height) of a scaled variant of the image, None for the image itself.
+    """
+    stat = asset_stat(file)
+    if stat is None or _display_format is None:
+        return None
+    key = f"{asset_key(file)}|{stat[0]}|{stat[1]}|{alpha}|{size}|{_display_format}|{PIXEL_FORMAT}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{_cache_name(file, size)}.{digest}.px")
+
+
+def is_cached(file, alpha, cache_dir=CACHE_DIR, size=None):
+    path = get_cache_path(file, alpha, cache_dir, size)
+    return path is not None and os.path.exists(path)
+
+
+def load(file, alpha, cache_dir=CACHE_DIR, size=None):
+    """
+    Builds a Surface straight from the memory-mapped cached pixels of an image.
+    The Surface holds the memory map, which is closed when the Surface is freed.
+    When the display does not use 32-bit ARGB, the pixels are converted instead.
+    :param file: Path to the source image file.
+    :param alpha: True for convert_alpha() pixels, False for convert() pixels.
+    :param size: (width, height) of a scaled variant of the image, None for the image itself.
+    :return: The converted Surface, or None if there is no valid cache entry.
+    """
+    path = get_cache_path(file, alpha, cache_dir, size)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)  # Writes stay private
+        magic, width, height, has_alpha = HEADER.unpack_from(data)
+        if magic != MAGIC or has_alpha != alpha or len(data) != HEADER.size + width * height * 4:
+            data.close()
+            return None
+        image = pygame.image.frombuffer(memoryview(data)[HEADER.size:], (width, height), PIXEL_FORMAT)
+    except (OSError, ValueError, struct.error, pygame.error):
+        return None
+    if not alpha:
+        # Opaque images are stored with a full alpha channel, drop it
+        return image.convert()
+    if image.get_masks() != _alpha_masks:
+        return image.convert_alpha()  # Copied into the display format, the map goes with image
+    return image
+
+
+def store(file, alpha, image, cache_dir=CACHE_DIR, size=None):
+    """
+    Writes the pixels of a converted image to the cache and removes older
+    entries of the same source file. Failures are ignored, the cache is optional.
+    :param file: Path to the source image file.
+    :param alpha: True for convert_alpha() pixels, False for convert() pixels.
+    :param image: The converted Surface.
+    :param size: (width, height) of a scaled variant of the image, None for the image itself.
+    """
+    path = get_cache_path(file, alpha, cache_dir, size)
+    if path is None:
+        return
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        prefix = _cache_name(file, size) + "."
+        for name in os.listdir(cache_dir):
+            old_path = os.path.join(cache_dir, name)
+            # Same source, same alpha mode, different key: the sprite or display changed
+            if name.startswith(prefix) and old_path != path and _is_alpha_entry(old_path) == alpha:
+                os.remove(old_path)
+        pixels = pygame.image.tobytes(image, PIXEL_FORMAT)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, *image.get_size(), int(alpha)))
+            f.write(pixels)
+        os.replace(temp_path, path)
+    except (OSError, pygame.error) as message:
+        print('Cannot cache image:', file, message)
+
+
+def _is_alpha_entry(path):
+    try:
+        with open(path, "rb") as f:
+            magic, width, height, has_alpha = HEADER.unpack(f.read(HEADER.size))
+        return bool(has_alpha)
+    except (OSError, struct.error):
+        return None
@@ -1,6 +1,10 @@
 import pygame
+import math
 import random
 from utils import SCREEN_WIDTH, SCREEN_HEIGHT  # Assuming you have a config.py with constants
+from masks import get_mask, from_surface
+from hitboxes import get_hitbox
+from collision import teleported
 
 class Player(pygame.sprite.Sprite):
     PLAYER_SCORE_BIGGER_THAN_BIG_GREEN_FISH = 30
@@ -27,6 +31,27 @@ class Player(pygame.sprite.Sprite):
     MUNCH_ANIMATION_SPEED = 15  # Adjust this value for slower/faster animation
     INVINCIBILITY_ANIMATION_SPEED = 10  # Speed of toggle between images
     MAX_SIZE_SCORE = 50
+
+    # Area the top left corner of the player can move in
+    MIN_X, MIN_Y = 32, 50
+    MAX_X, MAX_Y = SCREEN_WIDTH - 75, SCREEN_HEIGHT - 75
+
+    # Sign of (dx, dy) -> name of the direction in the image keys
+    DIRECTIONS = {
+        (0, -1): "up",
+        (0, 1): "down",
+        (-1, 0): "left",
+        (1, 0): "right",
+        (-1, -1): "up_left",
+        (1, -1): "up_right",
+        (-1, 1): "down_left",
+        (1, 1): "down_right",
+    }
+    SCALED_CACHE_SIZE = 96  # Scaled (image, face mask, body mask) entries kept, about 7 MB
+
+    # (direction, variant, size_score) -> (image, face mask, body mask), shared by every Player.
+    # The variant is "normal", "munch" or "gold". Oldest entries first.
+    scaled_cache = {}
     
     
     def __init__(self, allsprites, images):
@@ -61,26 +86,26 @@ class Player(pygame.sprite.Sprite):
         
         # Load and store mask images
         self.face_masks = {
-            "left": pygame.mask.from_surface(images["player_left_face"]),
-            "right": pygame.mask.from_surface(images["player_right_face"]),
-            "up": pygame.mask.from_surface(images["player_up_face"]),
-            "down": pygame.mask.from_surface(images["player_down_face"]),
-            "up_left": pygame.mask.from_surface(images["player_up_right_face"]),
-            "up_right": pygame.mask.from_surface(images["player_up_right_face"]),
-            "down_left": pygame.mask.from_surface(images["player_down_left_face"]),
-            "down_right": pygame.mask.from_surface(images["player_down_right_face"])
+            "left": get_mask("player_left_face"),
+            "right": get_mask("player_right_face"),
+            "up": get_mask("player_up_face"),
+            "down": get_mask("player_down_face"),
+            "up_left": get_mask("player_up_right_face"),
+            "up_right": get_mask("player_up_right_face"),
+            "down_left": get_mask("player_down_left_face"),
+            "down_right": get_mask("player_down_right_face")
         }
         
         # Load and store full-body mask images for each direction
         self.body_masks = {
-            "left": pygame.mask.from_surface(images["player_left"]),
-            "right": pygame.mask.from_surface(images["player_right"]),
-            "up": pygame.mask.from_surface(images["player_up"]),
-            "down": pygame.mask.from_surface(images["player_down"]),
-            "up_left": pygame.mask.from_surface(images["player_up_left"]),
-            "up_right": pygame.mask.from_surface(images["player_up_right"]),
-            "down_left": pygame.mask.from_surface(images["player_down_left"]),
-            "down_right": pygame.mask.from_surface(images["player_down_right"])
+            "left": get_mask("player_left"),
+            "right": get_mask("player_right"),
+            "up": get_mask("player_up"),
+            "down": get_mask("player_down"),
+            "up_left": get_mask("player_up_left"),
+            "up_right": get_mask("player_up_right"),
+            "down_left": get_mask("player_down_left"),
+            "down_right": get_mask("player_down_right")
         }
     
         self.current_direction = "left"  # Default direction
@@ -98,11 +123,16 @@ class Player(pygame.sprite.Sprite):
     
         # Initialize self.rect and self.image
         self.image = self.original_image  # Set initial image
+        self.image_variant = "normal"
+        self.render_state = None  # (direction, variant, size_score) self.image and the masks were made for
+        self.image_rebuilds = 0   # Times the render state changed and self.image was replaced
+        self.scaled_builds = 0    # Times an image and its masks had to be scaled (scaled_cache misses)
+        self.frames = 0
         self.rect = self.image.get_rect()
         self.rect.center = (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
     
         # Resize the player image based on the initial image
-        self.resize_player_image_and_masks(self.image)
+        self.resize_player_image_and_masks()
     
         # Add the player to the allsprites group
         allsprites.add(self)
@@ -111,8 +141,6 @@ class Player(pygame.sprite.Sprite):
         self.rect.topleft = (self.pos[0], self.pos[1])
     
         self.last_pressed = 0
-        self.face_mask = self.face_masks[self.current_direction]  # Initialize face mask
-        self.body_mask = self.body_masks[self.current_direction]  # Initialize body mask
         
         self.game_over = False
         self.alpha = 255  # Full opacity
@@ -123,17 +151,19 @@ class Player(pygame.sprite.Sprite):
 
     def update(self):
         if self.game_over:
+            if self.alpha == 255:
+                # The scaled image is shared through scaled_cache, fade a copy of it
+                self.image = self.image.copy()
             self.alpha = max(0, self.alpha - 4)  # Reduce alpha, minimum 0
             self.image.set_alpha(self.alpha)
             return  # Stop further updates if game over
 
-        # Update the position of the player
+        self.frames += 1
+
+        # Update the position of the player, pos keeps the fractions of pixels
         self.rect = self.image.get_rect()
-        newpos = (self.pos[0], self.pos[1])
+        newpos = (round(self.pos[0]), round(self.pos[1]))
         self.rect.topleft = newpos
-    
-        # Update the player's size and masks using the current image
-        self.resize_player_image_and_masks(self.image)
 
         # Decrement powerup timers and reset if over
         if self.star_power > self.NO_STAR_POWER:
@@ -147,33 +177,76 @@ class Player(pygame.sprite.Sprite):
                 self.speed_power = self.NO_SPEED_POWER
                 self.speed_x, self.speed_y = self.REGULAR_MOVE_SPEED, self.REGULAR_MOVE_SPEED
         
-        # Always update the player image to handle animations and resizing
-        self.update_player_image()  # Update the player image regularly
+        # Always update the player image to handle animations and resizing.
+        # This is the only refresh of the tick, moving and eating only change its inputs.
+        self.update_player_image()
 
 
-    def resize_player_image_and_masks(self, base_image):
-        # Scale the base image (player's main image)
-        new_width = base_image.get_width() + self.size_score * 2
-        new_height = base_image.get_height() + self.size_score * 2
-        self.image = pygame.transform.smoothscale(base_image, (new_width, new_height))
+    def resize_player_image_and_masks(self):
+        # Scaled image and masks of the current direction, variant and size, scaled once
+        key = (self.current_direction, self.image_variant, self.size_score)
+        if key == self.render_state:
+            return  # Nothing the image depends on changed
+        self.render_state = key
+        self.image_rebuilds += 1
+        scaled = self.scaled_cache.get(key)
+        if scaled is None:
+            self.scaled_builds += 1
+            scaled = self.scale_image_and_masks(*key)
+            if len(self.scaled_cache) >= self.SCALED_CACHE_SIZE:
+                del self.scaled_cache[next(iter(self.scaled_cache))]
+            self.scaled_cache[key] = scaled
+        self.image, self.face_mask, self.body_mask = scaled
+        self.mask = self.body_mask
+
+        # Update the rect
+        self.rect = self.image.get_rect(center=self.rect.center)
 
-        # Get the corresponding face mask image based on the current direction
-        face_mask_key = "player_" + self.current_direction + "_face"
-        face_mask_image = self.images[face_mask_key]
+    def get_rebuild_stats(self):
+        """
+        Returns how often the player image was replaced and scaled, in total and
+        per frame (frames counted by update), to check the image pipeline in benchmarks.
+        """
+        frames = max(1, self.frames)
+        return {
+            "frames": self.frames,
+            "image_rebuilds": self.image_rebuilds,
+            "scaled_builds": self.scaled_builds,
+            "image_rebuilds_per_frame": self.image_rebuilds / frames,
+            "scaled_builds_per_frame": self.scaled_builds / frames,
+        }
 
-        # Scale the corresponding face mask image
+    def scale_image_and_masks(self, direction, variant, size_score):
+        """
+        Scales the player image of a direction and variant for a size score, with
+        its face and body masks.
+        :param variant: "normal", "munch" or "gold".
+        :return: (image, face mask, body mask)
+        """
+        if variant == "munch":
+            base_image = self.munching_images[direction]
+        elif variant == "gold":
+            base_image = self.get_gold_image(direction)
+        else:
+            base_image = self.original_images[direction]
+
+        # Scale the base image (player's main image)
+        new_width = base_image.get_width() + size_score * 2
+        new_height = base_image.get_height() + size_score * 2
+        image = pygame.transform.smoothscale(base_image, (new_width, new_height))
+
+        # Scale the face mask image of the direction and make the mask from it
+        face_mask_image = self.images["player_" + direction + "_face"]
         face_mask_image = pygame.transform.smoothscale(face_mask_image, (new_width, new_height))
-        
-        # Update the mask from the resized face mask image
-        self.face_mask = pygame.mask.from_surface(face_mask_image)
-        
+        face_mask = from_surface(face_mask_image)
+        face_mask.hitbox = get_hitbox("player_" + direction + "_face", size=(new_width, new_height))
+
         # Scale the corresponding full-body mask image
-        body_mask_image = self.images["player_" + self.current_direction]
+        body_mask_image = self.images["player_" + direction]
         body_mask_image = pygame.transform.smoothscale(body_mask_image, (new_width, new_height))
-        self.body_mask = pygame.mask.from_surface(body_mask_image)
-
-        # Update the rect
-        self.rect = self.image.get_rect(center=self.rect.center)
+        body_mask = from_surface(body_mask_image)
+        body_mask.hitbox = get_hitbox("player_" + direction, size=(new_width, new_height))
+        return image, face_mask, body_mask
 
     def update_player_image(self):
         if self.munching and self.star_power != self.INVINCIBLE_POWERUP:
@@ -182,14 +255,14 @@ class Player(pygame.sprite.Sprite):
             self.handle_normal_and_invincible_animation()
 
         # Resize the player image and update masks
-        self.resize_player_image_and_masks(self.image)
+        self.resize_player_image_and_masks()
 
     def handle_munching_animation(self):
         # Alternate between munching and original image based on munching timer
         if self.munching_timer % self.MUNCH_ANIMATION_SPEED < self.MUNCH_ANIMATION_SPEED // 2:
-            self.image = self.munching_images[self.current_direction]
+            self.image_variant = "munch"
         else:
-            self.image = self.original_images[self.current_direction]
+            self.image_variant = "normal"
 
         # Decrement the munching timer
         self.munching_timer -= 1
@@ -200,26 +273,26 @@ class Player(pygame.sprite.Sprite):
         if self.star_power == self.INVINCIBLE_POWERUP:
             # Toggle between gold and normal image based on the animate timer
             if (self.player_animate_timer // self.INVINCIBILITY_ANIMATION_SPEED) % 2 == 0:
-                self.image = self.get_gold_image()
+                self.image_variant = "gold"
             else:
-                self.image = self.original_images[self.current_direction]
+                self.image_variant = "normal"
 
             self.player_animate_timer += 1
             if self.player_animate_timer >= self.INVINCIBILITY_ANIMATION_SPEED * 2:
                 self.player_animate_timer = 0
         else:
-            self.image = self.original_images[self.current_direction]
+            self.image_variant = "normal"
 
 
-    def get_gold_image(self):
-         gold_image_key = "player_" + self.current_direction + "_gold"
-         return self.images[gold_image_key] if gold_image_key in self.images else self.original_images[self.current_direction]
+    def get_gold_image(self, direction=None):
+         direction = direction or self.current_direction
+         gold_image_key = "player_" + direction + "_gold"
+         return self.images[gold_image_key] if gold_image_key in self.images else self.original_images[direction]
 
         
     def collide_with_prey(self):
         self.munching = True
         self.munching_timer = self.MUNCH_EFFECT_DURATION  # Set duration of munching effect
-        self.update_player_image()
 
     def stop_movement(self):
         if self.speed_power == self.INVINCIBLE_POWERUP:  # Seahorse speed powerup
@@ -229,60 +302,37 @@ class Player(pygame.sprite.Sprite):
         
         else:
             self.speed_x, self.speed_y = self.REGULAR_MOVE_SPEED, self.REGULAR_MOVE_SPEED  # Default speed
+    def move(self, dx, dy):
+        """
+        Moves the player one tick in a direction at its current speed. Diagonals
+        are normalized, so they are not faster than straight moves. The image
+        facing the direction is shown from the next update.
+        :param dx: -1 (left), 0 or 1 (right).
+        :param dy: -1 (up), 0 or 1 (down).
+        """
+        if dx == 0 and dy == 0:
+            return
+        self.current_direction = self.DIRECTIONS[(dx > 0) - (dx < 0), (dy > 0) - (dy < 0)]
+        length = math.hypot(dx, dy)
+        x = self.pos[0] + self.speed_x * dx / length
+        y = self.pos[1] + self.speed_y * dy / length
+        self.pos = [min(max(x, self.MIN_X), self.MAX_X), min(max(y, self.MIN_Y), self.MAX_Y)]
     def move_up(self):
-        self.current_direction = "up"
-        if self.pos[1] > 50:  # Boundary check
-            self.pos[1] -= self.speed_y
-    
-        # Update the player image based on the current state
-        self.update_player_image()
+        self.move(0, -1)
     def move_down(self):
-        self.current_direction = "down"
-        if self.pos[1] < SCREEN_HEIGHT-75:
-            self.pos[1] += self.speed_y
-        self.update_player_image()
+        self.move(0, 1)
     def move_left(self):
-        self.current_direction = "left"
-        if self.pos[0] > 32:
-            self.pos[0] -= self.speed_x
-        self.update_player_image()
+        self.move(-1, 0)
     def move_right(self):
-        self.current_direction = "right"
-        if self.pos[0] < SCREEN_WIDTH-75:
-            self.pos[0] += self.speed_x
-        self.update_player_image()
+        self.move(1, 0)
     def move_up_left(self):
-        self.current_direction = "up_left"
-                
-        # Update position for diagonal movement
-        if self.pos[1] > 50 and self.pos[0] > 32:
-            self.pos[0] -= self.speed_x
-            self.pos[1] -= self.speed_y
-        self.update_player_image()
+        self.move(-1, -1)
     def move_up_right(self):
-        self.current_direction = "up_right"
-                
-        # Update position for diagonal movement
-        if self.pos[1] > 50 and self.pos[0] < SCREEN_WIDTH-75:
-            self.pos[0] += self.speed_x
-            self.pos[1] -= self.speed_y
-        self.update_player_image()
+        self.move(1, -1)
     def move_down_left(self):
-        self.current_direction = "down_left"
-        
-        # Update position for diagonal movement
-        if self.pos[1] < SCREEN_HEIGHT-75 and self.pos[0] > 32:
-            self.pos[0] -= self.speed_x
-            self.pos[1] += self.speed_y
-        self.update_player_image()
+        self.move(-1, 1)
     def move_down_right(self):
-        self.current_direction = "down_right"
-                
-        # Update position for diagonal movement
-        if self.pos[1] < SCREEN_HEIGHT-75 and self.pos[0] < SCREEN_WIDTH-75:
-            self.pos[0] += self.speed_x
-            self.pos[1] += self.speed_y
-        self.update_player_image()
+        self.move(1, 1)
     def collide_with_seahorse(self):
         self.collide_with_prey()
         self.speed_power = self.SPEED_SURGE
@@ -299,18 +349,20 @@ class Player(pygame.sprite.Sprite):
         self.collide_with_prey()
         self.star_power = random.choice([self.INVINCIBLE_POWERUP, self.SHARK_SHRINKER_POWERUP])
         self.powerup_time_left = self.STAR_POWERUP_TIMER_IN_TICKS
-    def get_powerup_timer_text(self, font):
+    def get_powerup_timer_text(self):
+        # (text, color) of the powerup timer in the top bar
         if self.star_power != self.NO_STAR_POWER:
-            return font.render("Powerup Timer: " + str((self.powerup_time_left//100)+1), 1, (235, 210, 0))
-        return font.render("", 1, (0, 0, 0))
-    def get_speed_timer_text(self, font):
+            return "Powerup Timer: " + str((self.powerup_time_left//100)+1), (235, 210, 0)
+        return "", (0, 0, 0)
+    def get_speed_timer_text(self):
+        # (text, color) of the speed timer in the top bar
         if self.speed_power == self.SPEED_SURGE:
-            return font.render("Speed Timer: " + str((self.speed_time_left//100)+1), 1, (0, 235, 30))
+            return "Speed Timer: " + str((self.speed_time_left//100)+1), (0, 235, 30)
 
         elif self.speed_power == self.SPEED_STUN:
-            return font.render("Sting Timer: " + str((self.speed_time_left//100)+1), 1, (255, 165, 0))
+            return "Sting Timer: " + str((self.speed_time_left//100)+1), (255, 165, 0)
         else:
-            return font.render("", 1, (0, 0, 0))
+            return "", (0, 0, 0)
     def predator_eat_player_collision(self, enemy_object):
         if self.lives > 0:
             self.lives -= 1  # Reduce lives on collision
@@ -327,6 +379,7 @@ class Player(pygame.sprite.Sprite):
     # Reset position and other state if needed after losing a life
         self.pos = [SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 + 100]
         self.rect.topleft = (self.pos[0], self.pos[1])
+        teleported(self)
         self.star_power = self.INVINCIBLE_POWERUP
         self.powerup_time_left = self.RESET_POWERUP_TIMER_IN_TICKS
     def draw_lives(self, screen, heart_image):
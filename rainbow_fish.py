@@ -1,6 +1,8 @@
 import pygame
 import random
-from utils import SCREEN_WIDTH, SCREEN_HEIGHT  # Assuming you have a config.py with constants
+from utils import SCREEN_WIDTH, SCREEN_HEIGHT, get_image_variant  # Assuming you have a config.py with constants
+from masks import get_mask
+from collision import teleported
 
 class RainbowFish(pygame.sprite.Sprite):
     MAX_SIZE = [140, 50]  # Maximum size for the RainbowFish
@@ -20,7 +22,8 @@ class RainbowFish(pygame.sprite.Sprite):
     def __init__(self, allsprites, images):
         pygame.sprite.Sprite.__init__(self)
         self.images = images
-        self.image = self.images["spr_rainbow_fish_left"]
+        self.image_name = "spr_rainbow_fish_left"  # Image shown, before scaling to size
+        self.image = self.images[self.image_name]
         self.rect = self.image.get_rect()
         allsprites.add(self)
         self.is_exiting = False
@@ -39,16 +42,17 @@ class RainbowFish(pygame.sprite.Sprite):
         
         # Initialize face and body masks
         self.face_masks = {
-            "left": pygame.mask.from_surface(images["spr_rainbow_fish_left_face"]),
-            "right": pygame.mask.from_surface(images["spr_rainbow_fish_right_face"])
+            "left": get_mask("spr_rainbow_fish_left_face"),
+            "right": get_mask("spr_rainbow_fish_right_face")
         }
         self.body_masks = {
-            "left": pygame.mask.from_surface(images["spr_rainbow_fish_left"]),
-            "right": pygame.mask.from_surface(images["spr_rainbow_fish_right"])
+            "left": get_mask("spr_rainbow_fish_left"),
+            "right": get_mask("spr_rainbow_fish_right")
         }
         
         self.face_mask = self.face_masks[self.current_direction]
         self.body_mask = self.body_masks[self.current_direction]
+        self.mask = get_mask(self.image_name)
         
         self.game_over = False
         
@@ -61,7 +65,7 @@ class RainbowFish(pygame.sprite.Sprite):
             return
         self.rainbow_timer += 1
         # Scale the image
-        self.image = pygame.transform.smoothscale(self.image, (self.size[0], self.size[1]))
+        self.image = get_image_variant(self.image_name, size=tuple(self.size))
         self.update_masks()
 
         # Handle the descent
@@ -86,7 +90,8 @@ class RainbowFish(pygame.sprite.Sprite):
         
     def animate_turning(self, new_direction):
         if not self.is_turning:
-            self.image = self.images["spr_rainbow_fish_turning"]
+            self.image_name = "spr_rainbow_fish_turning"
+            self.image = self.images[self.image_name]
             self.is_turning = True
             self.turning_timer = pygame.time.get_ticks() + RainbowFish.TURN_TIME_MS
         elif pygame.time.get_ticks() > self.turning_timer:
@@ -96,22 +101,23 @@ class RainbowFish(pygame.sprite.Sprite):
             self.update_image_direction()
             
     def update_image_direction(self):
-        self.image = self.images[f"spr_rainbow_fish_{self.current_direction}"]
+        self.image_name = f"spr_rainbow_fish_{self.current_direction}"
+        self.image = self.images[self.image_name]
         self.update_masks()
 
     def update_masks(self):
         """
         Update the body and face masks based on the current direction and size.
         """
+        size = tuple(self.size)
         # Update body mask
-        body_image = self.images[f"spr_rainbow_fish_{self.current_direction}"]
-        scaled_body_image = pygame.transform.smoothscale(body_image, (self.size[0], self.size[1]))
-        self.body_mask = pygame.mask.from_surface(scaled_body_image)
+        self.body_mask = get_mask(f"spr_rainbow_fish_{self.current_direction}", size=size)
 
         # Update face mask
-        face_image = self.images[f"spr_rainbow_fish_{self.current_direction}_face"]
-        scaled_face_image = pygame.transform.smoothscale(face_image, (self.size[0], self.size[1]))
-        self.face_mask = pygame.mask.from_surface(scaled_face_image)
+        self.face_mask = get_mask(f"spr_rainbow_fish_{self.current_direction}_face", size=size)
+
+        # Mask of the image shown, turning or not
+        self.mask = get_mask(self.image_name, size=size)
 
 
     def decide_chase_or_avoid(self, player_size_score, is_player_invincibile, player_pos):
@@ -161,6 +167,8 @@ class RainbowFish(pygame.sprite.Sprite):
             self.size[0] += 10
             self.size[1] += 10
             self.size_score += self.INCREMENTAL_SIZE_SCORE
+        self.rect.topleft = self.pos
+        teleported(self)
     
     def avoid_player(self, player_pos):
         #Avoid Player
@@ -1,22 +1,26 @@
 import pygame
 import random
-from utils import SCREEN_WIDTH, SCREEN_HEIGHT  # Assuming you have a config.py with constants
+from utils import SCREEN_WIDTH, SCREEN_HEIGHT, get_image_variant  # Assuming you have a config.py with constants
+from masks import get_mask
+from collision import teleported
+from arena import ARENA
 
 class RedFish(pygame.sprite.Sprite):
     EDGE_PADDING = 100
     CHANGE_DIR_RANGE = (100, 600)
     MOVE_SPEED = 2
     SPEED_CHOICES = [-MOVE_SPEED, MOVE_SPEED]
-    WALL_PADDING = 32
-    BOTTOM_WALL_Y = SCREEN_HEIGHT - 64
-    RIGHT_WALL_X = SCREEN_WIDTH - 32
     PLAYER_SCORE_VALUE = 1
+    WALL_LIMITS = ARENA.get_limits(bottom=SCREEN_HEIGHT - 64)
+    WALL_ORDER = ("left", "bottom", "right", "top")  # A fish in a corner turns for the first one
 
 
     def __init__(self, allsprites, images):
         super().__init__()
         self.images = images
         self.original_image = images["spr_red_fish"]  # Save the original image
+        self.flipped = False
+        self.mask = get_mask("spr_red_fish")
         self.rect = self.original_image.get_rect()
         allsprites.add(self)
         self.direction = (random.choice(self.SPEED_CHOICES), random.choice(self.SPEED_CHOICES))
@@ -58,9 +62,16 @@ class RedFish(pygame.sprite.Sprite):
     def update_image_direction(self):
         # Update the original_image based on the current direction
         if self.direction[0] == -2:
-            self.original_image = pygame.transform.flip(self.images["spr_red_fish"], True, False)
+            flipped = True
         elif self.direction[0] == 2:
-            self.original_image = self.images["spr_red_fish"]
+            flipped = False
+        else:
+            flipped = self.flipped
+        if flipped == self.flipped:
+            return  # Same image, the alpha surface is still right
+        self.flipped = flipped
+        self.original_image = get_image_variant("spr_red_fish", flipped)
+        self.mask = get_mask("spr_red_fish", flipped)
 
         # Update the alpha surface with the new image direction
         self.alpha_surface = pygame.Surface(self.original_image.get_size(), pygame.SRCALPHA)
@@ -75,19 +86,23 @@ class RedFish(pygame.sprite.Sprite):
                                             (self.direction[0] * -1, self.direction[1] * -1)])
             self.change_dir_timer = 0
 
-    def collision_with_wall(self, rect):
-        if self.rect.colliderect(rect):
+    def collision_with_wall(self):
+        if ARENA.touches(self.rect):
             self.change_dir_timer = 0
             self.bounce_off_walls()
 
     def bounce_off_walls(self):
-        if self.rect.left < self.WALL_PADDING:  # Left wall
+        # The bottom wall is tested on the top of the fish
+        limits = self.WALL_LIMITS.copy()
+        limits.height += self.rect.height
+        side = ARENA.side(self.rect, limits, self.WALL_ORDER)
+        if side == "left":  # Left wall
             self.direction = (self.MOVE_SPEED, random.choice(self.SPEED_CHOICES))
-        elif self.rect.top > self.BOTTOM_WALL_Y:  # Bottom wall
+        elif side == "bottom":  # Bottom wall
             self.direction = (random.choice(self.SPEED_CHOICES), -self.MOVE_SPEED)
-        elif self.rect.right > self.RIGHT_WALL_X:  # Right wall
+        elif side == "right":  # Right wall
             self.direction = (-self.MOVE_SPEED, random.choice(self.SPEED_CHOICES))
-        elif self.rect.top < self.WALL_PADDING:  # Top wall
+        elif side == "top":  # Top wall
             self.direction = (random.choice(self.SPEED_CHOICES), self.MOVE_SPEED)
 
     def reset_position(self):
@@ -98,6 +113,7 @@ class RedFish(pygame.sprite.Sprite):
         # Reposition the sprite
         self.rect.topleft = (random.randrange(self.EDGE_PADDING, SCREEN_WIDTH - self.EDGE_PADDING),
                              random.randrange(self.EDGE_PADDING, SCREEN_HEIGHT - self.EDGE_PADDING))
+        teleported(self)
 
         # Initialize the fade-in process
         self.fading_in = True
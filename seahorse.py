@@ -1,6 +1,8 @@
 import pygame
 import random
-from utils import SCREEN_WIDTH, SCREEN_HEIGHT  # Assuming you have a config.py with constants
+from utils import SCREEN_WIDTH, SCREEN_HEIGHT, get_image_variant  # Assuming you have a config.py with constants
+from masks import get_mask
+from collision import teleported
 
 
 class Seahorse(pygame.sprite.Sprite):
@@ -15,6 +17,7 @@ class Seahorse(pygame.sprite.Sprite):
         pygame.sprite.Sprite.__init__(self)
         self.images = images
         self.image = images["spr_seahorse"]
+        self.mask = get_mask("spr_seahorse")
         self.rect = self.image.get_rect()
         allsprites.add(self)
         self.reset_position()
@@ -30,10 +33,9 @@ class Seahorse(pygame.sprite.Sprite):
         self.update_image()
 
     def update_image(self):
-        if self.direction == Seahorse.MOVE_RIGHT:
-            self.image = pygame.transform.flip(self.images["spr_seahorse"], True, False)
-        else:
-            self.image = self.images["spr_seahorse"]
+        flip = self.direction == Seahorse.MOVE_RIGHT
+        self.image = get_image_variant("spr_seahorse", flip)
+        self.mask = get_mask("spr_seahorse", flip)
 
     def move(self):
         move_amount = 3 if self.direction == Seahorse.MOVE_RIGHT else -3
@@ -50,6 +52,7 @@ class Seahorse(pygame.sprite.Sprite):
     def reset_position(self):
         self.rect.topleft = (random.choice([Seahorse.OFF_SCREEN_LEFT, Seahorse.OFF_SCREEN_RIGHT]),
                              random.randrange(50, SCREEN_HEIGHT - 200))
+        teleported(self)
         self.direction = Seahorse.MOVE_RIGHT if self.rect.left == Seahorse.OFF_SCREEN_LEFT else Seahorse.MOVE_LEFT
         self.restart_timer = 0  # Reset the timer
 
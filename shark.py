@@ -1,6 +1,9 @@
 import pygame
 import random
-from utils import SCREEN_WIDTH, SCREEN_HEIGHT  # Assuming you have a config.py with constants
+from utils import SCREEN_WIDTH, SCREEN_HEIGHT, get_image_variant  # Assuming you have a config.py with constants
+from masks import get_mask
+from arena import ARENA
+from collision import teleported
 
 class Shark(pygame.sprite.Sprite):
     TURN_TIME_MS = 50
@@ -14,6 +17,8 @@ class Shark(pygame.sprite.Sprite):
     MOVE_AVOID_SPEED = 2
     OFFSET_FROM_WALL = 10
     DESCEND_SPEED = 1
+    MINI_SHARK_SIZE = (60, 30)
+    WALL_LIMITS = ARENA.get_limits(bottom=SCREEN_HEIGHT - 64)
     def __init__(self, allsprites, images):
         """
         Most frequently-seen predator in the game.
@@ -35,7 +40,7 @@ class Shark(pygame.sprite.Sprite):
         self.rect.topleft = (random.randrange(100, SCREEN_WIDTH - 100), self.Y_POSITION_SPAWN)
         self.stop_timer = 0
         self.initial_descent_complete = False
-        self.mask = pygame.mask.from_surface(self.face_image)
+        self.mask = get_mask("spr_shark_face_left")
         
         self.game_over = False
         self.chase_timer_start = None
@@ -109,7 +114,7 @@ class Shark(pygame.sprite.Sprite):
             if self.stop_timer > current_time:
                 # During the turning time, keep the turning sprite
                 if self.mini_shark == True:
-                    self.image = pygame.transform.smoothscale(self.images["spr_shark_turning"], (60, 30))
+                    self.image = get_image_variant("spr_shark_turning", size=self.MINI_SHARK_SIZE)
                 else:
                     self.image = self.images["spr_shark_turning"]
                 # Do not move while in turning animation
@@ -122,27 +127,21 @@ class Shark(pygame.sprite.Sprite):
 
     def update_image_and_mask(self):
         # Update image based on direction
+        side = "right" if self.direction[0] > 0 else "left"
         if self.mini_shark == True:
-            if self.direction[0] > 0:
-                self.image = pygame.transform.smoothscale(self.images["spr_shark_right"], (60, 30))
-            else:
-                self.image = pygame.transform.smoothscale(self.images["spr_shark_left"], (60, 30))
-            self.mask = pygame.mask.from_surface(self.image)
+            self.image = get_image_variant("spr_shark_" + side, size=self.MINI_SHARK_SIZE)
+            self.mask = get_mask("spr_shark_" + side, size=self.MINI_SHARK_SIZE)
             
         else:
-            if self.direction[0] > 0:
-                self.image = self.images["spr_shark_right"]
-                self.face_image = self.images["spr_shark_face_right"]
-            else:
-                self.image = self.images["spr_shark_left"]
-                self.face_image = self.images["spr_shark_face_left"]
-            self.mask = pygame.mask.from_surface(self.face_image)
+            self.image = self.images["spr_shark_" + side]
+            self.face_image = self.images["spr_shark_face_" + side]
+            self.mask = get_mask("spr_shark_face_" + side)
     def move_shark(self):
         if self.rect.topleft[1] >= 0:
             newpos = self.rect.topleft[0] + self.direction[0], self.rect.topleft[1] + self.direction[1]
             self.rect.topleft = newpos
-    def collision_with_wall(self, rect):
-        if self.rect.colliderect(rect):
+    def collision_with_wall(self):
+        if ARENA.touches(self.rect):
             # Change direction immediately on collision
             self.update_direction()
 
@@ -166,24 +165,25 @@ class Shark(pygame.sprite.Sprite):
     def update_direction(self):
         # Determine the new direction based on which wall the shark collided with
         # The actual direction update happens after the turning animation
-        if self.rect.left < 32:  # Collided with left wall
+        side = ARENA.side(self.rect, self.WALL_LIMITS)
+        if side == "left":  # Collided with left wall
             self.direction = (self.MOVE_SPEED, random.choice([-self.MOVE_SPEED, self.MOVE_SPEED]))
-        elif self.rect.right > SCREEN_WIDTH - 32:  # Collided with right wall
+        elif side == "right":  # Collided with right wall
             self.direction = (-self.MOVE_SPEED, random.choice([-self.MOVE_SPEED, self.MOVE_SPEED]))
-        elif self.rect.top < 32:  # Collided with top wall
+        elif side == "top":  # Collided with top wall
             self.direction = (random.choice([-self.MOVE_SPEED, self.MOVE_SPEED]), self.MOVE_SPEED)
-        elif self.rect.bottom > SCREEN_HEIGHT - 64:  # Collided with bottom wall
+        elif side == "bottom":  # Collided with bottom wall
             self.direction = (random.choice([-self.MOVE_SPEED, self.MOVE_SPEED]), -self.MOVE_SPEED)
 
         # Update sprite based on new direction
         if self.direction[0] > 0:
             if self.mini_shark == True:
-                pygame.transform.smoothscale(self.images["spr_shark_right"], (60, 30))
+                self.image = get_image_variant("spr_shark_right", size=self.MINI_SHARK_SIZE)
             else:
                 self.image = self.images["spr_shark_right"]
         else:
             if self.mini_shark == True:
-                pygame.transform.smoothscale(self.images["spr_shark_left"], (60, 30))
+                self.image = get_image_variant("spr_shark_left", size=self.MINI_SHARK_SIZE)
             else:
                 self.image = self.images["spr_shark_left"]
     def handle_timer_event(self):
@@ -227,6 +227,7 @@ class Shark(pygame.sprite.Sprite):
 
     def reinitialize_for_next_spawn(self):
         self.rect.topleft = (random.randrange(100, SCREEN_WIDTH-100), self.Y_POSITION_SPAWN)
+        teleported(self)
         self.initial_descent_complete = False
     def collide_with_bright_blue_fish(self):
         self.reinitialize_for_next_spawn()
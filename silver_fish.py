@@ -1,6 +1,8 @@
 import pygame
 import random
-from utils import SCREEN_WIDTH, SCREEN_HEIGHT
+from utils import SCREEN_WIDTH, SCREEN_HEIGHT, get_image_variant
+from masks import get_mask
+from collision import teleported
 
 class SilverFish(pygame.sprite.Sprite):
     OFFSCREEN_LEFT = -50
@@ -16,6 +18,7 @@ class SilverFish(pygame.sprite.Sprite):
         super().__init__()
         self.images = images
         self.image = images["spr_silver_fish"]
+        self.mask = get_mask("spr_silver_fish")
         self.rect = self.image.get_rect()
         self.rect.topleft = (self.OFFSCREEN_LEFT, random.randrange(*self.SPAWN_Y_RANGE))  # Initially offscreen
         self.restart_timer = 0
@@ -37,9 +40,11 @@ class SilverFish(pygame.sprite.Sprite):
         if self.direction == 1:  # Moving right
             self.rect.move_ip(self.MOVE_SPEED, 0)
             self.image = self.images["spr_silver_fish"]
+            self.mask = get_mask("spr_silver_fish")
         elif self.direction == 0:  # Moving left
             self.rect.move_ip(-self.MOVE_SPEED, 0)
-            self.image = pygame.transform.flip(self.images["spr_silver_fish"], True, False)
+            self.image = get_image_variant("spr_silver_fish", True)
+            self.mask = get_mask("spr_silver_fish", True)
 
     def check_bounds_and_reset(self):
         if (self.rect.left > SCREEN_WIDTH and self.direction == 1) or \
@@ -52,6 +57,7 @@ class SilverFish(pygame.sprite.Sprite):
         x_position = random.choice([self.OFFSCREEN_LEFT, self.OFFSCREEN_RIGHT])
         y_position = random.randrange(*self.SPAWN_Y_RANGE)
         self.rect.topleft = (x_position, y_position)
+        teleported(self)
         self.direction = random.choice([0, 1])
 
     def collide_with_player(self):
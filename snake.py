@@ -1,6 +1,8 @@
 import pygame
 import random
-from utils import SCREEN_WIDTH, SCREEN_HEIGHT
+from utils import SCREEN_WIDTH, SCREEN_HEIGHT, get_image_variant
+from masks import get_mask
+from collision import teleported
 
 class Snake(pygame.sprite.Sprite):
     OFF_SCREEN_LEFT = -80
@@ -20,6 +22,7 @@ class Snake(pygame.sprite.Sprite):
         pygame.sprite.Sprite.__init__(self)
         self.images = images
         self.image = self.images["spr_snake_1"]
+        self.mask = get_mask("spr_snake_1")
         self.rect = self.image.get_rect()
         allsprites.add(self)
 
@@ -71,6 +74,7 @@ class Snake(pygame.sprite.Sprite):
             self.rect.x = 0
         if self.rect.x + self.rect.width > SCREEN_WIDTH:  # Avoid going off-screen right
             self.rect.x = SCREEN_WIDTH - self.rect.width
+        teleported(self)
 
         # Reset the image to match the new size
         self.image = pygame.transform.scale(self.images["spr_snake_1"], (self.rect.width, self.rect.height))
@@ -78,10 +82,9 @@ class Snake(pygame.sprite.Sprite):
 
     def update_animation(self):
         frame = (self.snake_animator // 5) % 4 + 1
-        if self.direction == Snake.DIRECTION_LEFT:
-            self.image = self.images[f"spr_snake_{frame}"]
-        else:
-            self.image = pygame.transform.flip(self.images[f"spr_snake_{frame}"], True, False)
+        flip = self.direction != Snake.DIRECTION_LEFT
+        self.image = get_image_variant(f"spr_snake_{frame}", flip)
+        self.mask = get_mask(f"spr_snake_{frame}", flip)
 
     def is_in_game_world(self):
         return self.rect.right > Snake.OFF_SCREEN_LEFT and self.rect.left < Snake.OFF_SCREEN_RIGHT
@@ -0,0 +1,95 @@
+import pygame
+import os
+import mmap
+import struct
+import hashlib
+from asset_pack import asset_key, asset_stat
+from pixel_cache import CACHE_DIR
+
+# Constants
+HEADER = struct.Struct("<4siiiI")  # magic, frequency, sample format, channels, data size
+MAGIC = b"BFSN"
+
+
+def get_mixer_format():
+    """
+    Returns (frequency, format, channels) of the mixer, or None if it is not initialized.
+    Cached samples are only valid for the mixer format they were converted to.
+    """
+    return pygame.mixer.get_init()
+
+
+def _cache_name(file):
+    # One readable prefix per source file, so stale entries of that file can be found
+    return asset_key(file).replace("/", "_")
+
+
+def get_cache_path(file, cache_dir=CACHE_DIR):
+    """
+    Returns the path of the cached samples of a sound, or None if the source is
+    missing or the mixer is not initialized. The name depends on the source path,
+    modification time, size and mixer format, so any change gives a new entry.
+    :param file: Path to the source sound file.
+    """
+    stat = asset_stat(file)
+    mixer_format = get_mixer_format()
+    if stat is None or mixer_format is None:
+        return None
+    key = f"{asset_key(file)}|{stat[0]}|{stat[1]}|{mixer_format}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{_cache_name(file)}.{digest}.pcm")
+
+
+def load(file, cache_dir=CACHE_DIR):
+    """
+    Builds a Sound straight from the memory-mapped cached samples of a sound
+    file, without decoding or resampling it.
+    :param file: Path to the source sound file.
+    :return: The Sound, or None if there is no valid cache entry.
+    """
+    path = get_cache_path(file, cache_dir)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, frequency, sample_format, channels, size = HEADER.unpack_from(data)
+            if magic != MAGIC or (frequency, sample_format, channels) != get_mixer_format() \
+                    or len(data) != HEADER.size + size:
+                return None
+            with memoryview(data) as view:
+                # The mixer keeps its own copy of the samples
+                return pygame.mixer.Sound(buffer=view[HEADER.size:])
+        finally:
+            data.close()
+    except (OSError, ValueError, struct.error, pygame.error):
+        return None
+
+
+def store(file, sound, cache_dir=CACHE_DIR):
+    """
+    Writes the samples of a decoded sound to the cache and removes older
+    entries of the same source file. Failures are ignored, the cache is optional.
+    :param file: Path to the source sound file.
+    :param sound: The Sound decoded from file.
+    """
+    path = get_cache_path(file, cache_dir)
+    if path is None:
+        return
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        prefix = _cache_name(file) + "."
+        for name in os.listdir(cache_dir):
+            old_path = os.path.join(cache_dir, name)
+            # Same source, different key: the sound file or the mixer format changed
+            if name.startswith(prefix) and name.endswith(".pcm") and old_path != path:
+                os.remove(old_path)
+        samples = sound.get_raw()
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, *get_mixer_format(), len(samples)))
+            f.write(samples)
+        os.replace(temp_path, path)
+    except (OSError, pygame.error) as message:
+        print('Cannot cache sound:', file, message)
@@ -1,6 +1,8 @@
 import pygame
 import random
 from utils import SCREEN_WIDTH, SCREEN_HEIGHT  # Assuming you have a config.py with constants
+from masks import get_mask
+from collision import teleported
 
 class StarPowerup(pygame.sprite.Sprite):
     OFF_SCREEN_RIGHT = SCREEN_WIDTH
@@ -16,6 +18,7 @@ class StarPowerup(pygame.sprite.Sprite):
         pygame.sprite.Sprite.__init__(self)
         self.images = images
         self.image = images["spr_star_1"]
+        self.mask = get_mask("spr_star_1")
         self.rect = self.image.get_rect()
         allsprites.add(self)
         self.timer = -StarPowerup.RESPAWN_TIMER
@@ -46,12 +49,14 @@ class StarPowerup(pygame.sprite.Sprite):
         else:
             self.rect.x = StarPowerup.OFF_SCREEN_LEFT - self.rect.width  # Adjust for sprite width
         self.rect.y = StarPowerup.BOTTOM_POSITION_Y
+        teleported(self)
         self.timer = -StarPowerup.RESPAWN_TIMER
 
     def update_animation(self):
         # Determine which frame of the animation to show
         frame = (self.star_animator // 10) % 3 + 1  # Cycles through frames 1-2-3
         self.image = self.images[f"spr_star_{frame}"]
+        self.mask = get_mask(f"spr_star_{frame}")
 
 
     def collide_with_player(self):
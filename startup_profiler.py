@@ -0,0 +1,130 @@
+import sys
+import os
+import time
+import json
+import threading
+import functools
+from contextlib import contextmanager
+
+# Constants
+ENABLED = "--profile-startup" in sys.argv
+TIMELINE_FILE = "startup_timeline.json"
+REPORT_LINES = 25  # Longest spans shown in the printed report
+
+START = time.perf_counter()  # Import time of this module, the first thing main.py does
+SPANS = []  # (name, category, start, end, thread name), times relative to START
+_finished = False
+
+
+def record(name, category, start, end=None):
+    """
+    Adds a span to the timeline.
+    :param name: What happened, e.g. "load_image sprites/player_down.png".
+    :param category: Group of the span in the report ("display", "image", "sound", ...).
+    :param start: perf_counter() value when it started.
+    :param end: perf_counter() value when it ended, now if None.
+    """
+    if not ENABLED or _finished:
+        return
+    if end is None:
+        end = time.perf_counter()
+    SPANS.append((name, category, start - START, end - START, threading.current_thread().name))
+
+
+@contextmanager
+def span(name, category):
+    """
+    Records the duration of a with block, e.g. with span("pygame.init", "display"): ...
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, category, start)
+
+
+def traced(category):
+    """
+    Decorator recording a span for every call of a loader. The span is named
+    after the function and its first argument (the file or font name).
+    Does nothing unless the game was started with --profile-startup.
+    """
+    def decorator(function):
+        if not ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                label = f"{function.__name__} {args[0]}" if args else function.__name__
+                record(label, category, start)
+        return wrapper
+    return decorator
+
+
+def write_timeline(path=TIMELINE_FILE):
+    """
+    Writes the spans in the Trace Event format (chrome://tracing, Perfetto),
+    plus per-category totals to compare releases.
+    """
+    thread_ids = {}
+    events = []
+    for name, category, start, end, thread in SPANS:
+        tid = thread_ids.setdefault(thread, len(thread_ids))
+        events.append({"name": name, "cat": category, "ph": "X", "pid": 0, "tid": tid,
+                       "ts": round(start * 1e6), "dur": round((end - start) * 1e6)})
+    for thread, tid in thread_ids.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": 0, "tid": tid, "args": {"name": thread}})
+    timeline = {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {
+            "total_ms": round(max((end for _, _, _, end, _ in SPANS), default=0) * 1000, 3),
+            "categories_ms": {category: round(total * 1000, 3) for category, total in _category_totals().items()},
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+        },
+    }
+    with open(path, "w") as f:
+        json.dump(timeline, f, indent=1)
+
+
+def _category_totals():
+    totals = {}
+    for name, category, start, end, thread in SPANS:
+        totals[category] = totals.get(category, 0) + end - start
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def print_report(lines=REPORT_LINES):
+    """
+    Prints the longest spans, then the time spent per category.
+    Spans of worker threads overlap the main thread, so totals can exceed the wall time.
+    """
+    total = max((end for _, _, _, end, _ in SPANS), default=0)
+    print(f"Startup profile: {total * 1000:.1f} ms until the first music.play, {len(SPANS)} spans")
+    print(f"{'ms':>9} {'start':>9}  {'category':<8} {'thread':<12} name")
+    for name, category, start, end, thread in sorted(SPANS, key=lambda s: s[2] - s[3])[:lines]:
+        print(f"{(end - start) * 1000:9.2f} {start * 1000:9.2f}  {category:<8} {thread[:12]:<12} {name}")
+    for category, category_total in _category_totals().items():
+        print(f"{category_total * 1000:9.2f} ms in {category}")
+
+
+def finish(path=TIMELINE_FILE):
+    """
+    Ends the startup profile: prints the report and writes the timeline.
+    Later calls of the loaders are not recorded.
+    """
+    global _finished
+    if not ENABLED or _finished:
+        return
+    _finished = True
+    print_report()
+    try:
+        write_timeline(path)
+        print("Startup timeline written to", os.path.abspath(path))
+    except OSError as message:
+        print('Cannot write startup timeline:', path, message)
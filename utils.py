@@ -1,16 +1,241 @@
 import pygame
+import io
 import os
+import sys
+import threading
+import collections
+from atlas import ATLAS_DIR, asset_key, load_manifest
+import pixel_cache
+import sound_cache
+from asset_pack import open_asset, read_asset
+from startup_profiler import traced
 
 # Constants
 SCREEN_WIDTH, SCREEN_HEIGHT = 1024, 600
 FPS = 60
 TOP_UI_LAYER_HEIGHT = 60
+THREADS_AVAILABLE = sys.platform != "emscripten"  # No threads in browser (pygbag) builds
+LOADER_THREADS = min(8, (os.cpu_count() or 1) + 2) if THREADS_AVAILABLE else 0
 
-IMAGES = {}
-SOUNDS = {}
-FONTS = {}
+class AssetRegistry(dict):
+    """
+    Dictionary of loaded assets that also knows about registered assets which
+    are not loaded yet. A registered asset is loaded on first access, so
+    IMAGES["ground_black"] works whether or not it has been loaded before.
+    Only loaded assets are visible to keys(), values() and iteration.
+    """
+    def __init__(self, decoder=None):
+        """
+        :param decoder: Function decoding a file on a background thread for prefetch,
+                        e.g. pygame.image.load. None disables prefetching.
+        """
+        super().__init__()
+        self.decoder = decoder
+        self.pending = {}     # name -> (loader, file)
+        self.loaders = {}     # name -> (loader, file) of every registered asset, to reload it
+        self.prefetched = {}  # name -> decoded data of its file waiting for its first access
+        self._lock = threading.Lock()
+
+    def register(self, name, loader, file=None):
+        """
+        Registers an asset without loading it.
+        :param name: Key of the asset.
+        :param loader: Function called with the prefetched data of file (or None)
+                       that loads and returns the asset.
+        :param file: File the asset is decoded from, used by prefetch.
+        """
+        super().pop(name, None)
+        self.pending[name] = self.loaders[name] = (loader, file)
+
+    def transform(self, name, function):
+        """
+        Replaces an asset with function(asset), now if it is loaded or on
+        first access otherwise.
+        """
+        if name in self.loaders:
+            loader, file = self.loaders[name]
+            self.loaders[name] = (lambda decoded: function(loader(decoded)), file)
+        if name in self.pending:
+            self.pending[name] = self.loaders[name]
+        else:
+            self[name] = function(self[name])
+
+    def __missing__(self, name):
+        entry = self.pending.pop(name, None)
+        if entry is None:
+            raise KeyError(name)
+        loader, file = entry
+        with self._lock:
+            decoded = self.prefetched.pop(name, None)
+        asset = loader(decoded)
+        if asset is None:
+            # The loader already reported the error
+            raise KeyError(name)
+        super().__setitem__(name, asset)
+        return asset
+
+    def __setitem__(self, name, asset):
+        self.pending.pop(name, None)
+        with self._lock:
+            self.prefetched.pop(name, None)  # Not needed once the asset is there
+        super().__setitem__(name, asset)
+
+    def __contains__(self, name):
+        return super().__contains__(name) or name in self.pending
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def is_loaded(self, name):
+        return super().__contains__(name)
+
+    def unload(self, name):
+        """
+        Frees a loaded asset. A registered asset goes back to pending, so it is
+        loaded again on its next access.
+        """
+        super().pop(name, None)
+        if name in self.loaders:
+            self.pending[name] = self.loaders[name]
+
+    def prefetch(self, names):
+        """
+        Decodes the files of the given registered assets on up to LOADER_THREADS
+        background threads (pygame releases the GIL while decoding). The main
+        thread only converts them when they are first accessed.
+        :param names: Keys of registered assets, in the order they should be decoded.
+        :return: The decoding threads, empty if there is nothing to decode.
+        """
+        files = {}  # file -> names decoded from it, each file is decoded once
+        for name in names:
+            entry = self.pending.get(name)
+            if entry is not None and entry[1] is not None and name not in self.prefetched:
+                files.setdefault(entry[1], []).append(name)
+        if self.decoder is None or not files or not THREADS_AVAILABLE:
+            return []
+        work = collections.deque(files.items())  # Shared by the threads, taken in order
+        threads = [threading.Thread(target=self._prefetch, args=(work,), daemon=True)
+                   for _ in range(min(LOADER_THREADS, len(files)))]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _prefetch(self, work):
+        while True:
+            with self._lock:
+                if not work:
+                    return
+                file, names = work.popleft()
+                if not any(name in self.pending for name in names):
+                    continue  # Loaded meanwhile
+            decoded = _decode_or_none(self.decoder, file)
+            if decoded is not None:
+                with self._lock:
+                    for name in names:
+                        # A name loaded meanwhile would never pop its entry
+                        if name in self.pending:
+                            self.prefetched[name] = decoded
+
+
+IMAGES = AssetRegistry(lambda file: _decode_image(file))
+SOUNDS = AssetRegistry(lambda file: _decode_sound(file))
+FONTS = AssetRegistry()
+
+ATLAS_REGIONS = {}  # Subsurfaces of the atlas sheets, keyed by asset_key(file)
+_scaled_files = {}  # asset_key(file) -> size the image of that file is loaded at
+_image_variants = {}  # (name, flip, size) -> (IMAGES[name] it was made from, variant)
+_atlas_loaded = False
+
+@traced("atlas")
+def load_atlas(atlas_dir=ATLAS_DIR):
+    """
+    Loads the atlas sheets built by atlas.py (if any) and fills ATLAS_REGIONS.
+    Must be called after the display has been created.
+    :param atlas_dir: Folder containing the sheets and the manifest.
+    """
+    global _atlas_loaded
+    _atlas_loaded = True
+    manifest = load_manifest(atlas_dir)
+    if manifest is None:
+        return
+    try:
+        sheets = []
+        for name in manifest["sheets"]:
+            sheet_file = os.path.join(atlas_dir, name)
+            sheet = pixel_cache.load(sheet_file, True)
+            if sheet is None:
+                sheet = pygame.image.load(open_asset(sheet_file), sheet_file).convert_alpha()
+                pixel_cache.store(sheet_file, True, sheet)
+            sheets.append(sheet)
+    except pygame.error as message:
+        print('Cannot load atlas, falling back to separate files:', message)
+        return
+    for key, (sheet_index, x, y, width, height) in manifest["sprites"].items():
+        ATLAS_REGIONS[key] = sheets[sheet_index].subsurface((x, y, width, height))
 
-def load_image(file, name, alpha=False, global_alpha=None, colorkey=None):
+def load_converted_image(file, alpha=False, surface=None, size=None):
+    """
+    Returns an image in the display format, from the first source that has it:
+    the atlas, the pixel cache (see pixel_cache.py), or by decoding the file.
+    Decoded images are added to the pixel cache for the next launch.
+    :param file: Path to the image file.
+    :param alpha: Boolean to indicate if alpha transparency should be used.
+    :param surface: Already decoded (not yet converted) image of file, if any.
+    :param size: (width, height) to scale the image to, None to keep the file size.
+    """
+    if not _atlas_loaded:
+        load_atlas()
+    region = ATLAS_REGIONS.get(asset_key(file)) if alpha else None
+    if region is not None and (size is None or region.get_size() == tuple(size)):
+        # Shares pixels with the atlas sheet, already in display format
+        return region.subsurface(region.get_rect())
+
+    image = pixel_cache.load(file, alpha, size=size)
+    if image is not None:
+        return image
+
+    if surface is None:
+        surface = pygame.image.load(open_asset(file), file)
+    if alpha:
+        image = surface.convert_alpha()  # Converts with per-pixel alpha
+    else:
+        image = surface.convert()  # Converts without per-pixel alpha
+    if size is not None and image.get_size() != tuple(size):
+        # Scaled once here rather than every time it is drawn
+        image = pygame.transform.smoothscale(image, size)
+    pixel_cache.store(file, alpha, image, size=size)
+    return image
+
+@traced("decode")
+def _decode_image(file):
+    """
+    Decodes an image file for a later load_image, unless the atlas or the
+    pixel cache already has it (then there is nothing to decode).
+    """
+    if asset_key(file) in ATLAS_REGIONS:
+        return None
+    size = _scaled_files.get(asset_key(file))
+    if pixel_cache.is_cached(file, True, size=size) or pixel_cache.is_cached(file, False, size=size):
+        return None
+    return pygame.image.load(open_asset(file), file)
+
+@traced("decode")
+def _decode_sound(file):
+    """
+    Returns the Sound of a file, built from the samples in the sound cache
+    (see sound_cache.py) when possible. Decoded sounds are added to the cache.
+    """
+    sound = sound_cache.load(file)
+    if sound is None:
+        sound = pygame.mixer.Sound(open_asset(file))
+        sound_cache.store(file, sound)
+    return sound
+
+@traced("image")
+def load_image(file, name, alpha=False, global_alpha=None, colorkey=None, surface=None, size=None):
     """
     Loads an image, prepares it for play, and stores it in the IMAGES dictionary.
     :param file: Path to the image file.
@@ -20,11 +245,11 @@ def load_image(file, name, alpha=False, global_alpha=None, colorkey=None):
                          Should be a number between 0 (transparent) and 255 (opaque).
     :param colorkey: Color key for transparency. If None, no colorkey is applied. 
                      If -1, the color of the top-left pixel is used.
+    :param surface: Already decoded (not yet converted) image of file, if any.
+    :param size: (width, height) to scale the image to, None to keep the file size.
     """
     try:
-        image = pygame.image.load(file)
-        if alpha:
-            image = image.convert_alpha()  # Converts with per-pixel alpha
+        image = load_converted_image(file, alpha, surface, size)
 
         if global_alpha is not None:
             image.set_alpha(global_alpha)  # Applies global alpha to the entire image
@@ -34,9 +259,6 @@ def load_image(file, name, alpha=False, global_alpha=None, colorkey=None):
                 colorkey = image.get_at((0, 0))
             image.set_colorkey(colorkey, pygame.RLEACCEL)
 
-        if not alpha:
-            image = image.convert()  # Converts without per-pixel alpha
-
         # Store the image in the global IMAGES dictionary
         IMAGES[name] = image
         return image
@@ -45,20 +267,98 @@ def load_image(file, name, alpha=False, global_alpha=None, colorkey=None):
         # Handle the error as per your game's requirements
         return None  # or any fallback mechanism
 
-def load_sound(file, name):
+def get_image_variant(name, flip=False, size=None):
+    """
+    Returns an image of IMAGES mirrored and/or scaled, made once and shared, so
+    sprites do not flip or scale their image every frame. Do not draw on it.
+    :param name: Key of the image in IMAGES.
+    :param flip: True to mirror the image horizontally.
+    :param size: (width, height) to smoothscale it to, None to keep its size.
+    """
+    key = (name, flip, size)
+    source = IMAGES[name]
+    entry = _image_variants.get(key)
+    if entry is None or entry[0] is not source:  # Not made yet, or the image was reloaded
+        variant = source
+        if size is not None and size != source.get_size():
+            variant = pygame.transform.smoothscale(variant, size)
+        if flip:
+            variant = pygame.transform.flip(variant, True, False)
+        entry = _image_variants[key] = (source, variant)
+    return entry[1]
+
+@traced("sound")
+def load_sound(file, name, sound=None):
     """
     Loads a sound file and stores it in the SOUNDS dictionary.
     :param file: Path to the sound file.
     :param name: Name/key to store the sound in the SOUNDS dictionary.
+    :param sound: Already decoded Sound of file, if any.
     """
     try:
-        sound = pygame.mixer.Sound(file)
+        if sound is None:
+            sound = _decode_sound(file)
         # Store the sound in the global SOUNDS dictionary
         SOUNDS[name] = sound
+        return sound
     except pygame.error as message:
         print('Cannot load sound:', file)
         raise SystemExit(message)
         
+_music_file = None  # File object of the playing music, read while it plays
+_music_data = {}    # file -> content of the music files read by preload_music
+
+def load_music(file):
+    """
+    Loads a music file for pygame.mixer.music, from memory if preload_music
+    has read it, otherwise from the asset pack or the file itself.
+    :param file: Path to the music file.
+    """
+    global _music_file
+    data = _music_data.get(file)
+    _music_file = io.BytesIO(data) if data is not None else open_asset(file)
+    pygame.mixer.music.load(_music_file, os.path.splitext(file)[1][1:])
+
+def preload_music(file):
+    """
+    Reads a music file into memory on a background thread, so that a later
+    load_music of it does not wait for the disk on the frame thread.
+    """
+    if file in _music_data:
+        return
+    _music_data[file] = None  # Being read
+    if THREADS_AVAILABLE:
+        threading.Thread(target=_read_music, args=(file,), daemon=True).start()
+    else:
+        _read_music(file)
+
+def _read_music(file):
+    try:
+        data = read_asset(file)
+    except OSError as message:
+        print('Cannot preload music:', file, message)
+        data = None
+    if file in _music_data:  # Not unloaded meanwhile
+        _music_data[file] = data
+
+def unload_music(file):
+    """
+    Frees the memory of a music file read by preload_music.
+    """
+    _music_data.pop(file, None)
+
+def get_font_key(name, size, is_system_font=False):
+    """
+    Returns the FONTS key of a font, e.g. "arcade_n_16" for ("fonts/ARCADE_N.ttf", 16).
+    """
+    if not is_system_font:
+        # Use only the base name of the file (without path and extension) for the key
+        base_name = os.path.splitext(os.path.basename(name))[0]
+        return f"{base_name.lower()}_{size}"
+    # For system fonts, use the name directly
+    return f"{name.replace(' ', '_').lower()}_{size}"
+
+@traced("font")
 def load_font(name, size, is_system_font=False):
     """
     Loads a font and stores it in the FONTS dictionary.
@@ -70,17 +370,66 @@ def load_font(name, size, is_system_font=False):
         if is_system_font:
             font = pygame.font.SysFont(name, size)
         else:
-            font = pygame.font.Font(name, size)
+            font = pygame.font.Font(open_asset(name), size)
         
-        if not is_system_font:
-            # Use only the base name of the file (without path and extension) for the key
-            base_name = os.path.splitext(os.path.basename(name))[0]
-            font_key = f"{base_name.lower()}_{size}"
-        else:
-            # For system fonts, use the name directly
-            font_key = f"{name.replace(' ', '_').lower()}_{size}"
-    
-        FONTS[font_key] = font
+        FONTS[get_font_key(name, size, is_system_font)] = font
+        return font
     except IOError as e:
         print(f"Cannot load font: {name}, {e}")
-        raise SystemExit(e)
\ No newline at end of file
+        raise SystemExit(e)
+
+
+def _decode_or_none(decoder, file):
+    """
+    Runs decoder(file) on a worker thread. Errors are left to the regular
+    loaders, which retry the file on the main thread and report it.
+    """
+    try:
+        return decoder(file)
+    except (pygame.error, OSError):
+        return None
+
+def register_assets(image_assets, sound_assets, font_assets, image_sizes=None):
+    """
+    Registers assets in IMAGES, SOUNDS and FONTS without loading them.
+    Each one is loaded on first access, or decoded ahead by prefetch.
+    :param image_assets: List of (file, name, alpha, global_alpha).
+    :param sound_assets: List of (file, name, volume), volume None to keep the default.
+    :param font_assets: List of (name, size, is_system_font).
+    :param image_sizes: Dictionary of image name -> (width, height) to scale it to when loaded.
+    """
+    image_sizes = image_sizes or {}
+    for file, name, alpha, global_alpha in image_assets:
+        size = image_sizes.get(name)
+        if size is not None:
+            _scaled_files[asset_key(file)] = size
+        IMAGES.register(name,
+                        lambda decoded, file=file, name=name, alpha=alpha, global_alpha=global_alpha, size=size:
+                            load_image(file, name, alpha, global_alpha, surface=decoded, size=size),
+                        file)
+    for file, name, volume in sound_assets:
+        SOUNDS.register(name,
+                        lambda decoded, file=file, name=name, volume=volume:
+                            _load_sound_with_volume(file, name, volume, decoded),
+                        file)
+    for font_name, size, is_system_font in font_assets:
+        FONTS.register(get_font_key(font_name, size, is_system_font),
+                       lambda decoded, font_name=font_name, size=size, is_system_font=is_system_font:
+                           load_font(font_name, size, is_system_font))
+
+def _load_sound_with_volume(file, name, volume, sound=None):
+    sound = load_sound(file, name, sound)
+    if volume is not None:
+        sound.set_volume(volume)
+    return sound
+
+def load_registered(name):
+    """
+    Loads a registered asset of IMAGES, SOUNDS or FONTS if it is not loaded yet.
+    :param name: Key of the asset in one of the registries.
+    :return: The asset, or None if no registry knows the name.
+    """
+    for registry in (IMAGES, SOUNDS, FONTS):
+        if name in registry:
+            return registry.get(name)
+    return None